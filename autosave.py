@@ -0,0 +1,140 @@
+"""
+Guardado en segundo plano.
+
+La interfaz no debería esperar al disco: con un disco lento (o de red) cada
+guardado congelaba la ventana. AutosaveWriter recibe el contenido ya armado
+en memoria (lista de (ruta, texto), ver Tournament.render_files) y lo
+escribe desde un hilo propio:
+
+- Agrupa ráfagas: si llegan varios pedidos para la misma ruta antes de
+  escribirla, sólo se escribe el último (espera COALESCE_DELAY segundos
+  después del primer pedido para juntar los que sigan).
+- Cada archivo se escribe en un temporal y se reemplaza de forma atómica
+  (journal.write_atomic): un corte a mitad de camino deja la versión
+  anterior intacta.
+- Además corre, en el orden en que llegan, tareas de disco ya armadas
+  (submit_call): las líneas del diario de eventos y sus fotos (ver
+  journal.Journal). El contenido se arma en el hilo de la interfaz; acá
+  sólo se escribe y se hace el fsync. Dos tandas de archivos seguidas se
+  juntan, pero nunca se adelanta nada por encima de una tarea.
+- Los errores no se imprimen: quedan en una cola que la interfaz revisa con
+  errors() desde su propio hilo (tkinter no admite que otro hilo la toque).
+
+Este módulo no importa el motor ni tkinter.
+"""
+import queue
+import threading
+import time
+
+from journal import write_atomic
+from timing import timings
+
+# Segundos que se espera después de un pedido para juntar los que lleguen detrás
+COALESCE_DELAY = 0.2
+
+
+class AutosaveWriter:
+    """Hilo escritor. submit() y submit_call() nunca bloquean: sólo dejan el pedido anotado."""
+    def __init__(self, delay=COALESCE_DELAY):
+        self.delay = delay
+        self.writes = 0       # Archivos y tareas terminados con éxito (la interfaz lo usa para avisar)
+        self._pending = []    # En orden: dict ruta -> texto (el último pedido gana) o (nombre, función)
+        self._busy = False
+        self._closed = False
+        self._errors = queue.Queue()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def submit(self, files):
+        """Pide escribir estos archivos: lista (o dict) de (ruta, texto)."""
+        with self._cond:
+            self._check_open()
+            if self._pending and isinstance(self._pending[-1], dict):
+                self._pending[-1].update(files)
+            else:
+                self._pending.append(dict(files))
+            self._cond.notify_all()
+
+    def submit_call(self, name, func):
+        """
+        Pide correr func() en el hilo escritor, después de todo lo pedido
+        antes. `name` (una ruta) identifica la tarea si falla.
+        """
+        with self._cond:
+            self._check_open()
+            self._pending.append((name, func))
+            self._cond.notify_all()
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("El guardado en segundo plano ya se cerró.")
+
+    def errors(self):
+        """Errores desde la última consulta: lista de (ruta, excepción)."""
+        found = []
+        while True:
+            try:
+                found.append(self._errors.get_nowait())
+            except queue.Empty:
+                return found
+
+    def flush(self, timeout=None):
+        """Espera a que no quede nada por escribir. Devuelve False si venció el plazo."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        """Escribe lo pendiente y termina el hilo (espera como mucho `timeout` segundos)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                self._busy = True
+                # Las tareas del diario no esperan: sólo se demoran las tandas de archivos sueltos
+                only_files = all(isinstance(job, dict) for job in self._pending)
+            if self.delay and only_files and not self._closed:
+                time.sleep(self.delay)
+            with self._cond:
+                jobs, self._pending = self._pending, []
+            done = 0
+            try:
+                for job in jobs:
+                    done += self._run_job(job)
+            finally:
+                with self._cond:
+                    self.writes += done
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _run_job(self, job):
+        """
+        Corre un pedido y devuelve cuántos archivos o tareas terminaron bien.
+        Cualquier error (no sólo de disco: un diario ya cerrado da ValueError)
+        queda para errors() y no corta el hilo ni los pedidos que siguen.
+        """
+        done = 0
+        if isinstance(job, dict):
+            for path, text in job.items():
+                try:
+                    with timings.measure("autosave_write"):
+                        write_atomic(path, lambda f: f.write(text))
+                    done += 1
+                except Exception as e:
+                    self._errors.put((path, e))
+        else:
+            name, func = job
+            try:
+                with timings.measure("autosave_call"):
+                    func()
+                done += 1
+            except Exception as e:
+                self._errors.put((name, e))
+        return done
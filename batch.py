@@ -0,0 +1,252 @@
+"""
+Manejo de un torneo por línea de comandos, sin pantalla.
+
+Los resultados llegan de las tabletas de puntaje como archivos: en lugar de
+volver a tipearlos en la pantalla de partidos, este programa carga el
+torneo, aplica los archivos de resultados (uno por ronda, o varios para la
+misma ronda si llegan por partes), arma los pareos y escribe la tabla. Usa
+el mismo motor, los mismos pareos y el mismo diario de eventos que la
+interfaz, y no importa tkinter: sirve para procesar un evento entero de una
+vez o para automatizarlo (cron).
+
+Archivos:
+
+- TORNEO es el diario del torneo (.journal). También se puede partir de una
+  foto (.trugo) o de un reporte (.txt): en ese caso el diario se crea al
+  lado, con el mismo nombre. Con --new se crea un torneo nuevo.
+- --teams: equipos en CSV, como la importación de la interfaz (ver
+  team_import.py).
+- --results: un CSV por archivo con una fila por partido:
+  "id1,id2,puntos1,puntos2" (el equipo libre va como "id,BYE,puntos,0").
+  Cada archivo se aplica a la ronda vigente; si no hay ninguna esperando
+  resultados, antes se arma la siguiente. Un archivo con cualquier fila
+  mala no se aplica (se informan todas juntas).
+- --pairings / --standings: pareos vigentes y tabla con desempates en CSV
+  ("-" para la salida estándar).
+- --export: tabla, pareos y resultados en CSV, JSON y HTML (ver export.py;
+  --formats elige cuáles).
+- --timing: tiempos de cada paso (pareo, guardado, carga) en JSON (ver
+  timing.py).
+
+Uso:
+    python batch.py Liga.journal --new "Liga" --teams equipos.csv --pair --pairings ronda1.csv
+    python batch.py Liga.journal --results ronda1.csv ronda2.csv --pair --standings tabla.csv
+    python batch.py Liga.journal --export publico/Liga --formats json html
+
+(o lo mismo con "python tournament_app.py ...": con argumentos no abre la ventana).
+
+Devuelve 0 si todo salió bien y 1 si algún archivo tenía problemas (el
+torneo queda guardado hasta el último paso completo).
+"""
+import argparse
+import csv
+import os
+import sys
+
+import export
+from journal import JOURNAL_EXTENSION, write_atomic
+from snapshot import SNAPSHOT_EXTENSION
+from team_import import format_errors, parse_teams
+from timing import timings
+from tournament_engine import BYE, PAIRING_GREEDY, PAIRING_MODES, Tournament
+
+
+class BatchError(Exception):
+    """Un archivo de entrada con problemas: lleva la lista de (línea, mensaje)."""
+    def __init__(self, path, errors):
+        super().__init__(f"{path}:\n{format_errors(errors)}")
+        self.path = path
+        self.errors = errors
+
+
+def open_tournament(path, new_name=None, mode=PAIRING_GREEDY):
+    """
+    Abre (o crea, con `new_name`) el torneo de `path` y lo deja anotando en
+    su diario. Devuelve el Tournament.
+    """
+    journal_path = os.path.splitext(path)[0] + JOURNAL_EXTENSION
+    if path.endswith(JOURNAL_EXTENSION) and new_name is None:
+        return Tournament.load_journal(path)
+    if os.path.exists(journal_path):
+        # No se pisa un diario existente: hay que seguir desde él
+        raise ValueError(f"El torneo {journal_path} ya existe.")
+    if new_name is not None:
+        tournament = Tournament(new_name, mode)
+    elif path.endswith(SNAPSHOT_EXTENSION):
+        tournament = Tournament.load_snapshot(path)
+    else:
+        tournament = Tournament.load(path)
+        tournament.pairing_mode = mode
+    tournament.attach_journal(journal_path)
+    return tournament
+
+
+def add_teams_file(tournament, path):
+    """Inscribe los equipos de un CSV. Lanza BatchError si alguna fila tiene problemas."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        teams, errors = parse_teams(f, tournament.teams)
+    if errors:
+        raise BatchError(path, errors)
+    tournament.add_teams(teams)
+    return len(teams)
+
+
+def parse_results(lines, matches):
+    """
+    Lee filas "id1,id2,puntos1,puntos2" y las ubica en los pareos vigentes
+    (`matches`, lista de (id1, id2)). Acepta los equipos en cualquier orden
+    y una primera fila de encabezado. Devuelve ([(índice, puntos1,
+    puntos2)], errores), con errores como lista de (línea, mensaje).
+    """
+    position = {match: index for index, match in enumerate(matches)}
+    seen = set()
+    results = []
+    errors = []
+    reader = csv.reader(lines)
+    for row in reader:
+        fields = [field.strip() for field in row]
+        if not any(fields):
+            continue
+        line_no = reader.line_num
+        if len(fields) != 4:
+            if line_no == 1 and not any(char.isdigit() for field in fields for char in field):
+                continue  # Encabezado
+            errors.append((line_no, f"Se esperaban 4 columnas (id1, id2, puntos1, puntos2): {row!r}"))
+            continue
+        team1_id, team2_id, s1, s2 = fields
+        if not (s1.isdecimal() and s2.isdecimal()):
+            if line_no == 1 and not (s1[:1].isdigit() or s2[:1].isdigit()):
+                continue  # Encabezado ("puntos1"); "²" o "1.5" son puntajes mal escritos
+            errors.append((line_no, "Los puntajes deben ser enteros no negativos."))
+            continue
+        s1, s2 = int(s1), int(s2)
+        index = position.get((team1_id, team2_id))
+        if index is None and (team2_id, team1_id) in position:
+            index = position[(team2_id, team1_id)]
+            s1, s2 = s2, s1
+        if index is None:
+            errors.append((line_no, f"{team1_id} contra {team2_id} no es un partido de esta ronda."))
+        elif index in seen:
+            errors.append((line_no, f"El partido {team1_id} contra {team2_id} está repetido en el archivo."))
+        elif matches[index][1] == BYE and s2 != 0:
+            errors.append((line_no, "El lado libre (BYE) va con 0 puntos."))
+        else:
+            seen.add(index)
+            results.append((index, s1, s2))
+    return results, errors
+
+
+@timings.timed()
+def apply_results_file(tournament, path):
+    """
+    Aplica un archivo de resultados a la ronda vigente (si no hay ninguna
+    esperando resultados, antes se arma la siguiente). Se valida todo el
+    archivo antes de cargar nada; si no sirve, tampoco queda el pareo que se
+    armó para él. Devuelve True si con él se cerró la ronda.
+    """
+    # Primero el archivo: si no se puede leer no se toca el torneo
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        lines = list(f)
+    paired = False
+    if not tournament.results_pending():
+        if tournament.undo_history is None:
+            tournament.enable_undo()
+        tournament.generate_pairings()
+        paired = True
+    results, errors = parse_results(lines, tournament.current_matches)
+    if errors:
+        if paired:
+            # El diario ya anotó el pareo: deshacerlo lo reemplaza por una foto del estado anterior
+            tournament.undo()
+        raise BatchError(path, errors)
+    closed = False
+    scores = tournament.round_scores
+    for index, s1, s2 in results:
+        if scores.confirmed[index] == (s1, s2):
+            continue
+        # Como en la pantalla de partidos: el archivo manda sobre lo cargado antes
+        _version, closed = tournament.record_match_result(index, s1, s2, scores.versions[index])
+    return closed
+
+
+def write_section(tournament, path, section):
+    """Escribe una sección de export.py en CSV (de forma atómica), o en la salida estándar si `path` es "-"."""
+    if path == "-":
+        export.write_csv(sys.stdout, tournament, section)
+    else:
+        write_atomic(path, lambda f: export.write_csv(f, tournament, section))
+
+
+def run(args):
+    tournament = open_tournament(args.tournament, args.new, args.mode)
+    try:
+        if args.teams:
+            added = add_teams_file(tournament, args.teams)
+            print(f"{added} equipos inscriptos ({len(tournament.teams)} en total).")
+        for path in args.results:
+            closed = apply_results_file(tournament, path)
+            missing = tournament.round_scores.missing()
+            state = "cerrada" if closed or not missing else f"faltan {missing} partidos"
+            print(f"{path}: ronda {tournament.current_round} ({state}).")
+        if args.pair:
+            if tournament.results_pending():
+                print(f"No se armó la ronda siguiente: faltan {tournament.round_scores.missing()} "
+                      f"resultados de la ronda {tournament.current_round}.", file=sys.stderr)
+                return 1
+            if len(tournament.teams) < 2:
+                print("Se necesitan al menos 2 equipos para armar una ronda.", file=sys.stderr)
+                return 1
+            tournament.generate_pairings()
+            print(f"Ronda {tournament.current_round}: {len(tournament.current_matches)} partidos.")
+        if args.pairings:
+            write_section(tournament, args.pairings, "pairings")
+        if args.standings:
+            write_section(tournament, args.standings, "standings")
+        if args.export:
+            for path in export.export(tournament, args.export, args.formats):
+                print(f"Exportado: {path}")
+    except BatchError as e:
+        print(f"No se aplicó {e}", file=sys.stderr)
+        return 1
+    finally:
+        # Deja la foto y el reporte al día y cierra el diario
+        tournament.compact_journal()
+        tournament.detach_journal()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maneja un torneo de Trugo sin pantalla (por lotes).")
+    parser.add_argument("tournament", help="Diario del torneo (.journal), o foto (.trugo) o reporte (.txt)")
+    parser.add_argument("--new", metavar="NOMBRE", help="Crea un torneo nuevo con este nombre")
+    parser.add_argument("--mode", choices=PAIRING_MODES, default=PAIRING_GREEDY,
+                        help="Modo de pareo (torneos nuevos o cargados desde un reporte)")
+    parser.add_argument("--teams", metavar="CSV", help="Equipos a inscribir (id,nombre)")
+    parser.add_argument("--results", metavar="CSV", nargs="+", default=[],
+                        help="Archivos de resultados, en orden (id1,id2,puntos1,puntos2)")
+    parser.add_argument("--pair", action="store_true", help="Arma la ronda siguiente al final")
+    parser.add_argument("--pairings", metavar="CSV", help="Escribe los pareos vigentes ('-' = pantalla)")
+    parser.add_argument("--standings", metavar="CSV", help="Escribe la tabla con desempates ('-' = pantalla)")
+    parser.add_argument("--export", metavar="BASE",
+                        help="Exporta tabla, pareos y resultados (BASE_posiciones.csv, BASE.json, BASE.html...)")
+    parser.add_argument("--formats", nargs="+", choices=export.EXPORT_FORMATS, default=list(export.EXPORT_FORMATS),
+                        help="Formatos de --export (por defecto, todos)")
+    parser.add_argument("--timing", metavar="JSON", help="Mide los tiempos de cada paso y los guarda en este archivo")
+    args = parser.parse_args(argv)
+    if args.timing:
+        timings.enable()
+    try:
+        return run(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.timing:
+            try:
+                timings.dump(args.timing)
+            except OSError as e:
+                print(f"No se pudieron guardar los tiempos en {args.timing}: {e}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
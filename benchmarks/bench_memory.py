@@ -0,0 +1,50 @@
+"""
+Mide cuánta memoria ocupa un torneo grande.
+
+Uso (desde la carpeta del proyecto):
+    python benchmarks/bench_memory.py [equipos] [rondas]
+
+Arma un torneo de 20.000 equipos (por defecto) y juega 10 rondas con
+resultados al azar. Informa la memoria reservada por el torneo (según
+tracemalloc) y cuánto de eso son los rivales de cada equipo (los bits de
+team_store.py), junto con el tiempo total de pareo.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tournament_engine import BYE, Tournament  # noqa: E402
+
+
+def main():
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rng = random.Random(1)
+
+    tracemalloc.start()
+    tournament = Tournament("Benchmark")
+    for i in range(teams):
+        tournament.add_team(f"EQ{i:05d}", f"Equipo {i}")
+    pairing = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        tournament.generate_pairings()
+        pairing += time.perf_counter() - start
+        tournament.submit_results([(t1, t2, rng.randint(0, 5), 0 if t2 == BYE else rng.randint(0, 5))
+                                   for t1, t2 in tournament.current_matches])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    opponents = sum(sys.getsizeof(team.played) for team in tournament.teams.values())
+    print(f"{teams} equipos, {rounds} rondas")
+    print(f"  memoria del torneo: {current / 2**20:7.1f} MB  (pico {peak / 2**20:.1f} MB)")
+    print(f"  rivales (bits):     {opponents / 2**20:7.1f} MB  ({opponents / teams:.0f} bytes por equipo)")
+    print(f"  pareos:             {pairing:7.2f} s   ({pairing / rounds * 1000:.0f} ms por ronda)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Mide cuánto tarda en cargarse la foto compacta de un torneo grande.
+
+Uso (desde la carpeta del proyecto):
+    python benchmarks/bench_snapshot.py [equipos] [rondas]
+
+Arma un torneo de 10.000 equipos y 12 rondas (por defecto) con resultados
+partido por partido, lo guarda con save_snapshot y lo vuelve a cargar varias
+veces. Informa el mejor tiempo, la mediana y el peor de la carga contra el
+objetivo de 100 ms (el veredicto sale de la mediana), y el del reporte .txt
+como referencia.
+
+La carga difiere el historial y los bits de rivales hasta que se usan: el
+primer pareo después de cargar los arma. Para que eso no quede escondido se
+informa también cuánto tarda ese primer pareo.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tournament_engine import BYE, Tournament  # noqa: E402
+
+TARGET_MS = 100
+REPEATS = 7
+
+
+def build(teams, rounds):
+    tournament = Tournament("Benchmark")
+    for i in range(teams):
+        tournament.add_team(f"EQ{i:05d}", f"Equipo {i}")
+    for _ in range(rounds):
+        tournament.generate_pairings()
+        # Resultados partido por partido, como llegan de verdad (historial y desempates completos)
+        tournament.submit_results([(t1, t2, 2, 0 if t2 == BYE else 1) for t1, t2 in tournament.current_matches])
+    tournament.generate_pairings()
+    return tournament
+
+
+def times_of(func, repeats=REPEATS):
+    """Tiempos (ms) de cada repetición, de menor a mayor."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+        del result  # Liberar el torneo anterior no es parte de la carga
+    return sorted(times)
+
+
+def best_of(func, repeats=REPEATS):
+    return times_of(func, repeats)[0]
+
+
+def main():
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+
+    tournament = build(teams, rounds)
+    with tempfile.TemporaryDirectory() as folder:
+        snapshot_path = os.path.join(folder, "Benchmark.trugo")
+        report_path = os.path.join(folder, "Benchmark.txt")
+        save_ms = best_of(lambda: tournament.save_snapshot(snapshot_path))
+        tournament.write_report(report_path)
+
+        load_times = times_of(lambda: Tournament.load_snapshot(snapshot_path))
+        loaded = [Tournament.load_snapshot(snapshot_path) for _ in range(REPEATS)]
+        pair_ms = statistics.median(times_of(lambda: loaded.pop().generate_pairings()))
+        report_ms = best_of(lambda: Tournament.load(report_path))
+        size_kb = os.path.getsize(snapshot_path) / 1024
+
+    print(f"{teams} equipos, {rounds} rondas, foto de {size_kb:.0f} KB")
+    print(f"  guardar foto:    {save_ms:7.1f} ms")
+    load_ms = statistics.median(load_times)
+    if load_ms < TARGET_MS:
+        verdict = "OK"
+    else:
+        verdict = f"NO, faltan {load_ms - TARGET_MS:.0f} ms"
+    print(f"  cargar foto:     {load_ms:7.1f} ms  mediana (mejor {load_times[0]:.1f}, peor {load_times[-1]:.1f})"
+          f"  objetivo < {TARGET_MS} ms: {verdict}")
+    print(f"  primer pareo:    {pair_ms:7.1f} ms  mediana (arma los bits de rivales diferidos)")
+    print(f"  cargar reporte:  {report_ms:7.1f} ms  (formato .txt anterior)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Mide cuánto tarda en abrirse la ventana (arranque en frío).
+
+Uso (desde la carpeta del proyecto):
+    python benchmarks/bench_startup.py [repeticiones]
+
+Cada medición corre en un proceso nuevo, así que los módulos se importan de
+cero como al abrir el programa. Informa la mediana de:
+
+- importar el motor (tournament_engine, sin tkinter),
+- importar la interfaz (tournament_app),
+- crear TournamentApp y dibujar la primera pantalla (necesita pantalla;
+  sin DISPLAY se informa sólo lo anterior),
+- construir además las otras dos pantallas, como hacía el arranque antes de
+  que se armaran a pedido (ver FrameRegistry en tournament_app.py).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPEATS = 5
+
+# Lo que corre cada proceso: imprime los tiempos (en segundos) como JSON
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import tournament_engine
+times = {"engine": time.perf_counter() - start, "engine_tk": "tkinter" in sys.modules}
+start = time.perf_counter()
+import tournament_app
+times["app_import"] = time.perf_counter() - start
+try:
+    start = time.perf_counter()
+    app = tournament_app.TournamentApp()
+    app.update()
+    times["window"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for frame in (tournament_app.MatchFrame, tournament_app.StandingsFrame):
+        app.frames[frame]
+    app.update()
+    times["other_frames"] = time.perf_counter() - start
+    app.destroy()
+except tournament_app.tk.TclError as e:
+    times["no_display"] = str(e)
+print(json.dumps(times))
+"""
+
+
+def probe():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else REPEATS
+    runs = [probe() for _ in range(repeats)]
+
+    def median_ms(key):
+        return statistics.median(run[key] for run in runs) * 1000
+
+    print(f"{repeats} arranques en frío (mediana)")
+    print(f"  importar el motor:      {median_ms('engine'):7.1f} ms"
+          f"  ({'con' if runs[0]['engine_tk'] else 'sin'} tkinter)")
+    print(f"  importar la interfaz:   {median_ms('app_import'):7.1f} ms")
+    if "no_display" in runs[0]:
+        print(f"  ventana: no se pudo medir ({runs[0]['no_display']})")
+        return
+    print(f"  ventana en pantalla:    {median_ms('window'):7.1f} ms")
+    print(f"  resto de las pantallas: {median_ms('other_frames'):7.1f} ms  (se construyen recién al usarlas)")
+
+
+if __name__ == "__main__":
+    main()
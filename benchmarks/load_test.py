@@ -0,0 +1,155 @@
+"""
+Prueba de carga del servidor de torneos (server.py).
+
+Uso (desde la carpeta del proyecto):
+    python benchmarks/load_test.py [--tournaments 200] [--teams 16] [--rounds 4]
+                                   [--clients 200] [--host 127.0.0.1 --port 8765]
+
+Sin --port levanta un servidor propio en un puerto libre (en otro proceso)
+y lo cierra al terminar; con --port usa uno que ya esté corriendo.
+
+Crea los torneos e inscribe los equipos, y luego juega las rondas: arma los
+pareos de todos los torneos y envía todos los resultados a la vez desde
+--clients conexiones. Informa pedidos por segundo y la latencia (mediana,
+p95, p99 y máxima) de cada tipo de pedido.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import Client, DEFAULT_HOST  # noqa: E402
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def report(label, latencies, elapsed):
+    values = sorted(latencies)
+    ms = [v * 1000 for v in (percentile(values, 0.5), percentile(values, 0.95),
+                             percentile(values, 0.99), values[-1] if values else 0.0)]
+    print(f"  {label:<12} {len(values):6d} pedidos  {len(values) / elapsed:8.0f}/s  "
+          f"mediana {ms[0]:6.1f} ms  p95 {ms[1]:6.1f} ms  p99 {ms[2]:6.1f} ms  máx {ms[3]:6.1f} ms")
+
+
+async def run_all(clients, jobs):
+    """Reparte los pedidos entre las conexiones; devuelve (latencias, segundos)."""
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    latencies = []
+
+    async def worker(client):
+        while not queue.empty():
+            method, path, payload = queue.get_nowait()
+            start = time.perf_counter()
+            status, data = await client.request(method, path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                raise RuntimeError(f"{method} {path}: {status} {data}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients))
+    return latencies, time.perf_counter() - start
+
+
+async def load_test(args, port):
+    clients = [Client(args.host, port) for _ in range(args.clients)]
+    names = [f"Carga {i:04d}" for i in range(args.tournaments)]
+    paths = {name: "/tournaments/" + name.replace(" ", "%20") for name in names}
+    rng = random.Random(1)
+
+    print(f"{args.tournaments} torneos de {args.teams} equipos, {args.rounds} rondas, {args.clients} conexiones")
+    latencies, elapsed = await run_all(clients, [("POST", "/tournaments", {"name": name}) for name in names])
+    report("crear", latencies, elapsed)
+    teams = [{"id": f"EQ{i:03d}", "name": f"Equipo {i}"} for i in range(args.teams)]
+    latencies, elapsed = await run_all(clients, [("POST", paths[name] + "/teams", {"teams": teams}) for name in names])
+    report("equipos", latencies, elapsed)
+
+    pair_latencies, result_latencies = [], []
+    pair_time = result_time = 0.0
+    for _ in range(args.rounds):
+        matches = {}
+
+        async def pair(client, name):
+            start = time.perf_counter()
+            status, data = await client.request("POST", paths[name] + "/pairings")
+            pair_latencies.append(time.perf_counter() - start)
+            matches[name] = data["matches"]
+
+        start = time.perf_counter()
+        for i in range(0, len(names), len(clients)):
+            await asyncio.gather(*(pair(client, name) for client, name in zip(clients, names[i:i + len(clients)])))
+        pair_time += time.perf_counter() - start
+
+        jobs = [("POST", paths[name] + "/results",
+                 {"results": [[t1, t2, rng.randint(0, 3), rng.randint(0, 3) if t2 != "BYE" else 0]
+                              for t1, t2 in matches[name]]})
+                for name in names]
+        latencies, elapsed = await run_all(clients, jobs)
+        result_latencies += latencies
+        result_time += elapsed
+
+    report("pareos", pair_latencies, pair_time)
+    report("resultados", result_latencies, result_time)
+    latencies, elapsed = await run_all(clients, [("GET", paths[name] + "/standings", None) for name in names])
+    report("tabla", latencies, elapsed)
+
+    for client in clients:
+        await client.close()
+
+
+def wait_for_port(host, port, timeout=10.0):
+    async def probe():
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                _reader, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.05)
+        raise RuntimeError("El servidor no respondió a tiempo.")
+    asyncio.run(probe())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de torneos.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, help="Servidor ya levantado (si no, se levanta uno)")
+    parser.add_argument("--tournaments", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=200)
+    args = parser.parse_args()
+
+    process = None
+    port = args.port
+    if port is None:
+        import socket
+        with socket.socket() as s:
+            s.bind((args.host, 0))
+            port = s.getsockname()[1]
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"),
+                                    "--host", args.host, "--port", str(port)],
+                                   stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.host, port)
+        asyncio.run(load_test(args, port))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
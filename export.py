@@ -0,0 +1,199 @@
+"""
+Exportación de la tabla, los pareos vigentes y los resultados.
+
+El reporte .txt de save_tournament_data mezcla texto para leer con líneas
+SYSTEM_ para volver a cargarlo, y no sirve para los marcadores, planillas o
+informes a la federación. Este módulo escribe lo mismo en formatos
+abiertos:
+
+- CSV: un archivo por sección (tabla, pareos, resultados).
+- JSON: un solo archivo con las tres secciones.
+- HTML: una página estática, sin scripts ni archivos aparte.
+
+Cada sección es un generador sobre el modelo que produce una fila por vez
+(ver SECTIONS), y cada formato escribe las filas a medida que salen: no se
+arma el texto entero en memoria ni se vuelve a ordenar la tabla entera.
+La memoria NO es constante: la tabla se ordena por desempates de a un grupo
+de empatados (ver Tournament.iter_final_standings), y ese grupo se guarda
+entero mientras se escribe. En un suizo el grupo más grande es una parte
+fija del torneo (la mitad tras la primera ronda), así que el pico crece
+linealmente con los equipos: unas decenas de bytes por equipo del grupo,
+lejos del tamaño del texto exportado (unos 300 bytes por equipo).
+
+Los archivos se reemplazan de forma atómica (write_atomic). Este módulo no
+importa tkinter.
+"""
+import csv
+import json
+import os
+from html import escape
+
+from journal import write_atomic
+from tiebreaks import TIEBREAK_LABELS, TIEBREAK_ORDER
+from tournament_engine import BYE
+
+CSV, JSON, HTML = "csv", "json", "html"
+EXPORT_FORMATS = (CSV, JSON, HTML)
+
+# =============================================================================
+# SECCIONES: GENERADORES DE FILAS
+# =============================================================================
+# Cada columna es (clave para JSON, título para CSV y HTML)
+
+STANDINGS_COLUMNS = (("position", "posicion"), ("id", "id"), ("name", "equipo"), ("points", "puntos")) + \
+    tuple((key, TIEBREAK_LABELS[key]) for key in TIEBREAK_ORDER)
+
+PAIRINGS_COLUMNS = (("table", "mesa"), ("id1", "id1"), ("name1", "equipo1"), ("id2", "id2"), ("name2", "equipo2"))
+
+RESULTS_COLUMNS = (("round", "ronda"), ("id1", "id1"), ("name1", "equipo1"), ("id2", "id2"), ("name2", "equipo2"),
+                   ("score1", "puntos1"), ("score2", "puntos2"))
+
+
+def standings_rows(tournament):
+    """Tabla con desempates, en orden: (posición, id, nombre, puntos, criterios...)."""
+    for position, (team, tiebreaks) in enumerate(tournament.iter_final_standings(), start=1):
+        yield (position, team.id, team.name, team.total_points) + tuple(tiebreaks)
+
+
+def _name(tournament, team_id):
+    if team_id == BYE:
+        return BYE
+    team = tournament.teams.get(team_id)
+    return team.name if team is not None else team_id
+
+
+def pairings_rows(tournament):
+    """Pareos vigentes: (mesa, id1, nombre1, id2, nombre2); el libre va contra BYE."""
+    for table, (team1_id, team2_id) in enumerate(tournament.current_matches, start=1):
+        yield table, team1_id, _name(tournament, team1_id), team2_id, _name(tournament, team2_id)
+
+
+def results_rows(tournament):
+    """
+    Todos los partidos con resultado: (ronda, id1, nombre1, id2, nombre2,
+    puntos1, puntos2). Van por equipo, en orden de inscripción: cada partido
+    sale una sola vez, desde el equipo inscripto antes. Al final, los
+    resultados ya confirmados de la ronda abierta.
+    """
+    teams = tournament.teams
+    for team in teams.values():
+        for round_number, opponent_id, own, other in team.history:
+            opponent = teams.get(opponent_id) if opponent_id != BYE else None
+            if opponent is not None and opponent.seq < team.seq:
+                continue  # Ya salió desde el rival
+            yield (round_number, team.id, team.name, opponent_id, _name(tournament, opponent_id), own, other)
+    scores = tournament.round_scores
+    if tournament.results_pending():
+        for (team1_id, team2_id), confirmed in zip(tournament.current_matches, scores.confirmed):
+            if confirmed is not None:
+                yield (tournament.current_round, team1_id, _name(tournament, team1_id),
+                       team2_id, _name(tournament, team2_id)) + tuple(confirmed)
+
+
+# Nombre de la sección -> (columnas, generador de filas, título para la página)
+SECTIONS = {
+    "standings": (STANDINGS_COLUMNS, standings_rows, "Posiciones"),
+    "pairings": (PAIRINGS_COLUMNS, pairings_rows, "Pareos vigentes"),
+    "results": (RESULTS_COLUMNS, results_rows, "Resultados"),
+}
+
+# Sufijo de cada sección en los nombres de los CSV ("Liga_posiciones.csv")
+CSV_SUFFIXES = {"standings": "posiciones", "pairings": "pareos", "results": "resultados"}
+
+# =============================================================================
+# FORMATOS
+# =============================================================================
+
+def write_csv(f, tournament, section):
+    """Escribe una sección en CSV sobre el archivo abierto `f`."""
+    columns, rows, _title = SECTIONS[section]
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow([label for _, label in columns])
+    writer.writerows(rows(tournament))
+
+
+def write_json(f, tournament, sections=tuple(SECTIONS)):
+    """
+    Escribe un objeto JSON con el nombre, la ronda y una lista de objetos
+    por sección. Se escribe de a una fila, sin armar el documento entero.
+    """
+    f.write("{\n")
+    f.write(f'"tournament": {json.dumps(tournament.tournament_name, ensure_ascii=False)},\n')
+    f.write(f'"round": {tournament.current_round}')
+    for section in sections:
+        columns, rows, _title = SECTIONS[section]
+        keys = [key for key, _ in columns]
+        f.write(f',\n"{section}": [')
+        separator = "\n"
+        for row in rows(tournament):
+            f.write(separator)
+            f.write(json.dumps(dict(zip(keys, row)), ensure_ascii=False))
+            separator = ",\n"
+        f.write("\n]")
+    f.write("\n}\n")
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; background: #1e1e2e; color: #cdd6f4; margin: 2em; }}
+h1, h2 {{ color: #89b4fa; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #45475a; padding: 4px 10px; }}
+th {{ background: #252537; }}
+td.n {{ text-align: right; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Ronda {round}</p>
+"""
+
+
+def write_html(f, tournament, sections=tuple(SECTIONS)):
+    """Escribe una página HTML estática con una tabla por sección, fila por fila."""
+    f.write(HTML_HEAD.format(title=escape(tournament.tournament_name), round=tournament.current_round))
+    for section in sections:
+        columns, rows, title = SECTIONS[section]
+        f.write(f"<h2>{title}</h2>\n<table>\n<thead><tr>")
+        f.write("".join(f"<th>{escape(label)}</th>" for _, label in columns))
+        f.write("</tr></thead>\n<tbody>\n")
+        for row in rows(tournament):
+            f.write("<tr>")
+            for value in row:
+                if isinstance(value, (int, float)):
+                    f.write(f'<td class="n">{value}</td>')
+                else:
+                    f.write(f"<td>{escape(value)}</td>")
+            f.write("</tr>\n")
+        f.write("</tbody>\n</table>\n")
+    f.write("</body>\n</html>\n")
+
+
+def export(tournament, base_path, formats=EXPORT_FORMATS):
+    """
+    Exporta todas las secciones en los formatos pedidos, con nombres a
+    partir de `base_path` (sin extensión): "X_posiciones.csv",
+    "X_pareos.csv", "X_resultados.csv", "X.json" y "X.html". Devuelve las
+    rutas escritas.
+    """
+    base_path = os.path.splitext(base_path)[0]
+    written = []
+    for fmt in formats:
+        if fmt == CSV:
+            for section in SECTIONS:
+                path = f"{base_path}_{CSV_SUFFIXES[section]}.csv"
+                write_atomic(path, lambda f, section=section: write_csv(f, tournament, section))
+                written.append(path)
+        elif fmt == JSON:
+            write_atomic(base_path + ".json", lambda f: write_json(f, tournament))
+            written.append(base_path + ".json")
+        elif fmt == HTML:
+            write_atomic(base_path + ".html", lambda f: write_html(f, tournament))
+            written.append(base_path + ".html")
+        else:
+            raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    return written
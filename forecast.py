@@ -0,0 +1,378 @@
+"""
+Cantidad de rondas y probabilidades de salir campeón.
+
+plan_rounds recomienda cuántas rondas jugar con E equipos. conflictos.md
+propone ⌈log2(E)⌉, que con una cantidad de equipos potencia de dos deja un
+único puntero; si no lo es, puede terminar con varios empatados arriba. El
+planificador simula torneos con 0, 1, ... rondas extra y recomienda la
+menor cantidad con la que el empate en la punta queda por debajo de
+TIE_TOLERANCE (o, si ninguna llega, la que menos empates deja).
+
+title_probabilities estima, con el torneo en curso, la probabilidad de cada
+equipo de terminar primero o entre los primeros k. Simula muchas veces las
+rondas que faltan, todas a la vez (por lotes):
+
+- La ronda con pareos vigentes usa esos pareos, y los partidos ya
+  confirmados cuentan con su resultado real.
+- Las rondas siguientes se parean como un suizo simplificado: por puntos,
+  1° contra 2°, 3° contra 4°, ... (los empates en puntos se sortean y no se
+  evitan revanchas), con BYE para el último si son impares.
+- Cada partido es una moneda, y los puntos del ganador y del perdedor se
+  sortean entre los resultados ya jugados en el torneo (1 a 0 si todavía
+  no hay ninguno). El BYE da los puntos de algún BYE anterior (o 1).
+
+Un empate en puntos al final se reparte en partes iguales (los desempates
+dependen de partidos que no se simulan). Para medir el motor real con sus
+pareos exactos está simulator.py; esto es una estimación rápida para
+mostrar en vivo.
+
+Con NumPy cada ronda de todas las simulaciones son unas pocas operaciones
+sobre matrices; sin NumPy se usa la misma simulación con listas y menos
+repeticiones (ver SIMULATIONS_PURE).
+
+El trabajo crece con simulaciones × equipos, así que la cantidad de
+simulaciones se achica con torneos grandes (ver default_simulations) y la
+matriz de puntos se arma por tandas de BATCH_CELLS celdas: con 10.000
+equipos ocupa unos pocos MB en lugar de cientos.
+
+Aun así una estimación puede tardar un par de segundos: la interfaz no la
+corre en su hilo sino en ForecastWorker. Para eso title_probabilities se
+divide en forecast_inputs (lee el torneo; rápido, en el hilo de la
+interfaz) y run_forecast (sólo números, en el hilo de trabajo).
+"""
+import random
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from simulator import log2_rounds
+from timing import timings
+from tournament_engine import BYE
+
+# Puestos que cuentan como "arriba" para la segunda probabilidad
+TOP_K = 3
+
+# Simulaciones por estimación (con NumPy / sin NumPy): como mucho, como mínimo y
+# tope de simulaciones × equipos (con más equipos se simula menos veces)
+SIMULATIONS = 4000
+MIN_SIMULATIONS = 200
+SIMULATION_CELLS = 1_000_000
+SIMULATIONS_PURE = 300
+MIN_SIMULATIONS_PURE = 20
+SIMULATION_CELLS_PURE = 30_000
+
+# Celdas (simulaciones × equipos) de cada tanda de la matriz de NumPy (int64: 2 MB)
+BATCH_CELLS = 250_000
+
+# Empate en la punta aceptable para recomendar una cantidad de rondas
+TIE_TOLERANCE = 0.05
+
+# Rondas extra que se prueban por encima de ⌈log2(E)⌉
+MAX_EXTRA_ROUNDS = 2
+
+# Resultados por defecto cuando el torneo no tiene partidos jugados
+DEFAULT_SCORES = [(1, 0)]
+DEFAULT_BYE_SCORES = [1]
+
+
+def default_simulations(teams=0):
+    """Simulaciones por estimación para `teams` equipos (menos cuanto más grande el torneo)."""
+    if np is not None:
+        most, least, cells = SIMULATIONS, MIN_SIMULATIONS, SIMULATION_CELLS
+    else:
+        most, least, cells = SIMULATIONS_PURE, MIN_SIMULATIONS_PURE, SIMULATION_CELLS_PURE
+    return max(least, min(most, cells // max(teams, 1)))
+
+
+def score_samples(tournament):
+    """
+    Resultados ya jugados en el torneo: ([(puntos ganador, puntos perdedor)],
+    [puntos de cada BYE]). Cada partido aparece en el historial de los dos
+    equipos; se toma una sola vez.
+    """
+    wins = []
+    byes = []
+    for team in tournament.teams.values():
+        for _round, opponent, points_for, points_against in team.history:
+            if opponent == BYE:
+                byes.append(points_for)
+            elif points_for > points_against or (points_for == points_against and team.id < opponent):
+                wins.append((points_for, points_against))
+    return wins or DEFAULT_SCORES, byes or DEFAULT_BYE_SCORES
+
+
+def _pending_round(tournament, slot):
+    """
+    Ronda vigente sin cerrar: (puntos ya confirmados por equipo, pares sin
+    resultado, equipos libres sin resultado), con los equipos como índices.
+    """
+    points = [0] * len(slot)
+    pairs = []
+    byes = []
+    if not tournament.results_pending():
+        return points, pairs, byes
+    scores = tournament.round_scores
+    for (team1_id, team2_id), result in zip(tournament.current_matches, scores.confirmed):
+        if team1_id not in slot or (team2_id != BYE and team2_id not in slot):
+            continue  # Un equipo quitado a mitad de ronda
+        if result is not None:
+            points[slot[team1_id]] += result[0]
+            if team2_id != BYE:
+                points[slot[team2_id]] += result[1]
+        elif team2_id == BYE:
+            byes.append(slot[team1_id])
+        else:
+            pairs.append((slot[team1_id], slot[team2_id]))
+    return points, pairs, byes
+
+
+def title_probabilities(tournament, total_rounds, top_k=TOP_K, simulations=None, seed=None):
+    """
+    Probabilidad de cada equipo de terminar primero y entre los primeros
+    `top_k` si el torneo se juega a `total_rounds` rondas. Devuelve
+    {id: (p_primero, p_top_k)}.
+    """
+    return run_forecast(forecast_inputs(tournament, total_rounds), top_k, simulations, seed)
+
+
+def forecast_inputs(tournament, total_rounds):
+    """
+    Todo lo que la estimación necesita del torneo, copiado (la simulación
+    puede correr en otro hilo mientras el torneo sigue cambiando).
+    """
+    teams = list(tournament.teams.values())
+    slot = {team.id: i for i, team in enumerate(teams)}
+    confirmed, pairs, byes = _pending_round(tournament, slot)
+    wins, bye_scores = score_samples(tournament)
+    return {
+        "ids": [team.id for team in teams],
+        "points": [team.total_points + extra for team, extra in zip(teams, confirmed)],
+        "pairs": pairs,
+        "byes": byes,
+        "free_rounds": max(0, total_rounds - tournament.current_round),
+        "wins": wins,
+        "bye_scores": bye_scores,
+    }
+
+
+def run_forecast(inputs, top_k=TOP_K, simulations=None, seed=None):
+    """La estimación de title_probabilities a partir de forecast_inputs."""
+    ids = inputs["ids"]
+    if not ids:
+        return {}
+    if simulations is None:
+        simulations = default_simulations(len(ids))
+    simulate = _simulate_numpy if np is not None else _simulate_pure
+    first, top = simulate(inputs["points"], inputs["pairs"], inputs["byes"], inputs["free_rounds"],
+                          inputs["wins"], inputs["bye_scores"], top_k, simulations, seed)
+    return {team_id: (first[i], top[i]) for i, team_id in enumerate(ids)}
+
+
+def plan_rounds(teams, tolerance=TIE_TOLERANCE, simulations=None, seed=1):
+    """
+    Cantidad de rondas recomendada para `teams` equipos (ver docstring del
+    módulo). Devuelve (rondas, [(rondas probadas, probabilidad de empate en
+    la punta), ...]).
+    """
+    if teams < 2:
+        return 1, [(1, 0.0)]
+    if simulations is None:
+        simulations = default_simulations(teams)
+    simulate = _simulate_numpy if np is not None else _simulate_pure
+    base = log2_rounds(teams)
+    # Una sola tanda de simulaciones: se mide el empate al pasar por cada cantidad candidata
+    candidates = list(range(base, base + MAX_EXTRA_ROUNDS + 1))
+    rates, _ = simulate([0] * teams, [], [], candidates[-1], DEFAULT_SCORES, DEFAULT_BYE_SCORES, 1,
+                        simulations, seed, tie_rounds=candidates)
+    tried = list(zip(candidates, rates))
+    for rounds, rate in tried:
+        if rate <= tolerance:
+            return rounds, tried
+    return min(tried, key=lambda item: item[1])[0], tried
+
+
+# =============================================================================
+# SIMULACIÓN POR LOTES
+# =============================================================================
+# Las dos versiones reciben lo mismo y devuelven (p_primero, p_top_k) por
+# equipo. Con tie_rounds (lista de cantidades de rondas) devuelven en cambio
+# ([fracción de simulaciones con más de un equipo en la punta después de
+# cada una de esas rondas], None).
+
+def _simulate_numpy(points, pairs, byes, rounds, wins, bye_scores, top_k, simulations, seed, tie_rounds=None):
+    # Por tandas de BATCH_CELLS celdas; cada tanda pesa según cuántas simulaciones tuvo
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_CELLS // max(len(points), 1))
+    done = 0
+    totals = None
+    while done < simulations:
+        size = min(batch, simulations - done)
+        result = _simulate_numpy_batch(rng, points, pairs, byes, rounds, wins, bye_scores, top_k, size, tie_rounds)
+        weighted = [np.asarray(part, dtype=float) * size for part in result if part is not None]
+        totals = weighted if totals is None else [a + b for a, b in zip(totals, weighted)]
+        done += size
+    averages = [(total / simulations).tolist() for total in totals]
+    if tie_rounds is not None:
+        return averages[0], None
+    return averages[0], averages[1]
+
+
+def _simulate_numpy_batch(rng, points, pairs, byes, rounds, wins, bye_scores, top_k, simulations, tie_rounds):
+    n = len(points)
+    rows = np.arange(simulations)[:, None]
+    totals = np.tile(np.asarray(points, dtype=np.int64), (simulations, 1))
+    wins = np.asarray(wins, dtype=np.int64)
+    bye_scores = np.asarray(bye_scores, dtype=np.int64)
+
+    def play(first, second):
+        drawn = wins[rng.integers(len(wins), size=first.shape)]
+        coin = rng.random(first.shape) < 0.5
+        totals[rows, first] += np.where(coin, drawn[..., 0], drawn[..., 1])
+        totals[rows, second] += np.where(coin, drawn[..., 1], drawn[..., 0])
+
+    def give_bye(team):
+        totals[rows, team] += bye_scores[rng.integers(len(bye_scores), size=team.shape)]
+
+    if pairs:
+        fixed = np.asarray(pairs)
+        play(np.broadcast_to(fixed[:, 0], (simulations, len(pairs))),
+             np.broadcast_to(fixed[:, 1], (simulations, len(pairs))))
+    if byes:
+        give_bye(np.broadcast_to(np.asarray(byes), (simulations, len(byes))))
+    ties = []
+    for played in range(1, rounds + 1):
+        # El ruido (< 1) sortea el orden dentro de cada puntaje sin mezclar puntajes
+        order = np.argsort(-(totals + rng.random(totals.shape)), axis=1)
+        if n % 2:
+            give_bye(order[:, -1:])
+            order = order[:, :-1]
+        play(order[:, 0::2], order[:, 1::2])
+        if tie_rounds is not None and played in tie_rounds:
+            best = totals.max(axis=1, keepdims=True)
+            ties.append(float(((totals == best).sum(axis=1) > 1).mean()))
+    if tie_rounds is not None:
+        return ties, None
+
+    # Cuántos equipos quedan por encima y cuántos empatados con cada uno (por
+    # simulación). Se corre cada fila a su propio tramo de valores para
+    # resolverlo con un solo searchsorted sobre todas las filas juntas.
+    low = int(totals.min())
+    span = int(totals.max()) - low + 1
+    offset = (np.arange(simulations, dtype=np.int64) * span - low)[:, None]
+    flat = (np.sort(totals, axis=1) + offset).ravel()
+    keys = (totals + offset).ravel()
+    base = (np.arange(simulations, dtype=np.int64) * n)[:, None]
+    below_or_equal = np.searchsorted(flat, keys, side="right").reshape(totals.shape) - base
+    below = np.searchsorted(flat, keys, side="left").reshape(totals.shape) - base
+    tied = below_or_equal - below
+    above = n - below_or_equal
+    first = np.where(above == 0, 1.0 / tied, 0.0).mean(axis=0)
+    top = np.clip((top_k - above) / tied, 0.0, 1.0).mean(axis=0)
+    return first, top
+
+
+def _simulate_pure(points, pairs, byes, rounds, wins, bye_scores, top_k, simulations, seed, tie_rounds=None):
+    rng = random.Random(seed)
+    n = len(points)
+    first = [0.0] * n
+    top = [0.0] * n
+    ties = [0] * len(tie_rounds or ())
+    for _ in range(simulations):
+        totals = list(points)
+        for round_number in range(rounds + 1):
+            if round_number == 0:
+                round_pairs, round_byes = pairs, byes
+            else:
+                noise = [rng.random() for _ in range(n)]
+                order = sorted(range(n), key=lambda i: -(totals[i] + noise[i]))
+                round_byes = order[-1:] if n % 2 else []
+                round_pairs = list(zip(order[0::2], order[1::2]))
+            for a, b in round_pairs:
+                won, lost = wins[rng.randrange(len(wins))]
+                if rng.random() < 0.5:
+                    totals[a] += won
+                    totals[b] += lost
+                else:
+                    totals[a] += lost
+                    totals[b] += won
+            for a in round_byes:
+                totals[a] += bye_scores[rng.randrange(len(bye_scores))]
+            if tie_rounds is not None and round_number in tie_rounds:
+                ties[tie_rounds.index(round_number)] += totals.count(max(totals)) > 1
+        if tie_rounds is not None:
+            continue
+
+        best = max(totals)
+        leaders = totals.count(best)
+        # Por puntaje: cuántos equipos quedan por encima y cuántos empatados
+        above = {}
+        tied = {}
+        for k, value in enumerate(sorted(totals, reverse=True)):
+            above.setdefault(value, k)
+            tied[value] = tied.get(value, 0) + 1
+        for i, value in enumerate(totals):
+            if value == best:
+                first[i] += 1 / leaders
+            top[i] += min(1.0, max(0.0, (top_k - above[value]) / tied[value]))
+    if tie_rounds is not None:
+        return [count / simulations for count in ties], None
+    return [value / simulations for value in first], [value / simulations for value in top]
+
+
+# =============================================================================
+# ESTIMACIÓN EN SEGUNDO PLANO
+# =============================================================================
+
+class ForecastWorker:
+    """
+    Hilo que corre las estimaciones sin frenar a la interfaz. Cada pedido
+    tiene un tipo ("plan", "forecast"...): si llega otro del mismo tipo
+    antes de empezarlo, sólo se corre el último. La interfaz levanta los
+    resultados con poll() desde su propio hilo (tkinter no admite que otro
+    hilo la toque), como con AutosaveWriter.
+    """
+    def __init__(self):
+        self._pending = {}   # tipo -> (función, argumentos), el último pedido gana
+        self._results = {}   # tipo -> resultado (o la excepción que lanzó)
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, kind, func, *args):
+        with self._cond:
+            self._pending[kind] = (func, args)
+            self._results.pop(kind, None)  # Un resultado viejo ya no sirve
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="forecast", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def busy(self):
+        with self._cond:
+            return self._busy or bool(self._pending)
+
+    def poll(self):
+        """Resultados terminados desde la última consulta: {tipo: resultado o excepción}."""
+        with self._cond:
+            results, self._results = self._results, {}
+        return results
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                kind = next(iter(self._pending))
+                func, args = self._pending.pop(kind)
+                self._busy = True
+            try:
+                with timings.measure(f"forecast_{kind}"):
+                    result = func(*args)
+            except Exception as e:  # Se informa en la interfaz, no tira el hilo
+                result = e
+            with self._cond:
+                if kind not in self._pending:  # Si llegó otro pedido del mismo tipo, éste quedó viejo
+                    self._results[kind] = result
+                self._busy = False
@@ -0,0 +1,191 @@
+"""
+Diario de eventos del torneo (sólo se agrega al final).
+
+En lugar de reescribir todo el archivo del torneo después de cada cambio,
+cada operación (alta de equipo, pareos, resultados, correcciones) se anota
+como una línea JSON al final de "<torneo>.journal". Cada tanto se escribe
+una foto completa del estado ("<torneo>.trugo", ver snapshot.py) y el diario
+vuelve a empezar vacío.
+
+Recuperación ante cortes:
+- Cada línea se escribe con flush + fsync; una línea a medio escribir al
+  final del diario se descarta al leerlo (y se recorta al reabrirlo).
+- La foto se escribe en un archivo temporal y se reemplaza de forma
+  atómica. Guarda el número del último evento que incluye, así los eventos
+  viejos que hayan quedado en el diario se ignoran al reproducirlo.
+
+La interfaz no espera al disco: le pasa al diario su AutosaveWriter y las
+líneas y fotos se escriben (con su fsync) desde ese hilo, en orden. Sin
+escritor, como en batch.py y las pruebas, se escriben en el momento.
+
+Este módulo no conoce el modelo: la reproducción de eventos la hace
+Tournament.load_journal (tournament_engine.py).
+"""
+import io
+import json
+import os
+
+from snapshot import SNAPSHOT_EXTENSION, read_header
+
+JOURNAL_EXTENSION = ".journal"
+
+# Mínimo de eventos entre fotos completas del torneo (ver Journal.needs_snapshot)
+COMPACT_EVERY = 50
+
+
+def snapshot_path_for(journal_path):
+    """Ruta de la foto que acompaña a un diario ("X.journal" -> "X.trugo")."""
+    base = journal_path[:-len(JOURNAL_EXTENSION)] if journal_path.endswith(JOURNAL_EXTENSION) else journal_path
+    return base + SNAPSHOT_EXTENSION
+
+
+def write_atomic(path, write):
+    """
+    Llama a write(f) sobre un archivo temporal y, si todo salió bien, lo pone
+    en lugar de `path` de una sola vez (nunca queda un archivo a medias).
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_journal(path):
+    """
+    Busca la foto y los eventos de un diario. Devuelve (ruta_foto, eventos),
+    donde ruta_foto es None si todavía no hay foto y eventos la lista de
+    eventos posteriores a la foto, en orden. Una última línea incompleta se
+    ignora.
+    """
+    snapshot_path = snapshot_path_for(path)
+    last_seq = 0
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            last_seq = read_header(f).get("seq", 0)
+    else:
+        snapshot_path = None
+
+    events = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Línea cortada por un cierre inesperado
+                event = json.loads(line)
+                if event["seq"] > last_seq:
+                    events.append(event)
+    return snapshot_path, events
+
+
+class Journal:
+    """
+    Diario abierto para escritura. Tournament llama a append() con cada
+    evento y a write_snapshot() cuando needs_snapshot() lo indica.
+    """
+    def __init__(self, path, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.snapshot_path = snapshot_path_for(path)
+        self.compact_every = compact_every
+        self.seq = 0           # Número del último evento escrito
+        self.since_snapshot = 0
+        self.since_size = 0    # Caracteres agregados al diario desde la última foto
+        self.snapshot_size = 0 # Tamaño de la última foto
+        self._file = None
+
+    def open(self, last_seq=0):
+        """
+        Abre el diario para seguir agregando eventos a partir de last_seq.
+        Si el archivo terminó con una línea incompleta, se recorta.
+        """
+        self.seq = last_seq
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    data = data[:data.rfind(b"\n") + 1]
+                    f.truncate(len(data))
+            self.since_size = len(data)
+        if os.path.exists(self.snapshot_path):
+            self.snapshot_size = os.path.getsize(self.snapshot_path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def append(self, event, writer=None):
+        """
+        Agrega un evento (dict) al final del diario y lo fuerza a disco. Con
+        `writer` (autosave.AutosaveWriter) la línea se arma acá y se escribe
+        en el hilo escritor, en orden con el resto de lo pedido.
+        """
+        self.seq += 1
+        event["seq"] = self.seq
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.since_snapshot += 1
+        self.since_size += len(line)
+        if writer is None:
+            self._write_line(line)
+        else:
+            writer.submit_call(self.path, lambda: self._write_line(line))
+
+    def _write_line(self, line):
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def needs_snapshot(self):
+        """
+        Hace falta una foto cuando pasaron compact_every eventos y además el
+        diario ya ocupa tanto como la última foto. Con muchos equipos la foto
+        es grande y cada evento chico: contar sólo eventos llevaría a
+        reescribir el torneo entero cada pocos resultados. Así cada foto se
+        paga con por lo menos otro tanto de diario, y reproducir el diario al
+        cargar nunca cuesta más que leer una foto.
+        """
+        return self.since_snapshot >= self.compact_every and self.since_size >= self.snapshot_size
+
+    def write_snapshot(self, write, writer=None):
+        """
+        Guarda la foto completa con write(f, seq) y vacía el diario. Si el
+        programa se corta entre ambos pasos, los eventos que quedaron en el
+        diario ya están incluidos en la foto y se ignoran al leer.
+
+        Con `writer` la foto se arma en memoria acá (es una copia del estado
+        de este momento) y se escribe en el hilo escritor, después de los
+        eventos pedidos antes.
+        """
+        self.since_snapshot = self.since_size = 0
+        if writer is None:
+            write_atomic(self.snapshot_path, lambda f: write(f, self.seq))
+            self.snapshot_size = os.path.getsize(self.snapshot_path)
+            self._truncate()
+            return
+        snapshot = io.StringIO()
+        write(snapshot, self.seq)
+        text = snapshot.getvalue()
+        self.snapshot_size = len(text)
+
+        def replace():
+            write_atomic(self.snapshot_path, lambda f: f.write(text))
+            self._truncate()
+        writer.submit_call(self.snapshot_path, replace)
+
+    def _truncate(self):
+        # Si no se puede reabrir, se sigue agregando al diario viejo: sus
+        # eventos ya incluidos en la foto se ignoran al leer (ver read_journal)
+        new_file = open(self.path, "a", encoding="utf-8")
+        new_file.truncate(0)
+        self._file.close()
+        self._file = new_file
+
+    def close(self, writer=None):
+        """Cierra el diario (con `writer`, después de escribir lo que tenga pendiente)."""
+        if writer is not None:
+            writer.submit_call(self.path, self._close_file)
+        else:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,378 @@
+"""
+Pantalla pública en vivo: pareos de la ronda y tabla de posiciones.
+
+En la sede se proyecta la pantalla del organizador, con las casillas de
+carga a la vista. Este módulo arma una vista pública, sólo de lectura, del
+mismo torneo:
+
+- public_view(tournament) es lo que se muestra: nombre, ronda, resultados
+  que faltan, los pareos vigentes (con el resultado ya confirmado de cada
+  mesa) y la tabla por puntos, como la tabla lateral de la pantalla de
+  partidos.
+- LivePublisher guarda la última vista publicada y, cada vez que se le
+  pide (después de un resultado, una ronda, una corrección), calcula sólo
+  las diferencias (diff_views) y se las pasa a quienes estén suscriptos:
+  la ventana de pantalla completa de tournament_app.py y LiveServer.
+- LiveServer es una página web local que se actualiza por Server-Sent
+  Events: al conectarse, cada pantalla recibe la vista completa y después
+  sólo las diferencias. Corre en su propio hilo, con asyncio: cada
+  diferencia se codifica una sola vez y se reparte a todas las pantallas
+  conectadas, así que diez o cincuenta pantallas no le cuestan nada a la
+  ventana del organizador. Una pantalla que no da abasto se desconecta y
+  el navegador se vuelve a conectar solo (con la vista completa).
+
+Uso (sin la interfaz):
+    server = LiveServer()
+    port = server.start("0.0.0.0", 8766)      # http://<esta máquina>:8766/
+    publisher = LivePublisher()
+    publisher.subscribe(server.publish)
+    publisher.publish(tournament)              # después de cada cambio
+
+Este módulo no importa tkinter.
+"""
+import asyncio
+import json
+import threading
+
+from tournament_engine import BYE
+
+DEFAULT_LIVE_HOST = "0.0.0.0"  # La ven las pantallas de la red local (es sólo de lectura)
+DEFAULT_LIVE_PORT = 8766
+
+# Segundos sin novedades tras los que se manda un comentario, para que los proxies no corten
+HEARTBEAT_SECONDS = 15
+
+# Mensajes pendientes a partir de los cuales se desconecta una pantalla que no los lee
+CLIENT_BACKLOG = 256
+
+VIEW_FIELDS = ("name", "round", "missing")
+VIEW_LISTS = ("matches", "standings")
+
+# =============================================================================
+# VISTA PÚBLICA Y DIFERENCIAS
+# =============================================================================
+
+def public_view(tournament):
+    """
+    Lo que muestra la pantalla pública, como dict apto para JSON. Cada
+    partido es [mesa, equipo1, equipo2, puntos1, puntos2] (puntos None si
+    todavía no hay resultado; BYE como equipo2 para el libre) y cada fila de
+    la tabla, [posición, equipo, puntos].
+    """
+    teams = tournament.teams
+    scores = tournament.round_scores
+    matches = []
+    for table, ((team1_id, team2_id), confirmed) in enumerate(zip(tournament.current_matches, scores.confirmed),
+                                                              start=1):
+        name2 = BYE if team2_id == BYE else teams[team2_id].name
+        score1, score2 = confirmed if confirmed is not None else (None, None)
+        matches.append([table, teams[team1_id].name, name2, score1, score2])
+    return {
+        "name": tournament.tournament_name,
+        "round": tournament.current_round,
+        "missing": scores.missing() if tournament.results_pending() else 0,
+        "matches": matches,
+        "standings": [[position, team.name, team.total_points]
+                      for position, team in enumerate(tournament.standings, start=1)],
+    }
+
+
+def _diff_rows(old, new):
+    changed = [[index, row] for index, row in enumerate(new) if index >= len(old) or old[index] != row]
+    if changed or len(old) != len(new):
+        return {"length": len(new), "rows": changed}
+    return None
+
+
+def diff_views(old, new):
+    """
+    Diferencias entre dos vistas: los campos que cambiaron y, para cada
+    lista, su largo nuevo y sólo las filas distintas como [posición, fila].
+    Devuelve {} si son iguales. Con `old` None, la vista entera.
+    """
+    delta = {}
+    for key in VIEW_FIELDS:
+        if old is None or old[key] != new[key]:
+            delta[key] = new[key]
+    for key in VIEW_LISTS:
+        rows = _diff_rows(old[key] if old is not None else [], new[key])
+        if rows is not None:
+            delta[key] = rows
+    return delta
+
+
+def apply_delta(view, delta):
+    """Aplica sobre `view` (en el lugar) unas diferencias de diff_views."""
+    for key in VIEW_FIELDS:
+        if key in delta:
+            view[key] = delta[key]
+    for key in VIEW_LISTS:
+        if key in delta:
+            rows = view.setdefault(key, [])
+            del rows[delta[key]["length"]:]
+            for index, row in delta[key]["rows"]:
+                if index < len(rows):
+                    rows[index] = row
+                else:
+                    rows.append(row)
+    return view
+
+
+def empty_view():
+    return {"name": "", "round": 0, "missing": 0, "matches": [], "standings": []}
+
+
+class LivePublisher:
+    """
+    Reparte las novedades del torneo a las pantallas públicas. Cada
+    suscriptor es una función que recibe las diferencias (un dict de
+    diff_views). Sin suscriptores, publish no calcula nada.
+    """
+    def __init__(self):
+        self.view = None
+        self.subscribers = []
+
+    def subscribe(self, callback, tournament=None):
+        """Suscribe `callback`. Devuelve la vista actual (para dibujarla entera), si hay torneo."""
+        self.subscribers.append(callback)
+        if tournament is not None and self.view is None:
+            self.view = public_view(tournament)
+        return self.view
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+        if not self.subscribers:
+            self.view = None
+
+    def publish(self, tournament):
+        """Calcula las diferencias con lo último publicado y se las pasa a los suscriptores."""
+        if not self.subscribers:
+            return {}
+        new = public_view(tournament)
+        delta = diff_views(self.view, new)
+        self.view = new
+        if delta:
+            for callback in list(self.subscribers):
+                callback(delta)
+        return delta
+
+
+# =============================================================================
+# PÁGINA WEB (SERVER-SENT EVENTS)
+# =============================================================================
+
+PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Trugo - En vivo</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; background: #1e1e2e; color: #cdd6f4; margin: 0; padding: 1.5em; }
+h1 { color: #89b4fa; margin: 0 0 .3em; font-size: 2.4em; }
+#info { font-size: 1.3em; margin-bottom: 1em; }
+main { display: flex; gap: 2em; }
+section { flex: 1; }
+h2 { color: #89b4fa; }
+table { width: 100%; border-collapse: collapse; font-size: 1.4em; }
+td { padding: .25em .5em; border-bottom: 1px solid #45475a; }
+td.n { text-align: right; } td.s { text-align: center; color: #a6e3a1; white-space: nowrap; }
+#estado { position: fixed; right: 1em; bottom: .5em; color: #f38ba8; }
+</style>
+</head>
+<body>
+<h1 id="name"></h1>
+<div id="info"></div>
+<main>
+<section><h2>Pareos</h2><table><tbody id="matches"></tbody></table></section>
+<section><h2>Posiciones</h2><table><tbody id="standings"></tbody></table></section>
+</main>
+<div id="estado"></div>
+<script>
+var view = {name: "", round: 0, missing: 0, matches: [], standings: []};
+var cells = {
+  matches: function (r) {
+    var score = r[3] === null ? "vs" : r[3] + " - " + r[4];
+    return [[r[0], "n"], [r[1], "n"], [score, "s"], [r[2] === "BYE" ? "--- LIBRE ---" : r[2], ""]];
+  },
+  standings: function (r) { return [[r[0], "n"], [r[1], ""], [r[2], "n"]]; }
+};
+function fill(tr, values) {
+  while (tr.cells.length < values.length) tr.insertCell();
+  values.forEach(function (v, i) { tr.cells[i].textContent = v[0]; tr.cells[i].className = v[1]; });
+}
+function apply(delta) {
+  ["name", "round", "missing"].forEach(function (k) { if (k in delta) view[k] = delta[k]; });
+  ["matches", "standings"].forEach(function (k) {
+    if (!(k in delta)) return;
+    var body = document.getElementById(k), d = delta[k];
+    while (body.rows.length > d.length) body.deleteRow(-1);
+    d.rows.forEach(function (item) {
+      var tr = item[0] < body.rows.length ? body.rows[item[0]] : body.insertRow();
+      fill(tr, cells[k](item[1]));
+    });
+  });
+  document.getElementById("name").textContent = view.name;
+  document.getElementById("info").textContent = "Ronda " + view.round +
+    (view.missing ? " \\u2014 faltan " + view.missing + " resultados" : "");
+}
+var source = new EventSource("events");
+source.addEventListener("snapshot", function (e) {
+  ["matches", "standings"].forEach(function (k) { document.getElementById(k).innerHTML = ""; });
+  apply(JSON.parse(e.data));
+  document.getElementById("estado").textContent = "";
+});
+source.addEventListener("delta", function (e) { apply(JSON.parse(e.data)); });
+source.onerror = function () { document.getElementById("estado").textContent = "Reconectando\\u2026"; };
+</script>
+</body>
+</html>
+"""
+
+
+def sse_event(kind, payload, seq=None):
+    """Un mensaje de Server-Sent Events ya codificado."""
+    head = f"id: {seq}\n" if seq is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class _Client:
+    """Una pantalla conectada: los mensajes que todavía no se le mandaron."""
+    __slots__ = ("pending", "wakeup", "dropped")
+
+    def __init__(self):
+        self.pending = []
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+
+
+class LiveServer:
+    """
+    Servidor de la página en vivo. Rutas: "/" (la página), "/events" (el
+    flujo de eventos: "snapshot" con la vista entera y luego "delta") y
+    "/state" (la vista actual en JSON). publish() se puede llamar desde
+    cualquier hilo.
+    """
+    def __init__(self):
+        self.view = empty_view()
+        self.seq = 0
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self, host=DEFAULT_LIVE_HOST, port=DEFAULT_LIVE_PORT):
+        """Arranca el servidor en un hilo propio. Devuelve el puerto (útil con port=0)."""
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                self._server = loop.run_until_complete(asyncio.start_server(self._handle_connection, host, port))
+                result["port"] = self._server.sockets[0].getsockname()[1]
+            except OSError as e:
+                result["error"] = e
+                loop.close()
+                return
+            finally:
+                ready.set()
+            self._loop = loop
+            loop.run_forever()
+            self._server.close()
+            # Las pantallas ya fueron avisadas (_close_all): se les da un momento
+            # para cortar y lo que siga esperando se cancela antes de cerrar el lazo
+            pending = asyncio.all_tasks(loop)
+            if pending:
+                loop.run_until_complete(asyncio.wait(pending, timeout=1))
+                for task in pending:
+                    task.cancel()
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="trugo-live", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if "error" in result:
+            raise result["error"]
+        return result["port"]
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._close_all)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def publish(self, delta):
+        """Manda unas diferencias (de diff_views) a todas las pantallas."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, delta)
+
+    def _broadcast(self, delta):
+        apply_delta(self.view, delta)
+        self.seq += 1
+        data = sse_event("delta", delta, self.seq)  # Una sola vez para todas las pantallas
+        for client in self._clients:
+            if len(client.pending) >= CLIENT_BACKLOG:
+                client.dropped = True
+            else:
+                client.pending.append(data)
+            client.wakeup.set()
+
+    def _close_all(self):
+        for client in self._clients:
+            client.dropped = True
+            client.wakeup.set()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Los encabezados no hacen falta
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+            if path == "/events":
+                await self._stream(writer)
+            elif path in ("/", "/index.html"):
+                self._respond(writer, 200, "text/html", PAGE.encode("utf-8"))
+            elif path == "/state":
+                self._respond(writer, 200, "application/json", json.dumps(self.view, ensure_ascii=False).encode("utf-8"))
+            else:
+                self._respond(writer, 404, "text/plain", "No encontrado".encode("utf-8"))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, status, content_type, data):
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                     f"Content-Type: {content_type}; charset=utf-8\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+
+    async def _stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        writer.write(sse_event("snapshot", self.view, self.seq))
+        await writer.drain()
+        client = _Client()
+        self._clients.add(client)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(client.wakeup.wait(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+                    continue
+                if client.dropped:
+                    break
+                pending, client.pending = client.pending, []
+                client.wakeup.clear()
+                writer.write(b"".join(pending))
+                await writer.drain()
+        finally:
+            self._clients.discard(client)
@@ -0,0 +1,248 @@
+"""
+Búsqueda de pareos con vuelta atrás (backtracking) y tiempo límite.
+
+El pareo codicioso elige siempre el primer rival nuevo hacia abajo en la
+tabla y, cuando llega a un callejón sin salida, fuerza una revancha sin
+revisar las elecciones anteriores. Esta búsqueda sí las revisa: recorre en
+profundidad las alternativas de cada equipo (los rivales nuevos más
+cercanos en la tabla) y se queda con el mejor pareo completo que encuentre.
+
+Cada pareo se evalúa por, en este orden, cantidad de revanchas y suma de las
+diferencias de puntos al cuadrado. La búsqueda arranca con un pareo ya
+armado (el codicioso) como mejor conocido, así que nunca devuelve algo peor,
+y poda toda rama que ya cuesta tanto como la mejor encontrada.
+
+Las ramas de la primera elección (con quién juega el primero de la tabla)
+se reparten entre procesos (ProcessPoolExecutor). Todos trabajan hasta el
+mismo instante límite y devuelven lo mejor que tengan; pasado el límite no
+se espera a nadie.
+
+El módulo trabaja con índices (posición en la tabla), no con equipos: ver
+tournament_engine.pair_search.
+"""
+import os
+import time
+
+# Cuántos rivales nuevos (los más cercanos en la tabla) se prueban por equipo
+SEARCH_WIDTH = 6
+
+# Cuántos equipos libres se revisan buscando esos rivales antes de conformarse con menos
+SEARCH_SCAN = 48
+
+# Cada cuántos pasos se mira el reloj
+CLOCK_EVERY = 512
+
+# Margen para recibir los resultados de los procesos después del límite (segundos)
+RESULT_GRACE = 0.2
+
+_executor = None
+_executor_workers = 0
+
+
+def _get_executor(workers):
+    """Reutiliza un único grupo de procesos (crearlo cuesta más que una búsqueda corta)."""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        # Se importa recién acá: concurrent.futures (con multiprocessing) demora
+        # el arranque de la interfaz, y la mayoría de los torneos no lo usa
+        from concurrent.futures import ProcessPoolExecutor
+        shutdown_executor()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def rematch_penalty(points):
+    """Costo de una revancha: más que todas las diferencias de puntos juntas."""
+    gap = max(points) - min(points) if points else 0
+    return gap * gap * (len(points) // 2 + 1) + 1
+
+
+def pairing_cost(pairs, points, opponents, penalty):
+    cost = 0
+    for i, j in pairs:
+        gap = points[i] - points[j]
+        cost += gap * gap
+        if j in opponents[i]:
+            cost += penalty
+    return cost
+
+
+class _Search:
+    """
+    Estado de una búsqueda en profundidad. Los equipos libres forman una
+    lista doblemente enlazada (con centinela en la posición n), así sacar y
+    volver a poner un equipo al deshacer una elección es O(1).
+    """
+    def __init__(self, points, opponents):
+        n = len(points)
+        self.n = n
+        self.points = points
+        self.opponents = opponents
+        self.penalty = rematch_penalty(points)
+        self.nxt = list(range(1, n + 1)) + [0]
+        self.prv = [n] + list(range(n))
+
+    def unlink(self, k):
+        nxt, prv = self.nxt, self.prv
+        nxt[prv[k]] = nxt[k]
+        prv[nxt[k]] = prv[k]
+
+    def relink(self, k):
+        nxt, prv = self.nxt, self.prv
+        nxt[prv[k]] = k
+        prv[nxt[k]] = k
+
+    def pair_cost(self, i, j):
+        gap = self.points[i] - self.points[j]
+        cost = gap * gap
+        if j in self.opponents[i]:
+            cost += self.penalty
+        return cost
+
+    def candidates(self, i):
+        """
+        Rivales a probar para `i` (ya sacado de la lista), del más conveniente
+        al menos: los primeros SEARCH_WIDTH libres que no enfrentó. Si en los
+        primeros SEARCH_SCAN no hay ninguno, el primero nuevo más abajo; y si
+        no queda ninguno nuevo, la revancha con el primero libre.
+        """
+        n, nxt, played = self.n, self.nxt, self.opponents[i]
+        fresh = []
+        scanned = 0
+        k = nxt[n]
+        while k != n and len(fresh) < SEARCH_WIDTH and (scanned < SEARCH_SCAN or not fresh):
+            if k not in played:
+                fresh.append(k)
+            k = nxt[k]
+            scanned += 1
+        if fresh:
+            return fresh
+        return [nxt[n]] if nxt[n] != n else []
+
+    def run(self, prefix, deadline, bound):
+        """
+        Busca el mejor pareo que empiece con los pares de `prefix` y cueste
+        menos que `bound`. Devuelve (costo, pares) o (bound, None) si no
+        encontró nada mejor antes de `deadline` (time.time()).
+        """
+        n, nxt = self.n, self.nxt
+        cost = 0
+        pairs = []
+        for i, j in prefix:
+            self.unlink(i)
+            self.unlink(j)
+            pairs.append((i, j))
+            cost += self.pair_cost(i, j)
+
+        best_cost, best_pairs = bound, None
+        if cost >= best_cost:
+            return best_cost, None
+        if nxt[n] == n:
+            return cost, list(pairs)
+
+        # Cada marco: [equipo, candidatos, próximo candidato, rival elegido, costo del par]
+        first = nxt[n]
+        self.unlink(first)
+        stack = [[first, self.candidates(first), 0, -1, 0]]
+        steps = 0
+        while stack:
+            steps += 1
+            if steps % CLOCK_EVERY == 0 and time.time() >= deadline:
+                break
+            frame = stack[-1]
+            i, cands, pos, chosen, chosen_cost = frame
+            if chosen >= 0:
+                # Deshacer la elección anterior de este marco antes de probar otra
+                self.relink(chosen)
+                pairs.pop()
+                cost -= chosen_cost
+                frame[3] = -1
+            if pos >= len(cands):
+                self.relink(i)
+                stack.pop()
+                continue
+            j = cands[pos]
+            frame[2] = pos + 1
+            c = self.pair_cost(i, j)
+            if cost + c >= best_cost:
+                continue
+            self.unlink(j)
+            pairs.append((i, j))
+            cost += c
+            frame[3], frame[4] = j, c
+
+            following = nxt[n]
+            if following == n:
+                best_cost, best_pairs = cost, list(pairs)
+                if best_cost == 0:
+                    break
+                continue
+            self.unlink(following)
+            stack.append([following, self.candidates(following), 0, -1, 0])
+
+        return best_cost, best_pairs
+
+
+def _search_subtree(points, opponents, prefix, deadline, bound):
+    """Punto de entrada de cada proceso: una rama de la búsqueda."""
+    return _Search(points, opponents).run(prefix, deadline, bound)
+
+
+def search_pairings(points, opponents, start, budget, workers=None):
+    """
+    Mejora el pareo `start` (lista de pares de índices que cubre a todos).
+
+    `points[i]` son los puntos del i-ésimo de la tabla y `opponents[i]` el
+    conjunto de índices que ya enfrentó. La búsqueda dura como mucho
+    `budget` segundos (más un pequeño margen para juntar resultados) y
+    reparte las ramas entre `workers` procesos (por defecto, uno por núcleo;
+    con 1 se busca en este mismo proceso). Devuelve el mejor pareo hallado.
+    """
+    deadline = time.time() + budget
+    penalty = rematch_penalty(points)
+    best_cost = pairing_cost(start, points, opponents, penalty)
+    best_pairs = start
+    if best_cost == 0 or len(points) < 4 or budget <= 0:
+        return best_pairs
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    search = _Search(points, opponents)
+    search.unlink(0)
+    roots = [[(0, j)] for j in search.candidates(0)]
+
+    if workers > 1 and len(roots) > 1:
+        try:
+            executor = _get_executor(workers)
+            futures = [executor.submit(_search_subtree, points, opponents, prefix, deadline, best_cost)
+                       for prefix in roots]
+        except (OSError, RuntimeError):
+            futures = []  # Sin procesos disponibles: se busca acá mismo
+        if futures:
+            from concurrent.futures import wait
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.time()) + RESULT_GRACE)
+            for future in not_done:
+                future.cancel()
+            for future in done:
+                if future.exception() is None:
+                    cost, pairs = future.result()
+                    if pairs is not None and cost < best_cost:
+                        best_cost, best_pairs = cost, pairs
+            return best_pairs
+
+    # En este proceso: las ramas se recorren una tras otra con el mismo límite
+    for prefix in roots:
+        if time.time() >= deadline:
+            break
+        cost, pairs = _Search(points, opponents).run(prefix, deadline, best_cost)
+        if pairs is not None:
+            best_cost, best_pairs = cost, pairs
+    return best_pairs
@@ -0,0 +1,472 @@
+"""
+Servidor HTTP/JSON local para manejar varios torneos a la vez.
+
+Un solo proceso aloja muchos torneos (identificados por su nombre) sobre el
+mismo motor que usa la interfaz (tournament_engine.Tournament). No hace
+falta nada fuera de la biblioteca estándar: el servidor es asyncio puro, con
+conexiones persistentes (keep-alive) y cuerpos JSON.
+
+Rutas:
+    GET  /tournaments                       nombres de los torneos alojados
+    POST /tournaments                       {"name": ..., "pairing_mode": ...}  crea un torneo
+    GET  /tournaments/<nombre>              ronda, pareos vigentes y si faltan resultados
+    POST /tournaments/<nombre>/teams        {"teams": [{"id": ..., "name": ...}, ...]}
+    POST /tournaments/<nombre>/pairings     arma la ronda siguiente
+    POST /tournaments/<nombre>/results      {"results": [[id1, id2, puntos1, puntos2], ...]}
+    POST /tournaments/<nombre>/matches/<n>  {"scores": [puntos1, puntos2], "version": v}
+    GET  /tournaments/<nombre>/standings    tabla con desempates
+
+Cada torneo tiene su propio candado: los pedidos a un mismo torneo se
+atienden de a uno, y los de torneos distintos no se esperan entre sí. El
+armado de pareos (que en modo búsqueda puede tardar hasta su tiempo límite)
+y, con --data-dir, los cambios que se anotan en el diario (cada uno espera su
+fsync) corren en un hilo aparte para no frenar al resto.
+
+Los resultados pueden llegar de a un partido (mesa n, numeradas desde 1),
+desde varios árbitros a la vez. Cada partido tiene una versión: quien carga
+indica sobre cuál lo hace (0 la primera vez) y, si otro se le adelantó,
+recibe 409 con la versión actual en lugar de pisar el resultado. Con el
+último resultado la ronda se cierra y la siguiente se arma en el momento
+(viene en la misma respuesta, en "next").
+
+Con --data-dir cada torneo anota sus cambios en un diario de eventos dentro
+de esa carpeta (ver journal.py), y al reiniciar el servidor se recuperan.
+
+Uso:
+    python server.py --port 8765 [--data-dir torneos/]
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+from collections import Counter
+from urllib.parse import unquote
+
+from journal import JOURNAL_EXTENSION
+from tiebreaks import TIEBREAK_ORDER
+from tournament_engine import BYE, PAIRING_MODES, PAIRING_GREEDY, ResultConflict, Tournament
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Tamaño máximo aceptado para el cuerpo de un pedido (bytes)
+MAX_BODY = 1 << 20
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """
+    Error que se devuelve al cliente como {"error": mensaje} con el código
+    dado; los datos extra (por ejemplo la versión actual) van en la misma respuesta.
+    """
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.extra = extra
+
+    def payload(self):
+        return dict(self.extra, error=self.message)
+
+
+# =============================================================================
+# TORNEOS ALOJADOS
+# =============================================================================
+
+class HostedTournament:
+    """Un torneo del servidor, con su candado."""
+    def __init__(self, tournament):
+        self.tournament = tournament
+        self.lock = asyncio.Lock()
+
+    def results_pending(self):
+        return self.tournament.results_pending()
+
+    def summary(self):
+        tournament = self.tournament
+        scores = tournament.round_scores
+        return {
+            "name": tournament.tournament_name,
+            "round": tournament.current_round,
+            "pairing_mode": tournament.pairing_mode,
+            "teams": len(tournament.teams),
+            "matches": [list(match) for match in tournament.current_matches],
+            "results": [list(result) if result else None for result in scores.confirmed],
+            "versions": scores.versions,
+            "results_pending": self.results_pending(),
+        }
+
+
+class TournamentHost:
+    """
+    Los torneos que atiende el servidor. Los métodos reciben el cuerpo JSON ya
+    decodificado y devuelven lo que se responde; ante un pedido inválido
+    lanzan HttpError.
+    """
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir
+        self.tournaments = {}
+        self.files = {}  # Archivo del diario (ver _file_key) -> nombre del torneo
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(data_dir, "*" + JOURNAL_EXTENSION))):
+                tournament = Tournament.load_journal(path)
+                self.tournaments[tournament.tournament_name] = HostedTournament(tournament)
+                self.files[self._file_key(path)] = tournament.tournament_name
+
+    @staticmethod
+    def _file_key(path):
+        # Sin distinguir mayúsculas: en Windows y macOS "Copa" y "copa" son el mismo archivo
+        return os.path.basename(path).casefold()
+
+    def get(self, name):
+        entry = self.tournaments.get(name)
+        if entry is None:
+            raise HttpError(404, f"No existe el torneo '{name}'.")
+        return entry
+
+    def list(self):
+        return {"tournaments": list(self.tournaments)}
+
+    def create(self, body):
+        name = body.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise HttpError(400, "Falta el nombre del torneo.")
+        if name in self.tournaments:
+            raise HttpError(409, f"Ya existe el torneo '{name}'.")
+        pairing_mode = body.get("pairing_mode", PAIRING_GREEDY)
+        if pairing_mode not in PAIRING_MODES:
+            raise HttpError(400, f"Modo de pareo desconocido: {pairing_mode}")
+
+        tournament = Tournament(name, pairing_mode)
+        # El archivo sale del nombre sin caracteres raros: "Copa" y "Copa!" comparten diario
+        filename = os.path.basename(tournament.journal_path())
+        other = self.files.get(self._file_key(filename))
+        if other is not None:
+            raise HttpError(409, f"El nombre '{name}' usa el mismo archivo que el torneo '{other}'.")
+        self.files[self._file_key(filename)] = name
+        entry = self.tournaments[name] = HostedTournament(tournament)
+        return entry
+
+    def attach_journal(self, entry):
+        """Con --data-dir, abre el diario del torneo recién creado (escribe su primera foto)."""
+        if self.data_dir:
+            tournament = entry.tournament
+            tournament.attach_journal(os.path.join(self.data_dir, os.path.basename(tournament.journal_path())))
+
+    def discard(self, entry):
+        name = entry.tournament.tournament_name
+        del self.tournaments[name]
+        self.files = {key: other for key, other in self.files.items() if other != name}
+
+    def add_teams(self, entry, body):
+        teams = body.get("teams")
+        if not isinstance(teams, list) or not teams:
+            raise HttpError(400, "Falta la lista de equipos.")
+        tournament = entry.tournament
+        new_ids = set()
+        for team in teams:
+            if not isinstance(team, dict) or not isinstance(team.get("id"), str) or not isinstance(team.get("name"), str):
+                raise HttpError(400, "Cada equipo necesita 'id' y 'name' (texto).")
+            team_id = team["id"].strip()
+            if not team_id or not team["name"].strip() or team_id == BYE:
+                raise HttpError(400, "El ID y el nombre no pueden estar vacíos.")
+            if team_id in tournament.teams or team_id in new_ids:
+                raise HttpError(409, f"El ID '{team_id}' ya existe.")
+            new_ids.add(team_id)
+        # Se valida todo antes de agregar: o entran todos o ninguno
+        tournament.add_teams((team["id"].strip(), team["name"].strip()) for team in teams)
+        return {"teams": len(tournament.teams)}
+
+    def check_can_pair(self, entry):
+        if entry.results_pending():
+            raise HttpError(409, f"Faltan los resultados de la ronda {entry.tournament.current_round}.")
+        if len(entry.tournament.teams) < 2:
+            raise HttpError(409, "Se necesitan al menos 2 equipos.")
+
+    def pair(self, entry):
+        matches = entry.tournament.generate_pairings()
+        return {"round": entry.tournament.current_round, "matches": [list(match) for match in matches]}
+
+    def submit_results(self, entry, body):
+        tournament = entry.tournament
+        if not entry.results_pending():
+            raise HttpError(409, "No hay una ronda esperando resultados.")
+        results = body.get("results")
+        if not isinstance(results, list):
+            raise HttpError(400, "Falta la lista de resultados.")
+
+        parsed = []
+        for result in results:
+            if not isinstance(result, list) or len(result) != 4:
+                raise HttpError(400, "Cada resultado es [id1, id2, puntos1, puntos2].")
+            team1_id, team2_id, s1, s2 = result
+            if not isinstance(team1_id, str) or not isinstance(team2_id, str):
+                raise HttpError(400, "Los IDs de los equipos deben ser texto.")
+            if not all(isinstance(s, int) and not isinstance(s, bool) and s >= 0 for s in (s1, s2)):
+                raise HttpError(400, "Los puntajes deben ser enteros no negativos.")
+            parsed.append((team1_id, team2_id, s1, s2))
+        if Counter((t1, t2) for t1, t2, _, _ in parsed) != Counter(tournament.current_matches):
+            raise HttpError(400, "Los resultados no coinciden con los pareos de la ronda.")
+
+        tournament.submit_results(parsed)
+        return {"round": tournament.current_round}
+
+    def submit_match(self, entry, index, body):
+        """
+        Resultado de un solo partido: {"scores": [p1, p2], "version": v}, donde
+        v es la versión sobre la que se carga (0 la primera vez). Devuelve la
+        versión nueva y si la ronda quedó cerrada.
+        """
+        tournament = entry.tournament
+        if not entry.results_pending():
+            raise HttpError(409, "No hay una ronda esperando resultados.")
+        scores = body.get("scores")
+        version = body.get("version", 0)
+        if not isinstance(scores, list) or len(scores) != 2 or not isinstance(version, int):
+            raise HttpError(400, "Se espera {\"scores\": [puntos1, puntos2], \"version\": n}.")
+        try:
+            index = int(index) - 1  # En la ruta las mesas se numeran desde 1
+            new_version, closed = tournament.record_match_result(index, scores[0], scores[1], version)
+        except ResultConflict as e:
+            raise HttpError(409, str(e), version=e.version)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return {"round": tournament.current_round, "match": index + 1, "version": new_version,
+                "round_closed": closed, "missing": tournament.round_scores.missing()}
+
+    def standings(self, entry):
+        rows = []
+        for position, (team, tiebreaks) in enumerate(entry.tournament.final_standings(), start=1):
+            rows.append({"rank": position, "id": team.id, "name": team.name, "points": team.total_points,
+                         "tiebreaks": dict(zip(TIEBREAK_ORDER, tiebreaks))})
+        return {"round": entry.tournament.current_round, "standings": rows}
+
+    def close(self):
+        for entry in self.tournaments.values():
+            entry.tournament.detach_journal()
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class TournamentServer:
+    """Servidor asyncio que traduce pedidos HTTP a llamadas de TournamentHost."""
+    def __init__(self, host=None, auto_pair=True):
+        self.host = host or TournamentHost()
+        self.auto_pair = auto_pair  # Armar la ronda siguiente apenas llega el último resultado
+        self._server = None
+
+    async def start(self, address=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_connection, address, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.host.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                # Sólo dígitos ASCII: int() aceptaría "-1", " 1_0" o "١٢"
+                length = headers.get("content-length") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    status, payload = 400, {"error": "Content-Length inválido."}
+                    keep_alive = False
+                elif int(length) > MAX_BODY:
+                    status, payload = 413, {"error": "Pedido demasiado grande."}
+                    keep_alive = False
+                else:
+                    length = int(length)
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, body)
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """Atiende un pedido y devuelve (código, respuesta)."""
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise HttpError(400, "El cuerpo debe ser un objeto JSON.")
+        except ValueError:
+            return 400, {"error": "JSON inválido."}
+        except HttpError as e:
+            return e.status, e.payload()
+
+        parts = [unquote(part) for part in target.split("?", 1)[0].strip("/").split("/")]
+        try:
+            return await self._route(method, parts, payload)
+        except HttpError as e:
+            return e.status, e.payload()
+        except Exception as e:  # Un error del motor no debe tirar el servidor
+            return 500, {"error": str(e)}
+
+    async def _route(self, method, parts, payload):
+        host = self.host
+        if parts[0] != "tournaments" or len(parts) > 4 or (len(parts) == 4 and parts[2] != "matches"):
+            raise HttpError(404, "Ruta desconocida.")
+
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, host.list()
+            if method == "POST":
+                entry = host.create(payload)
+                # Nadie más lo ve todavía: el candado se toma sin esperar y frena a
+                # los pedidos que lleguen antes de que el diario esté abierto
+                async with entry.lock:
+                    try:
+                        await self._in_thread(host.attach_journal, entry)
+                    except OSError as e:
+                        host.discard(entry)
+                        raise HttpError(500, f"No se pudo crear el diario: {e}")
+                    return 201, entry.summary()
+            raise HttpError(405, "Método no permitido.")
+
+        entry = host.get(parts[1])
+        action = parts[2] if len(parts) >= 3 else ""
+        expected = "GET" if action in ("", "standings") else "POST"
+        if method != expected:
+            raise HttpError(405, "Método no permitido.")
+
+        async with entry.lock:
+            if action == "":
+                return 200, entry.summary()
+            if action == "teams":
+                return 200, await self._journaled(entry, host.add_teams, entry, payload)
+            if action == "pairings":
+                host.check_can_pair(entry)
+                return 200, await self._pair(entry)
+            if action == "results":
+                return 200, await self._journaled(entry, host.submit_results, entry, payload)
+            if action == "matches" and len(parts) == 4:
+                response = await self._journaled(entry, host.submit_match, entry, parts[3], payload)
+                if response["round_closed"] and self.auto_pair:
+                    # Cerró la ronda: la siguiente se arma ya, sin esperar otro pedido
+                    response["next"] = await self._pair(entry)
+                return 200, response
+            if action == "standings":
+                return 200, host.standings(entry)
+        raise HttpError(404, "Ruta desconocida.")
+
+    async def _pair(self, entry):
+        # Puede tardar (modo búsqueda): en un hilo, con el torneo bloqueado
+        return await self._in_thread(self.host.pair, entry)
+
+    async def _journaled(self, entry, func, *args):
+        # Con diario cada cambio espera su fsync: en un hilo, con el torneo
+        # bloqueado, para no frenar a los demás torneos. Sin diario, acá mismo.
+        if entry.tournament.journal is None:
+            return func(*args)
+        return await self._in_thread(func, *args)
+
+    @staticmethod
+    async def _in_thread(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+# =============================================================================
+# CLIENTE
+# =============================================================================
+
+class Client:
+    """Cliente mínimo (una conexión persistente) para pruebas y para benchmarks/load_test.py."""
+    def __init__(self, address=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.address = address
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method, path, payload=None):
+        """Hace un pedido y devuelve (código, respuesta decodificada)."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.address, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.address}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        data = await self._reader.readexactly(length)
+        return status, json.loads(data)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de torneos de Trugo.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", help="Carpeta donde guardar los diarios de los torneos")
+    args = parser.parse_args()
+
+    async def run():
+        server = TournamentServer(TournamentHost(args.data_dir))
+        port = await server.start(args.host, args.port)
+        print(f"Servidor de torneos en http://{args.host}:{port}/tournaments")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Simulador de torneos (Monte Carlo) para medir la calidad de los pareos.
+
+Juega miles de torneos sintéticos con el motor real (Tournament) y
+resultados al azar, repartidos entre procesos, y resume:
+
+- revanchas forzadas (cruces entre equipos que ya se enfrentaron),
+- diferencia de puntos de cada pareo (promedio y máxima),
+- BYE repetidos (un equipo que queda libre por segunda vez),
+- tiempo de armado de cada ronda (generate_pairings),
+- cuántas veces se da el empate de conflictos.md: al terminar, más de un
+  equipo con el puntaje máximo (y, de esos, cuántas veces ni los
+  desempates los separan), y cuántas veces no queda ningún invicto.
+
+Cada partido se gana o se pierde (1 punto al ganador, 0 al perdedor; el
+BYE vale una victoria), así el puntaje es la cantidad de partidos ganados,
+como en conflictos.md. Los resultados pueden ser parejos ("random": cada
+partido es una moneda) o según la fuerza de cada equipo ("strength": una
+fuerza al azar por equipo, y la probabilidad de ganar sigue la fórmula Elo).
+
+Cada torneo usa su propia semilla (semilla base + número de torneo), así que
+una simulación se repite exactamente sin importar cuántos procesos se usen.
+
+Uso:
+    python simulator.py --teams 24 [--rounds 5] [--runs 2000] [--mode greedy]
+                        [--results random|strength] [--workers 4] [--seed 1]
+
+Sin --rounds se juegan ⌈log2(equipos)⌉ rondas (ver conflictos.md).
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tournament_engine import BYE, PAIRING_GREEDY, PAIRING_MODES, Tournament
+
+RESULTS_RANDOM = "random"      # Cada partido es una moneda
+RESULTS_STRENGTH = "strength"  # Gana más seguido el equipo más fuerte
+RESULT_MODELS = (RESULTS_RANDOM, RESULTS_STRENGTH)
+
+# Modelo de fuerza: desvío de las fuerzas (en puntos Elo) y escala de la fórmula
+STRENGTH_SPREAD = 200
+ELO_SCALE = 400
+
+# Torneos que cada proceso juega por tarea (menos idas y vueltas entre procesos)
+RUNS_PER_TASK = 50
+
+
+def log2_rounds(teams):
+    """Rondas que propone conflictos.md: ⌈log2(E)⌉ (al menos una)."""
+    return max(1, math.ceil(math.log2(teams))) if teams > 1 else 1
+
+
+def win_probability(strength1, strength2):
+    """Probabilidad de que gane el equipo de fuerza `strength1` (fórmula Elo)."""
+    return 1 / (1 + 10 ** ((strength2 - strength1) / ELO_SCALE))
+
+
+def simulate_tournament(teams, rounds, mode=PAIRING_GREEDY, results=RESULTS_RANDOM, seed=0):
+    """
+    Juega un torneo sintético y devuelve sus medidas (dict). Ver el
+    docstring del módulo para el modelo de resultados.
+    """
+    rng = random.Random(seed)
+    tournament = Tournament("Simulación", mode)
+    for i in range(teams):
+        tournament.add_team(str(i), f"Equipo {i}")
+    strength = {}
+    if results == RESULTS_STRENGTH:
+        strength = {team_id: rng.gauss(0, STRENGTH_SPREAD) for team_id in tournament.teams}
+
+    stats = {"rematches": 0, "pairs": 0, "gap_total": 0, "gap_max": 0, "repeat_byes": 0, "pair_times": []}
+    for _ in range(rounds):
+        had_bye = {team_id for team_id, team in tournament.teams.items() if team.received_bye}
+        points = {team_id: team.total_points for team_id, team in tournament.teams.items()}
+        start = time.perf_counter()
+        matches = tournament.generate_pairings()
+        stats["pair_times"].append(time.perf_counter() - start)
+
+        round_results = []
+        for team1_id, team2_id in matches:
+            if team2_id == BYE:
+                stats["repeat_byes"] += team1_id in had_bye
+                round_results.append((team1_id, BYE, 1, 0))
+                continue
+            # Revancha: ya se habían cruzado en una ronda anterior
+            if any(opponent == team2_id for _round, opponent, _pf, _pa in tournament.teams[team1_id].history):
+                stats["rematches"] += 1
+            gap = abs(points[team1_id] - points[team2_id])
+            stats["pairs"] += 1
+            stats["gap_total"] += gap
+            stats["gap_max"] = max(stats["gap_max"], gap)
+            if results == RESULTS_STRENGTH:
+                first_wins = rng.random() < win_probability(strength[team1_id], strength[team2_id])
+            else:
+                first_wins = rng.random() < 0.5
+            round_results.append((team1_id, team2_id, 1, 0) if first_wins else (team1_id, team2_id, 0, 1))
+        tournament.submit_results(round_results)
+
+    standings = tournament.final_standings()
+    best = standings[0][0].total_points
+    leaders = [(team, tiebreaks) for team, tiebreaks in standings if team.total_points == best]
+    stats["top_tie"] = len(leaders) > 1
+    stats["unresolved"] = len(leaders) > 1 and leaders[0][1] == leaders[1][1]
+    stats["undefeated"] = sum(1 for team, _ in standings if team.total_points == rounds)
+    return stats
+
+
+def _simulate_batch(teams, rounds, mode, results, seeds):
+    """Punto de entrada de cada proceso: varios torneos seguidos."""
+    return [simulate_tournament(teams, rounds, mode, results, seed) for seed in seeds]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(runs):
+    """Resume las medidas de varios torneos (lista de dicts de simulate_tournament)."""
+    count = len(runs)
+    pairs = sum(run["pairs"] for run in runs)
+    times = sorted(t for run in runs for t in run["pair_times"])
+    return {
+        "runs": count,
+        "rematches": sum(run["rematches"] for run in runs) / count,
+        "runs_with_rematch": sum(1 for run in runs if run["rematches"]) / count,
+        "gap_mean": sum(run["gap_total"] for run in runs) / pairs if pairs else 0.0,
+        "gap_max": max(run["gap_max"] for run in runs),
+        "repeat_byes": sum(run["repeat_byes"] for run in runs) / count,
+        "pair_ms_mean": sum(times) / len(times) * 1000 if times else 0.0,
+        "pair_ms_p95": _percentile(times, 0.95) * 1000,
+        "pair_ms_max": times[-1] * 1000 if times else 0.0,
+        "top_tie": sum(1 for run in runs if run["top_tie"]) / count,
+        "unresolved": sum(1 for run in runs if run["unresolved"]) / count,
+        "no_undefeated": sum(1 for run in runs if not run["undefeated"]) / count,
+    }
+
+
+def simulate(teams, rounds=None, runs=1000, mode=PAIRING_GREEDY, results=RESULTS_RANDOM, workers=None, seed=1):
+    """
+    Juega `runs` torneos de `teams` equipos y devuelve el resumen (ver
+    summarize). Reparte los torneos entre `workers` procesos (por defecto,
+    uno por núcleo; con 1 se juega todo en este proceso).
+    """
+    if rounds is None:
+        rounds = log2_rounds(teams)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = [seed + i for i in range(runs)]
+    batches = [seeds[i:i + RUNS_PER_TASK] for i in range(0, runs, RUNS_PER_TASK)]
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_simulate_batch, teams, rounds, mode, results, batch) for batch in batches]
+            measured = [stats for future in futures for stats in future.result()]
+    else:
+        measured = _simulate_batch(teams, rounds, mode, results, seeds)
+    return summarize(measured)
+
+
+def print_summary(summary, teams, rounds, mode, results):
+    print(f"{summary['runs']} torneos de {teams} equipos, {rounds} rondas, pareo {mode}, resultados {results}")
+    print(f"  revanchas forzadas:   {summary['rematches']:.3f} por torneo  "
+          f"({summary['runs_with_rematch']:.1%} de los torneos tiene alguna)")
+    print(f"  diferencia de puntos: {summary['gap_mean']:.3f} por pareo  (máxima {summary['gap_max']})")
+    print(f"  BYE repetidos:        {summary['repeat_byes']:.3f} por torneo")
+    print(f"  armado de ronda:      {summary['pair_ms_mean']:.2f} ms promedio  "
+          f"p95 {summary['pair_ms_p95']:.2f} ms  máx {summary['pair_ms_max']:.2f} ms")
+    print(f"  empate en la punta:   {summary['top_tie']:.1%} de los torneos  "
+          f"(sin resolver por desempates: {summary['unresolved']:.1%})")
+    print(f"  ningún invicto:       {summary['no_undefeated']:.1%} de los torneos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de torneos suizos (Monte Carlo).")
+    parser.add_argument("--teams", type=int, required=True)
+    parser.add_argument("--rounds", type=int, help="Por defecto ⌈log2(equipos)⌉")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--mode", choices=PAIRING_MODES, default=PAIRING_GREEDY)
+    parser.add_argument("--results", choices=RESULT_MODELS, default=RESULTS_RANDOM)
+    parser.add_argument("--workers", type=int, help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rounds = args.rounds if args.rounds is not None else log2_rounds(args.teams)
+    start = time.perf_counter()
+    summary = simulate(args.teams, rounds, args.runs, args.mode, args.results, args.workers, args.seed)
+    print_summary(summary, args.teams, rounds, args.mode, args.results)
+    print(f"  ({time.perf_counter() - start:.1f} s en total)")
+
+
+if __name__ == "__main__":
+    main()
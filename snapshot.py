@@ -0,0 +1,193 @@
+"""
+Formato compacto y versionado para guardar el estado de un torneo.
+
+El reporte .txt está pensado para leerlo una persona; este formato está
+pensado para leerlo el programa. Es JSON por líneas ("JSON lines"):
+
+    {"format": "trugo-snapshot", "version": 3, "name": ..., "round": ..., ...}   <- cabecera
+    ["10", "Los Tigres", 7, false, "3 5", "1 3 4 2 2 5 3 3"]                    <- un equipo por línea
+    ...
+    {"matches": [[0, 3], [5, -1], ...], "closed": false, ...}                  <- ronda vigente
+
+Los equipos se escriben en orden de inscripción y se referencian por su
+posición en el archivo (tabla de IDs interna): los rivales y los pareos son
+enteros, y -1 representa el BYE. Los rivales de cada equipo van en un solo
+texto, separados por espacios (desde la versión 3; antes, una lista JSON):
+decodificar un texto es la mitad de caro que una lista de enteros, y se
+pasa a bits recién en el primer pareo (ver Team.set_opponent_indices). El
+último campo de cada equipo es su historial: cuatro números por partido
+(ronda, rival, puntos propios y puntos del rival), también en un solo texto
+(desde la versión 2; en la 1 no existe). Ese texto se decodifica recién
+cuando alguien usa el historial (ver Team.set_history_loader), así la carga
+no paga por el historial. Como cada dato
+va escapado en JSON, un nombre con comas o con "(ID: " ya no rompe nada.
+
+La última línea trae los pareos vigentes y el estado de su planilla: si la
+ronda ya se cerró ("closed") y los resultados confirmados partido por
+partido, con su versión ("confirmed", "versions"; ver RoundScores). Son
+campos opcionales: si faltan, la planilla empieza vacía.
+
+La lectura es por streaming (por bloques de líneas) y arma la tabla de
+posiciones de una sola vez al final, en lugar de insertar equipo por equipo.
+
+Este módulo no importa el motor: recibe el torneo (o su clase) como argumento.
+"""
+import gc
+import json
+from functools import partial
+from itertools import islice
+
+
+SNAPSHOT_FORMAT = "trugo-snapshot"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_EXTENSION = ".trugo"
+
+BYE_INDEX = -1
+
+# Líneas que se decodifican juntas al leer (ver _records)
+CHUNK_LINES = 2048
+
+
+def write_snapshot(f, tournament, seq=0, bye="BYE"):
+    """Escribe el torneo en el archivo de texto abierto `f`."""
+    teams = sorted(tournament.teams.values(), key=lambda t: t.seq)
+    index = {team.id: i for i, team in enumerate(teams)}
+    index[bye] = BYE_INDEX
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "name": tournament.tournament_name,
+        "round": tournament.current_round,
+        "pairing_mode": tournament.pairing_mode,
+        "teams": len(teams),
+        "seq": seq,
+    }
+    f.write(dumps(header) + "\n")
+
+    for team in teams:
+        history = " ".join(f"{rnd} {index[oid]} {pf} {pa}" for rnd, oid, pf, pa in team.history if oid in index)
+        opponents = " ".join(map(str, sorted(index[oid] for oid in team.opponents_played if oid in index)))
+        f.write(dumps([team.id, team.name, team.total_points, team.received_bye, opponents, history]) + "\n")
+
+    scores = tournament.round_scores
+    f.write(dumps({"matches": [[index[t1], index[t2]] for t1, t2 in tournament.current_matches],
+                   "closed": scores.closed,
+                   "confirmed": scores.confirmed,
+                   "versions": scores.versions}) + "\n")
+
+
+def read_header(f):
+    """Lee y valida la cabecera. Lanza ValueError si el archivo no es una foto válida."""
+    line = f.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        raise ValueError("El archivo no es una foto de torneo.")
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("El archivo no es una foto de torneo.")
+    if header.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de foto no soportada: {header.get('version')}")
+    return header
+
+
+def _records(f, chunk_lines=CHUNK_LINES):
+    """
+    Recorre los registros del archivo por bloques de líneas: cada bloque se
+    decodifica con una sola llamada a json.loads ("[" + líneas + "]"), que es
+    mucho más rápido que una llamada por línea y no carga todo el archivo.
+    """
+    loads = json.loads
+    while True:
+        lines = list(islice(f, chunk_lines))
+        if not lines:
+            return
+        yield from loads("[" + ",".join(lines) + "]")
+
+
+def _unpack_history(text, ids_and_bye):
+    """"ronda rival pf pa ..." -> [(ronda, id_rival, pf, pa), ...]"""
+    flat = list(map(int, text.split()))
+    return list(zip(flat[0::4], map(ids_and_bye.__getitem__, flat[1::4]), flat[2::4], flat[3::4]))
+
+
+def read_snapshot(f, tournament_cls, team_cls, bye="BYE"):
+    """
+    Lee una foto desde el archivo abierto `f` y devuelve (torneo, cabecera).
+    Los equipos se crean con team_cls y el torneo con tournament_cls.
+    """
+    header = read_header(f)
+    # Se crean decenas de miles de objetos que viven todo el torneo: pausar el
+    # recolector de ciclos durante la carga evita recorrerlos una y otra vez.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _read_body(f, header, tournament_cls, team_cls, bye)
+    finally:
+        # Al reanudarlo, el recolector recorrería enseguida todo lo recién
+        # creado como objetos jóvenes (decenas de ms con 10.000 equipos).
+        # freeze + unfreeze los pasa directo a la generación más vieja sin
+        # recorrerlos; los ciclos que haya se juntan en la próxima pasada completa.
+        gc.freeze()
+        gc.unfreeze()
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _read_body(f, header, tournament_cls, team_cls, bye):
+    # Los equipos se crean directamente con la tabla de IDs del torneo (ver team_store.py)
+    tournament = tournament_cls(header["name"])
+    id_table = tournament.id_table
+    teams = []
+    ids = []
+    opponent_lists = []
+    histories = []
+    matches = []
+    round_state = {}
+    for record in _records(f):
+        if isinstance(record, list):
+            team_id, name, points, received_bye, opponents = record[:5]
+            team = team_cls(team_id, name, id_table)
+            team.total_points = points
+            team.received_bye = received_bye
+            teams.append(team)
+            ids.append(team_id)
+            opponent_lists.append(opponents)
+            histories.append(record[5] if len(record) > 5 else "")
+        elif "matches" in record:
+            matches = record["matches"]
+            round_state = record
+
+    if len(teams) != header["teams"]:
+        raise ValueError("La foto está incompleta.")
+
+    # Los rivales se resuelven al final: pueden apuntar a equipos que aparecen después.
+    # En un torneo recién creado el índice de cada equipo es su posición en el archivo.
+    slots = [team.index for team in teams]
+    in_order = slots == list(range(len(teams)))
+    # Con el BYE al final de la tabla, ids_and_bye[BYE_INDEX] devuelve el BYE
+    ids_and_bye = ids + [bye]
+    for team, opponents, history in zip(teams, opponent_lists, histories):
+        # Los bits se arman al usarlos (el primer pareo): cargar sólo guarda los índices
+        if not in_order:
+            if isinstance(opponents, str):
+                opponents = map(int, opponents.split())
+            opponents = list(map(slots.__getitem__, opponents))
+        team.set_opponent_indices(opponents)
+        if history:
+            team.set_history_loader(partial(_unpack_history, history, ids_and_bye))
+
+    if "pairing_mode" in header:
+        tournament.pairing_mode = header["pairing_mode"]
+    tournament.current_round = header["round"]
+    tournament.teams = {team.id: team for team in teams}
+    tournament.current_matches = [(ids_and_bye[a], ids_and_bye[b]) for a, b in matches]
+
+    scores = tournament.round_scores
+    for index, (result, version) in enumerate(zip(round_state.get("confirmed", ()), round_state.get("versions", ()))):
+        if result is not None:
+            scores.confirm(index, result[0], result[1], 0)
+            scores.versions[index] = version
+    scores.closed = round_state.get("closed", False)
+    return tournament, header
@@ -0,0 +1,305 @@
+"""
+Almacenamiento opcional de torneos en SQLite.
+
+Una sola base puede guardar todos los torneos de una temporada, con el
+detalle de cada ronda y cada partido (no sólo los totales). El torneo le
+envía los mismos eventos que anota en su diario (ver Tournament._record) y
+cada uno se traduce en una transacción: en particular, los resultados de
+una ronda se guardan todos juntos o ninguno.
+
+Uso:
+    store = SQLiteStore("trugo_torneos.sqlite3")
+    tournament.attach_store(store)          # guarda el estado actual y sigue los cambios
+    store.team_results(name="Los Tigres")   # todos los partidos de un equipo, en todos los torneos
+"""
+from tournament_engine import BYE, Tournament
+
+DEFAULT_DB_PATH = "trugo_torneos.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id            INTEGER PRIMARY KEY,
+    name          TEXT NOT NULL UNIQUE,
+    pairing_mode  TEXT NOT NULL,
+    current_round INTEGER NOT NULL DEFAULT 0,
+    created_at    TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    team_id       TEXT NOT NULL,
+    name          TEXT NOT NULL,
+    points        INTEGER NOT NULL DEFAULT 0,
+    received_bye  INTEGER NOT NULL DEFAULT 0,
+    seq           INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_teams_name ON teams(name);
+
+CREATE TABLE IF NOT EXISTS rounds (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    number        INTEGER NOT NULL,
+    paired_at     TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    completed_at  TEXT,
+    PRIMARY KEY (tournament_id, number)
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    round         INTEGER NOT NULL,
+    table_no      INTEGER NOT NULL,
+    team1_id      TEXT NOT NULL,
+    team2_id      TEXT NOT NULL,
+    score1        INTEGER,
+    score2        INTEGER,
+    PRIMARY KEY (tournament_id, round, table_no)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_team1 ON matches(tournament_id, team1_id);
+CREATE INDEX IF NOT EXISTS idx_matches_team2 ON matches(tournament_id, team2_id);
+
+CREATE TABLE IF NOT EXISTS corrections (
+    id            INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    team_id       TEXT NOT NULL,
+    old_points    INTEGER NOT NULL,
+    new_points    INTEGER NOT NULL,
+    round         INTEGER,
+    reason        TEXT,
+    created_at    TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Columnas agregadas después de la primera versión: (tabla, columna, tipo)
+MIGRATIONS = (
+    ("corrections", "round", "INTEGER"),
+    ("corrections", "reason", "TEXT"),
+)
+
+
+class SQLiteStore:
+    """Base de datos de torneos. Cada torneo se identifica por su nombre."""
+    def __init__(self, path=DEFAULT_DB_PATH):
+        import sqlite3  # Recién al abrir la base: la interfaz sólo necesita DEFAULT_DB_PATH al arrancar
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._ids = {}  # nombre del torneo -> id en la base
+
+    def close(self):
+        self.conn.close()
+
+    def _migrate(self):
+        """Agrega a una base vieja las columnas que le falten."""
+        with self.conn:
+            for table, column, kind in MIGRATIONS:
+                columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    def _tournament_id(self, name):
+        if name not in self._ids:
+            row = self.conn.execute("SELECT id FROM tournaments WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(f"El torneo '{name}' no está en la base.")
+            self._ids[name] = row[0]
+        return self._ids[name]
+
+    # --- Escritura -------------------------------------------------------
+
+    def save_tournament(self, tournament):
+        """
+        Guarda el estado completo del torneo (reemplaza lo que hubiera con el
+        mismo nombre). Los partidos vigentes quedan cargados sin resultado.
+        Las correcciones anotadas se conservan: son el registro de auditoría.
+        """
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM tournaments WHERE name = ?",
+                                    (tournament.tournament_name,)).fetchone()
+            if row is None:
+                tid = self.conn.execute(
+                    "INSERT INTO tournaments (name, pairing_mode, current_round) VALUES (?, ?, ?)",
+                    (tournament.tournament_name, tournament.pairing_mode, tournament.current_round)).lastrowid
+            else:
+                tid = row[0]
+                self.conn.execute("UPDATE tournaments SET pairing_mode = ?, current_round = ? WHERE id = ?",
+                                  (tournament.pairing_mode, tournament.current_round, tid))
+                for table in ("teams", "rounds", "matches"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE tournament_id = ?", (tid,))
+            self._ids[tournament.tournament_name] = tid
+            self.conn.executemany(
+                "INSERT INTO teams (tournament_id, team_id, name, points, received_bye, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                [(tid, t.id, t.name, t.total_points, int(t.received_bye), t.seq) for t in tournament.teams.values()])
+            if tournament.current_matches:
+                self._insert_pairings(tid, tournament.current_round, tournament.current_matches)
+        return tid
+
+    def _insert_pairings(self, tid, round_number, matches):
+        self.conn.execute("INSERT OR REPLACE INTO rounds (tournament_id, number) VALUES (?, ?)", (tid, round_number))
+        self.conn.execute("DELETE FROM matches WHERE tournament_id = ? AND round = ?", (tid, round_number))
+        self.conn.executemany(
+            "INSERT INTO matches (tournament_id, round, table_no, team1_id, team2_id) VALUES (?, ?, ?, ?, ?)",
+            [(tid, round_number, table, t1, t2) for table, (t1, t2) in enumerate(matches, start=1)])
+
+    def record(self, tournament, event):
+        """Aplica en la base un evento del torneo (mismo formato que el diario)."""
+        tid = self._tournament_id(tournament.tournament_name)
+        kind = event["type"]
+        with self.conn:
+            if kind == "team_added":
+                team = tournament.teams[event["id"]]
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO teams (tournament_id, team_id, name, points, received_bye, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                    (tid, team.id, team.name, team.total_points, int(team.received_bye), team.seq))
+            elif kind == "teams_added":
+                teams = [tournament.teams[team_id] for team_id, _name in event["teams"]]
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO teams (tournament_id, team_id, name, points, received_bye, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(tid, t.id, t.name, t.total_points, int(t.received_bye), t.seq) for t in teams])
+            elif kind == "team_removed":
+                self.conn.execute("DELETE FROM teams WHERE tournament_id = ? AND team_id = ?", (tid, event["id"]))
+            elif kind == "pairings":
+                self._insert_pairings(tid, event["round"], event["matches"])
+                byes = [(tid, t1) for t1, t2 in event["matches"] if t2 == BYE]
+                self.conn.executemany("UPDATE teams SET received_bye = 1 WHERE tournament_id = ? AND team_id = ?", byes)
+                self.conn.execute("UPDATE tournaments SET current_round = ? WHERE id = ?", (event["round"], tid))
+            elif kind == "match_result":
+                # Cada resultado queda guardado apenas llega, antes de que cierre la ronda
+                s1, s2 = event["scores"]
+                self.conn.execute(
+                    "UPDATE matches SET score1 = ?, score2 = ? WHERE tournament_id = ? AND round = ? AND table_no = ?",
+                    (s1, s2, tid, event["round"], event["index"] + 1))
+            elif kind == "round_results":
+                # Todos los resultados de la ronda y los nuevos totales, en una sola transacción
+                self.conn.executemany(
+                    "UPDATE matches SET score1 = ?, score2 = ? WHERE tournament_id = ? AND round = ? AND team1_id = ? AND team2_id = ?",
+                    [(s1, s2, tid, event["round"], t1, t2) for t1, t2, s1, s2 in event["results"]])
+                self.conn.execute("UPDATE rounds SET completed_at = CURRENT_TIMESTAMP WHERE tournament_id = ? AND number = ?",
+                                  (tid, event["round"]))
+                self._update_points(tid, tournament, {tid_ for r in event["results"] for tid_ in r[:2] if tid_ != BYE})
+            elif kind == "round_points":
+                # Sin detalle por partido: cada lado anota los puntos que sumó en la ronda
+                points = event["points"]
+                self.conn.executemany(
+                    "UPDATE matches SET score1 = ?, score2 = ? WHERE tournament_id = ? AND round = ? AND team1_id = ? AND team2_id = ?",
+                    [(points.get(t1, 0), points.get(t2, 0) if t2 != BYE else 0, tid, event["round"], t1, t2)
+                     for t1, t2 in tournament.current_matches if t1 in points or t2 in points])
+                self.conn.execute("UPDATE rounds SET completed_at = CURRENT_TIMESTAMP WHERE tournament_id = ? AND number = ?",
+                                  (tid, event["round"]))
+                self._update_points(tid, tournament, points)
+            elif kind == "score_corrected":
+                self.conn.execute(
+                    "INSERT INTO corrections (tournament_id, team_id, old_points, new_points, round, reason) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (tid, event["id"], event["old"], event["new"], event.get("round"), event.get("reason")))
+                self._update_points(tid, tournament, [event["id"]])
+
+    def _update_points(self, tid, tournament, team_ids):
+        self.conn.executemany(
+            "UPDATE teams SET points = ? WHERE tournament_id = ? AND team_id = ?",
+            [(tournament.teams[team_id].total_points, tid, team_id) for team_id in team_ids])
+
+    # --- Lectura ---------------------------------------------------------
+
+    def list_tournaments(self):
+        """Nombres de los torneos guardados, del más nuevo al más viejo."""
+        return [row[0] for row in self.conn.execute("SELECT name FROM tournaments ORDER BY id DESC")]
+
+    def load_tournament(self, name):
+        """Reconstruye un Tournament desde la base."""
+        tid = self._tournament_id(name)
+        pairing_mode, current_round = self.conn.execute(
+            "SELECT pairing_mode, current_round FROM tournaments WHERE id = ?", (tid,)).fetchone()
+
+        tournament = Tournament(name, pairing_mode)
+        tournament.current_round = current_round
+        for team_id, team_name, points, received_bye in self.conn.execute(
+                "SELECT team_id, name, points, received_bye FROM teams WHERE tournament_id = ? ORDER BY seq", (tid,)):
+            team = tournament.add_team(team_id, team_name)
+            team.total_points = points
+            team.received_bye = bool(received_bye)
+
+        teams = tournament.teams
+        completed = {row[0] for row in self.conn.execute(
+            "SELECT number FROM rounds WHERE tournament_id = ? AND completed_at IS NOT NULL", (tid,))}
+        current_matches = []
+        current_results = []
+        for round_number, t1, t2, s1, s2 in self.conn.execute(
+                "SELECT round, team1_id, team2_id, score1, score2 FROM matches WHERE tournament_id = ? ORDER BY round, table_no",
+                (tid,)):
+            if t2 != BYE and t1 in teams and t2 in teams:
+                teams[t1].opponents_played.add(t2)
+                teams[t2].opponents_played.add(t1)
+            if s1 is not None and round_number not in completed:
+                # Resultado cargado partido por partido en una ronda que todavía no cerró
+                if round_number == current_round:
+                    current_results.append((len(current_matches), s1, s2))
+            elif s1 is not None:
+                if t1 in teams:
+                    teams[t1].history.append((round_number, t2, s1, s2))
+                if t2 in teams:
+                    teams[t2].history.append((round_number, t1, s2, s1))
+            if round_number == current_round:
+                current_matches.append((t1, t2))
+        tournament.current_matches = current_matches
+        for index, s1, s2 in current_results:
+            tournament.round_scores.confirm(index, s1, s2, 0)
+        tournament.round_scores.closed = current_round in completed
+        tournament.tiebreaks.rebuild(list(teams.values()))
+        return tournament
+
+    def team_results(self, name=None, team_id=None, tournament_name=None):
+        """
+        Partidos jugados por un equipo, buscado por nombre (en todos los
+        torneos) o por ID dentro de un torneo. Cada fila es un dict con
+        torneo, ronda, rival y puntajes desde el punto de vista del equipo.
+        """
+        conditions = []
+        params = []
+        if name is not None:
+            conditions.append("t.name = ?")
+            params.append(name)
+        if team_id is not None:
+            conditions.append("t.team_id = ?")
+            params.append(team_id)
+        if tournament_name is not None:
+            conditions.append("tr.name = ?")
+            params.append(tournament_name)
+        where = " AND ".join(conditions) or "1"
+
+        # Dos consultas (equipo como local y como visitante) para aprovechar ambos índices
+        query = f"""
+            SELECT tr.name, m.round, m.table_no, m.team2_id, m.score1, m.score2
+              FROM teams t JOIN tournaments tr ON tr.id = t.tournament_id
+              JOIN matches m ON m.tournament_id = t.tournament_id AND m.team1_id = t.team_id
+             WHERE {where}
+            UNION ALL
+            SELECT tr.name, m.round, m.table_no, m.team1_id, m.score2, m.score1
+              FROM teams t JOIN tournaments tr ON tr.id = t.tournament_id
+              JOIN matches m ON m.tournament_id = t.tournament_id AND m.team2_id = t.team_id
+             WHERE {where}
+            ORDER BY 1, 2
+        """
+        return [
+            {"tournament": row[0], "round": row[1], "table": row[2], "opponent": row[3],
+             "score": row[4], "opponent_score": row[5]}
+            for row in self.conn.execute(query, params + params)
+        ]
+
+    def corrections(self, tournament_name):
+        """
+        Correcciones manuales de puntaje de un torneo, de la más vieja a la
+        más nueva. Cada fila es un dict con equipo, puntajes anterior y
+        nuevo, ronda, motivo y fecha.
+        """
+        tid = self._tournament_id(tournament_name)
+        query = """
+            SELECT team_id, old_points, new_points, round, reason, created_at
+              FROM corrections WHERE tournament_id = ? ORDER BY id
+        """
+        return [
+            {"team_id": row[0], "old": row[1], "new": row[2], "round": row[3], "reason": row[4], "at": row[5]}
+            for row in self.conn.execute(query, (tid,))
+        ]
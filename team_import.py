@@ -0,0 +1,123 @@
+"""
+Importación de equipos en bloque (archivo CSV o texto pegado).
+
+Cargar un evento de cientos de equipos de a uno por el formulario lleva
+mucho tiempo. parse_teams lee las filas a medida que llegan (un archivo
+abierto se recorre sin cargarlo entero) y las valida todas en una sola
+pasada con las mismas reglas que el formulario:
+
+- ID y nombre presentes,
+- ID numérico,
+- ID que no esté ya inscripto ni repetido dentro del mismo archivo,
+- nombre sin números.
+
+Cada fila tiene un ID y un nombre, en cualquier orden ("10,Los Pumas" o
+"Los Pumas,10": como el nombre no puede tener números, la columna numérica
+es el ID). El separador puede ser coma, punto y coma o tabulación (lo que
+queda al copiar dos columnas de una planilla); se toma el de la primera
+fila con datos. Las filas vacías se saltean, y una primera fila sin ningún
+número se toma como encabezado ("id,nombre").
+
+Devuelve los equipos válidos y la lista completa de filas con problemas,
+para mostrarlas todas juntas. Este módulo no importa el motor ni tkinter.
+"""
+import csv
+import io
+from itertools import chain
+
+DELIMITERS = ("\t", ";", ",")
+
+# Filas con problemas que se muestran en la interfaz (el resto se resume)
+MAX_REPORTED_ERRORS = 10
+
+
+def validate_team(team_id, name, existing_ids):
+    """
+    Reglas de alta de un equipo. Devuelve el mensaje de error o None si el
+    equipo es válido. `existing_ids` es cualquier contenedor de IDs ya usados.
+    """
+    if not name or not team_id:
+        return "Por favor completa ambos campos."
+    if not team_id.isdigit():
+        return "El ID debe ser un número entero (ej: 10, 50)."
+    if team_id in existing_ids:
+        return "El ID del equipo ya existe."
+    if any(char.isdigit() for char in name):
+        return "El nombre no debe contener numeros."
+    return None
+
+
+def _delimiter(line):
+    for delimiter in DELIMITERS:
+        if delimiter in line:
+            return delimiter
+    return ","
+
+
+def _split_row(row):
+    """(id, nombre) de una fila ya separada en columnas, o None si no tiene dos columnas."""
+    fields = [field.strip() for field in row]
+    while fields and not fields[-1]:
+        fields.pop()  # Columnas vacías al final (planillas con separadores de más)
+    if len(fields) != 2:
+        return None
+    first, second = fields
+    if second.isdigit() and not first.isdigit():
+        return second, first
+    return first, second
+
+
+def parse_teams(source, existing_ids=()):
+    """
+    Lee equipos de `source` (texto, o un iterable de líneas como un archivo
+    abierto) y los valida contra `existing_ids` y entre sí.
+
+    Devuelve (equipos, errores): equipos es una lista de (id, nombre) en el
+    orden del archivo y errores una lista de (número de línea, mensaje). Si
+    hay errores, la fila con problemas no entra en equipos.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    lines = iter(source)
+    # La primera línea con datos elige el separador; las vacías de antes se cuentan igual
+    blank = 0
+    for first in lines:
+        if first.strip():
+            break
+        blank += 1
+    else:
+        return [], []
+
+    reader = csv.reader(chain([first], lines), delimiter=_delimiter(first))
+    seen = set()
+    teams = []
+    errors = []
+    for row in reader:
+        line_no = reader.line_num + blank
+        if not any(field.strip() for field in row):
+            continue
+        if reader.line_num == 1 and not any(char.isdigit() for field in row for char in field):
+            continue  # Encabezado
+        fields = _split_row(row)
+        if fields is None:
+            errors.append((line_no, f"Se esperaban dos columnas (ID y nombre): {row!r}"))
+            continue
+        team_id, name = fields
+        if team_id in seen:
+            errors.append((line_no, f"El ID {team_id} está repetido en el archivo."))
+            continue
+        message = validate_team(team_id, name, existing_ids)
+        if message is not None:
+            errors.append((line_no, f"{message} ({team_id!r}, {name!r})"))
+            continue
+        seen.add(team_id)
+        teams.append((team_id, name))
+    return teams, errors
+
+
+def format_errors(errors, limit=MAX_REPORTED_ERRORS):
+    """Texto con las filas con problemas (como mucho `limit`, más un resumen del resto)."""
+    lines = [f"Línea {n}: {message}" for n, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"... y {len(errors) - limit} filas más con problemas.")
+    return "\n".join(lines)
@@ -0,0 +1,128 @@
+"""
+Representación compacta de los equipos: índices enteros y rivales en bits.
+
+Cada torneo tiene una tabla de IDs (IdTable) que le asigna a cada equipo un
+índice entero denso (0, 1, 2, ...) la primera vez que aparece, y que no
+cambia más (un equipo quitado conserva el suyo, porque puede figurar como
+rival de otros). Con esos índices, los rivales de un equipo son un conjunto
+de bits (bytearray): el bit k está prendido si ya jugó contra el equipo de
+índice k. Saber si un cruce sería revancha es leer un bit, y guardar los
+rivales de un equipo ocupa como mucho un bit por equipo del torneo.
+
+El bytearray crece sólo hasta el índice del último rival, así que en un
+torneo chico (o en las primeras rondas) ocupa unos pocos bytes.
+
+OpponentSet es la vista de esos bits como el conjunto de IDs de siempre
+(Team.opponents_played): se puede preguntar `id in ...`, recorrer, agregar
+y comparar con un set. Lo usan la persistencia y la interfaz; el pareo lee
+los bits directamente (has_bit).
+
+Este módulo no importa el motor.
+"""
+from collections.abc import MutableSet
+
+
+class IdTable:
+    """Tabla de IDs del torneo: ID <-> índice entero denso."""
+    def __init__(self):
+        self.ids = []    # índice -> ID
+        self.index = {}  # ID -> índice
+
+    def intern(self, team_id):
+        """Índice del ID (se le asigna uno nuevo si es la primera vez que aparece)."""
+        k = self.index.get(team_id)
+        if k is None:
+            k = self.index[team_id] = len(self.ids)
+            self.ids.append(team_id)
+        return k
+
+    def adopt(self, team):
+        """
+        Pasa a esta tabla un equipo creado con otra (por ejemplo, un Team
+        suelto que después se inscribe): recibe su índice y sus rivales se
+        traducen a los índices de esta tabla.
+        """
+        if team.id_table is self:
+            return
+        opponents = list(team.opponents_played)
+        team.id_table = self
+        team.index = self.intern(team.id)
+        team.played = bits_from(map(self.intern, opponents))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def has_bit(bits, k):
+    """True si el bit k está prendido (los bits más allá del final están apagados)."""
+    byte = k >> 3
+    return byte < len(bits) and bits[byte] >> (k & 7) & 1 == 1
+
+
+def set_bit(bits, k):
+    byte = k >> 3
+    if byte >= len(bits):
+        bits.extend(bytes(byte + 1 - len(bits)))
+    bits[byte] |= 1 << (k & 7)
+
+
+def clear_bit(bits, k):
+    byte = k >> 3
+    if byte < len(bits):
+        bits[byte] &= ~(1 << (k & 7)) & 0xFF
+
+
+def bits_from(indices):
+    """bytearray con prendidos los bits de `indices` (cualquier iterable de enteros)."""
+    indices = list(indices)
+    bits = bytearray((max(indices) >> 3) + 1 if indices else 0)
+    for k in indices:
+        bits[k >> 3] |= 1 << (k & 7)
+    return bits
+
+
+def iter_bits(bits):
+    """Índices de los bits prendidos, de menor a mayor."""
+    value = int.from_bytes(bits, "little")
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+def count_bits(bits):
+    return int.from_bytes(bits, "little").bit_count()
+
+
+class OpponentSet(MutableSet):
+    """
+    Los rivales de un equipo vistos como conjunto de IDs. No guarda nada
+    propio: lee y escribe los bits del equipo (team.played) a través de su
+    tabla de IDs, así que siempre está al día.
+    """
+    __slots__ = ("_team",)
+
+    def __init__(self, team):
+        self._team = team
+
+    def __contains__(self, team_id):
+        k = self._team.id_table.index.get(team_id)
+        return k is not None and has_bit(self._team.played, k)
+
+    def __iter__(self):
+        ids = self._team.id_table.ids
+        return (ids[k] for k in iter_bits(self._team.played))
+
+    def __len__(self):
+        return count_bits(self._team.played)
+
+    def add(self, team_id):
+        set_bit(self._team.played, self._team.id_table.intern(team_id))
+
+    def discard(self, team_id):
+        k = self._team.id_table.index.get(team_id)
+        if k is not None:
+            clear_bit(self._team.played, k)
+
+    def __repr__(self):
+        return f"{{{', '.join(map(repr, self))}}}"
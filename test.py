@@ -1,15 +1,17 @@
 import unittest
 import os
-import tkinter as tk
-from tournament_app import TournamentApp, Team  # Importamos tu código
+import subprocess
+import sys
+import tempfile
+import time
+from tournament_engine import CorrectionSheet, Tournament, Team, PAIRING_OPTIMAL, PAIRING_SCORE_GROUPS, PAIRING_SEARCH  # El motor no necesita pantalla
 
 class TestTrugoLogic(unittest.TestCase):
     
     def setUp(self):
-        """Se ejecuta antes de cada prueba. Crea una instancia de la App."""
-        # Instanciamos la app pero ocultamos la ventana para que no moleste
-        self.app = TournamentApp()
-        self.app.withdraw() 
+        """Se ejecuta antes de cada prueba. Crea un torneo sin interfaz gráfica."""
+        # El motor expone la misma API que usaba la App (teams, generate_pairings, ...)
+        self.app = Tournament()
         
         # Datos de prueba
         self.equipos_prueba = [
@@ -21,9 +23,9 @@ class TestTrugoLogic(unittest.TestCase):
 
     def tearDown(self):
         """Se ejecuta después de cada prueba. Limpia archivos creados."""
-        self.app.destroy()
-        if os.path.exists("TestTorneo.txt"):
-            os.remove("TestTorneo.txt")
+        for archivo in ("TestTorneo.txt", "TestTorneo.trugo"):
+            if os.path.exists(archivo):
+                os.remove(archivo)
 
     def test_creacion_equipos(self):
         """Prueba que los equipos se crean con puntaje 0."""
@@ -108,6 +110,1658 @@ class TestTrugoLogic(unittest.TestCase):
         
         self.assertTrue(os.path.exists("TestTorneo.txt"), "El archivo de torneo no se creó")
 
+    def test_carga_archivo(self):
+        """Lo guardado en el .txt se vuelve a leer igual."""
+        self.app.tournament_name = "TestTorneo"
+        for eid, name in self.equipos_prueba:
+            self.app.add_team(eid, name)
+        self.app.generate_pairings()
+        self.app.teams["1"].total_points = 7
+        filename = self.app.save_tournament_data()
+
+        cargado = Tournament.load(filename)
+        self.assertEqual(cargado.tournament_name, "TestTorneo")
+        self.assertEqual(cargado.current_round, 1)
+        self.assertEqual(cargado.current_matches, self.app.current_matches)
+        self.assertEqual(cargado.teams["1"].total_points, 7)
+        self.assertEqual(cargado.teams["2"].opponents_played, self.app.teams["2"].opponents_played)
+
+
+class TestMotorSinPantalla(unittest.TestCase):
+
+    def test_motor_no_importa_tkinter(self):
+        """El motor se puede importar en una máquina sin tkinter."""
+        codigo = "import sys, tournament_engine; sys.exit('tkinter' in sys.modules)"
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(resultado.returncode, 0)
+
+    def test_arranque_liviano(self):
+        """
+        Abrir la interfaz no importa NumPy (pronósticos), los procesos de la
+        búsqueda, ni lo que sólo usan algunos botones (base de datos,
+        exportar, importar equipos, pantalla web).
+        """
+        diferidos = ("forecast", "concurrent.futures.process", "sqlite3", "export", "team_import", "socket", "asyncio")
+        codigo = ("import sys, tournament_app; "
+                  f"sys.exit(any(nombre in sys.modules for nombre in {diferidos!r}))")
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(resultado.returncode, 0)
+
+    def test_evita_revancha_si_hay_rival_nuevo(self):
+        """Si el siguiente en la tabla ya fue rival, se busca el próximo libre."""
+        torneo = Tournament()
+        for eid in "1234":
+            torneo.add_team(eid, "Equipo")
+        torneo.teams["1"].opponents_played.add("2")
+        torneo.teams["2"].opponents_played.add("1")
+        torneo.generate_pairings()
+        self.assertIn(("1", "3"), torneo.current_matches)
+        self.assertIn(("2", "4"), torneo.current_matches)
+
+    def test_torneo_grande_rapido(self):
+        """10.000 equipos: todos juegan exactamente una vez por ronda y en poco tiempo."""
+        torneo = Tournament()
+        for i in range(10001):
+            torneo.add_team(str(i), "Equipo")
+
+        for ronda in range(5):
+            inicio = time.perf_counter()
+            matches = torneo.generate_pairings()
+            duracion = time.perf_counter() - inicio
+            self.assertLess(duracion, 1.0)
+
+            ids = [tid for match in matches for tid in match if tid != "BYE"]
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertEqual(len(ids), 10001)
+            for t1, t2 in matches:
+                if t2 != "BYE":
+                    torneo.teams[t1].total_points += (int(t1) + ronda) % 3
+
+class TestTablaDePosiciones(unittest.TestCase):
+
+    def test_empates_estables(self):
+        """Con puntos iguales manda el orden de inscripción, aunque cambien los puntos."""
+        torneo = Tournament()
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.teams["C"].total_points = 3
+        torneo.teams["A"].total_points = 3
+        torneo.teams["A"].total_points = 2
+        torneo.teams["A"].total_points = 3
+        self.assertEqual([t.id for t in torneo.standings], ["A", "C", "B", "D"])
+        self.assertEqual(torneo.standings.rank(torneo.teams["B"]), 3)
+
+    def test_reemplazar_equipos_reconstruye_la_tabla(self):
+        """Asignar un diccionario nuevo a teams reconstruye la tabla y suelta los equipos viejos."""
+        torneo = Tournament()
+        viejo = torneo.add_team("1", "Viejo")
+        torneo.teams = {"2": Team("2", "Nuevo")}
+        viejo.total_points = 10  # Ya no pertenece al torneo: no debe romper nada
+        self.assertEqual([t.id for t in torneo.standings], ["2"])
+
+
+class TestPlanillaDeRonda(unittest.TestCase):
+
+    def test_puntajes_de_la_ronda(self):
+        """Los puntajes se guardan en el modelo y se convierten a puntos por equipo."""
+        torneo = Tournament()
+        for eid in "ABC":
+            torneo.add_team(eid, eid)
+        torneo.generate_pairings()
+        planilla = torneo.round_scores
+
+        self.assertEqual(planilla.first_missing(), 0)
+        for indice, (t1, t2) in enumerate(torneo.current_matches):
+            planilla.set(indice, 0, "3")
+            if t2 != "BYE":
+                planilla.set(indice, 1, "1")
+        self.assertIsNone(planilla.first_missing())
+
+        puntos = planilla.round_points()
+        self.assertEqual(sum(puntos.values()), 7)
+        self.assertEqual(len(puntos), 3)
+
+        planilla.set(0, 0, "x")
+        with self.assertRaises(ValueError):
+            planilla.round_points()
+
+    def test_pareos_nuevos_vacian_la_planilla(self):
+        torneo = Tournament()
+        for eid in "AB":
+            torneo.add_team(eid, eid)
+        torneo.generate_pairings()
+        torneo.round_scores.set(0, 0, "5")
+        torneo.generate_pairings()
+        self.assertEqual(torneo.round_scores.get(0, 0), "")
+
+
+class ArbolFalso:
+    """Imita lo mínimo de un ttk.Treeview para probar TreeSync sin pantalla."""
+    def __init__(self):
+        self.filas = []
+        self.valores = {}
+        self.llamadas = 0
+
+    def delete(self, *iids):
+        self.llamadas += 1
+        for iid in iids:
+            self.filas.remove(iid)
+            del self.valores[iid]
+
+    def detach(self, *iids):
+        self.llamadas += 1
+        for iid in iids:
+            self.filas.remove(iid)
+
+    def insert(self, parent, index, iid, values):
+        self.llamadas += 1
+        self.filas.insert(index, iid)
+        self.valores[iid] = values
+
+    def move(self, iid, parent, index):
+        self.llamadas += 1
+        if iid in self.filas:
+            self.filas.remove(iid)
+        self.filas.insert(index, iid)
+
+    def item(self, iid, values):
+        self.llamadas += 1
+        self.valores[iid] = values
+
+
+class TestTablasPorDiferencias(unittest.TestCase):
+
+    def test_solo_toca_lo_que_cambio(self):
+        from tournament_app import TreeSync
+        arbol = ArbolFalso()
+        sync = TreeSync(arbol)
+        sync.update((str(i), (i, "Equipo", 0)) for i in range(100))
+        self.assertEqual(arbol.filas, [str(i) for i in range(100)])
+
+        # Sin cambios: ninguna llamada al Treeview
+        arbol.llamadas = 0
+        sync.update((str(i), (i, "Equipo", 0)) for i in range(100))
+        self.assertEqual(arbol.llamadas, 0)
+
+        # Un equipo sube al primer puesto: se mueve una sola fila
+        arbol.llamadas = 0
+        orden = ["50"] + [str(i) for i in range(100) if i != 50]
+        sync.update((iid, (int(iid), "Equipo", 0)) for iid in orden)
+        self.assertEqual(arbol.filas, orden)
+        self.assertEqual(arbol.llamadas, 2)  # detach + move
+
+        # Cambian los valores de una fila: sólo esa se actualiza
+        arbol.llamadas = 0
+        sync.update((iid, (int(iid), "Equipo", 5 if iid == "7" else 0)) for iid in orden)
+        self.assertEqual(arbol.llamadas, 1)
+        self.assertEqual(arbol.valores["7"], (7, "Equipo", 5))
+
+        # Altas y bajas
+        orden = orden[10:] + ["nuevo"]
+        sync.update((iid, (iid,)) for iid in orden)
+        self.assertEqual(arbol.filas, orden)
+
+    def test_rivales_en_cache(self):
+        torneo = Tournament()
+        for eid in "ABCD":
+            torneo.add_team(eid, "Eq" + eid)
+        torneo.generate_pairings()
+        texto = torneo.opponents_text(torneo.teams["A"])
+        self.assertEqual(texto, "EqB")
+        self.assertIs(torneo.opponents_text(torneo.teams["A"]), texto)
+        torneo.teams["A"].total_points = 3
+        torneo.generate_pairings()
+        self.assertEqual(sorted(torneo.opponents_text(torneo.teams["A"]).split(", ")), ["EqB", "EqC"])
+
+
+class TestPareoOptimo(unittest.TestCase):
+
+    def test_evita_revancha_que_el_codicioso_fuerza(self):
+        """El codicioso fuerza C-D; el óptimo reparte A-B-C-D sin revanchas."""
+        for modo, esperado_revancha in (("greedy", True), (PAIRING_OPTIMAL, False)):
+            torneo = Tournament(pairing_mode=modo)
+            for eid, pts in (("A", 3), ("B", 2), ("C", 1), ("D", 0)):
+                torneo.add_team(eid, eid).total_points = pts
+            torneo.teams["C"].opponents_played.add("D")
+            torneo.teams["D"].opponents_played.add("C")
+            torneo.generate_pairings()
+            self.assertEqual(("C", "D") in torneo.current_matches, esperado_revancha, modo)
+
+    def test_sin_revanchas_en_rondas_tardias(self):
+        """Con 200 equipos y 9 rondas el modo óptimo no fuerza revanchas."""
+        import random
+        azar = random.Random(7)
+        torneo = Tournament(pairing_mode=PAIRING_OPTIMAL)
+        for i in range(200):
+            torneo.add_team(str(i), "Equipo")
+
+        for ronda in range(9):
+            previos = {tid: set(t.opponents_played) for tid, t in torneo.teams.items()}
+            inicio = time.perf_counter()
+            torneo.generate_pairings()
+            self.assertLess(time.perf_counter() - inicio, 2.0)
+
+            for t1, t2 in torneo.current_matches:
+                self.assertNotIn(t2, previos[t1])
+                ganador = t1 if azar.random() < 0.5 else t2
+                torneo.teams[ganador].total_points += 1
+
+class TestBusquedaDePareos(unittest.TestCase):
+
+    def _revanchas(self, torneo, previos):
+        return sum(1 for t1, t2 in torneo.current_matches if t2 in previos.get(t1, ()))
+
+    def test_revisa_elecciones_anteriores(self):
+        """El codicioso parea A-B y fuerza C-D (revancha); la búsqueda no."""
+        from tournament_engine import pair_search
+        torneo = Tournament()
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.teams["C"].opponents_played.add("D")
+        torneo.teams["D"].opponents_played.add("C")
+        pares = pair_search(torneo.sorted_teams(), budget=1.0, workers=1)
+        self.assertFalse(any(b.id in a.opponents_played for a, b in pares))
+        self.assertEqual(sorted(t.id for par in pares for t in par), list("ABCD"))
+
+    def test_nunca_peor_que_el_codicioso(self):
+        clasico = Tournament()
+        busqueda = Tournament(pairing_mode=PAIRING_SEARCH)
+        busqueda.search_budget = 0.3
+        for torneo in (clasico, busqueda):
+            for i in range(20):
+                torneo.add_team(str(i), f"Eq{i}")
+        revanchas = {}
+        for torneo in (clasico, busqueda):
+            total = 0
+            for ronda in range(12):
+                previos = {tid: set(t.opponents_played) for tid, t in torneo.teams.items()}
+                torneo.generate_pairings()
+                total += self._revanchas(torneo, previos)
+                torneo.submit_results([(t1, t2, 2 if int(t1) % 3 else 1, 1) for t1, t2 in torneo.current_matches])
+            revanchas[torneo.pairing_mode] = total
+        self.assertLessEqual(revanchas[PAIRING_SEARCH], revanchas["greedy"])
+
+    def test_respeta_el_tiempo_limite(self):
+        """Con procesos y un torneo grande, la ronda sale dentro del tiempo configurado."""
+        torneo = Tournament(pairing_mode=PAIRING_SEARCH)
+        torneo.search_budget = 0.5
+        for i in range(2000):
+            torneo.add_team(str(i), str(i))
+        for _ in range(3):
+            torneo.generate_pairings()
+            torneo.submit_results([(t1, t2, int(t1) % 4, int(t2) % 3 if t2 != "BYE" else 0)
+                                   for t1, t2 in torneo.current_matches])
+        inicio = time.perf_counter()
+        torneo.generate_pairings()
+        self.assertLess(time.perf_counter() - inicio, 0.5 + 1.0)
+        self.assertEqual(len({t for par in torneo.current_matches for t in par}), 2000)
+
+
+class TestGruposDePuntaje(unittest.TestCase):
+
+    def test_indice_sigue_los_cambios_de_puntos(self):
+        """La tabla incremental coincide con un ordenamiento completo tras muchos cambios."""
+        import random
+        azar = random.Random(3)
+        torneo = Tournament()
+        for i in range(300):
+            torneo.add_team(str(i), "Equipo")
+        torneo.teams["999"] = Team("999", "Directo")  # Alta sin pasar por add_team
+
+        for _ in range(2000):
+            equipo = torneo.teams[azar.choice(list(torneo.teams))]
+            equipo.total_points += azar.randint(-2, 5)
+
+        esperado = sorted(torneo.teams.values(), key=lambda t: t.total_points, reverse=True)
+        self.assertEqual(torneo.sorted_teams(), esperado)
+        self.assertEqual(torneo.standings.scores(), sorted({t.total_points for t in esperado}, reverse=True))
+        for posicion, equipo in enumerate(esperado, start=1):
+            self.assertEqual(torneo.standings.rank(equipo), posicion)
+        self.assertEqual(torneo.standings.top(10), esperado[:10])
+        puntos = esperado[0].total_points
+        self.assertEqual(torneo.standings.group(puntos), [t for t in esperado if t.total_points == puntos])
+
+        torneo.remove_team("999")
+        self.assertEqual(len(torneo.standings), 300)
+
+    def test_pareo_dentro_del_grupo(self):
+        """Mitad de arriba contra mitad de abajo dentro del grupo de puntaje."""
+        torneo = Tournament(pairing_mode=PAIRING_SCORE_GROUPS)
+        for eid in "ABCDEFGH":
+            torneo.add_team(eid, eid)
+        for eid in "ABCD":
+            torneo.teams[eid].total_points = 1
+        torneo.generate_pairings()
+        self.assertEqual(torneo.current_matches, [("A", "C"), ("B", "D"), ("E", "G"), ("F", "H")])
+
+    def test_flotante_baja_al_grupo_siguiente(self):
+        """Un grupo impar manda a su sobrante al grupo de abajo, que lo parea primero."""
+        torneo = Tournament(pairing_mode=PAIRING_SCORE_GROUPS)
+        for eid in "ABCDEF":
+            torneo.add_team(eid, eid)
+        for eid in "ABC":
+            torneo.teams[eid].total_points = 2
+        torneo.generate_pairings()
+        self.assertEqual(torneo.current_matches, [("A", "B"), ("C", "D"), ("E", "F")])
+
+    def test_flotante_por_revancha(self):
+        """Si A sólo tiene revancha en su grupo, baja y juega con el grupo siguiente."""
+        torneo = Tournament(pairing_mode=PAIRING_SCORE_GROUPS)
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.teams["A"].total_points = 2
+        torneo.teams["B"].total_points = 2
+        torneo.teams["A"].opponents_played.add("B")
+        torneo.teams["B"].opponents_played.add("A")
+        torneo.generate_pairings()
+        self.assertNotIn(("A", "B"), torneo.current_matches)
+        self.assertEqual(len(torneo.current_matches), 2)
+
+class TestDiarioDeEventos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.carpeta.name, "Torneo.journal")
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def _jugar(self, torneo, rondas):
+        for _ in range(rondas):
+            torneo.generate_pairings()
+            torneo.apply_round_points({t1: 2 for t1, t2 in torneo.current_matches})
+
+    def _estado(self, torneo):
+        estado = torneo.to_dict()
+        estado["teams"].sort(key=lambda t: t["id"])
+        return estado
+
+    def test_reproduce_el_torneo(self):
+        """Foto + eventos reconstruyen exactamente el mismo estado."""
+        torneo = Tournament("Torneo")
+        for eid in "ABCDE":
+            torneo.add_team(eid, "Eq" + eid)
+        torneo.attach_journal(self.ruta)
+        torneo.add_team("F", "EqF")
+        self._jugar(torneo, 3)
+        torneo.correct_points("B", 11)
+        torneo.generate_pairings()
+        torneo.detach_journal()
+
+        cargado = Tournament.load_journal(self.ruta)
+        self.assertEqual(self._estado(cargado), self._estado(torneo))
+        self.assertEqual(cargado.sorted_teams()[0].id, torneo.sorted_teams()[0].id)
+
+        # El diario reabierto sigue anotando a continuación
+        cargado.correct_points("A", 1)
+        cargado.detach_journal()
+        self.assertEqual(Tournament.load_journal(self.ruta, reopen=False).teams["A"].total_points, 1)
+
+    def test_cada_ronda_solo_agrega(self):
+        """Una ronda agrega líneas al diario; la foto no se toca hasta compactar."""
+        torneo = Tournament("Torneo")
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.attach_journal(self.ruta)
+        foto = os.path.getmtime(self.ruta.replace(".journal", ".trugo"))
+        self._jugar(torneo, 2)
+        with open(self.ruta, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)  # pareos + puntos, por ronda
+        self.assertEqual(os.path.getmtime(self.ruta.replace(".journal", ".trugo")), foto)
+        torneo.detach_journal()
+
+    def test_compacta_periodicamente(self):
+        torneo = Tournament("Torneo")
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.attach_journal(self.ruta, compact_every=5)
+        self._jugar(torneo, 4)
+        torneo.detach_journal()
+        with open(self.ruta, encoding="utf-8") as f:
+            self.assertLess(len(f.readlines()), 5)
+        self.assertTrue(os.path.exists(os.path.join(self.carpeta.name, "Torneo.txt")))
+        self.assertEqual(self._estado(Tournament.load_journal(self.ruta, reopen=False)), self._estado(torneo))
+
+    def test_sobrevive_a_una_linea_cortada(self):
+        """Una escritura interrumpida a mitad de línea se descarta y se recorta al reabrir."""
+        torneo = Tournament("Torneo")
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.attach_journal(self.ruta)
+        self._jugar(torneo, 1)
+        torneo.detach_journal()
+        esperado = self._estado(torneo)
+
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write('{"type":"score_corrected","id":"A","ol')
+
+        cargado = Tournament.load_journal(self.ruta)
+        self.assertEqual(self._estado(cargado), esperado)
+        cargado.correct_points("A", 9)
+        cargado.detach_journal()
+        self.assertEqual(Tournament.load_journal(self.ruta, reopen=False).teams["A"].total_points, 9)
+
+    def test_ignora_eventos_ya_incluidos_en_la_foto(self):
+        """Corte entre escribir la foto y vaciar el diario: no se aplican eventos dos veces."""
+        torneo = Tournament("Torneo")
+        for eid in "ABCD":
+            torneo.add_team(eid, eid)
+        torneo.attach_journal(self.ruta)
+        self._jugar(torneo, 2)
+        with open(self.ruta, encoding="utf-8") as f:
+            eventos = f.read()
+        torneo.compact_journal()
+        torneo.detach_journal()
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write(eventos)
+
+        self.assertEqual(self._estado(Tournament.load_journal(self.ruta, reopen=False)), self._estado(torneo))
+
+
+class TestDesempates(unittest.TestCase):
+
+    def setUp(self):
+        # D se inscribe antes que C: sin desempates, D quedaría arriba
+        self.torneo = Tournament("Desempates")
+        for eid in "ABDC":
+            self.torneo.add_team(eid, "Eq" + eid)
+        self._ronda([("A", "B", 3, 1), ("C", "D", 3, 1)])
+        self._ronda([("A", "D", 1, 2), ("C", "B", 2, 1)])
+        self._ronda([("A", "C", 2, 0), ("B", "D", 2, 2)])
+
+    def _ronda(self, resultados):
+        self.torneo.current_round += 1
+        self.torneo.current_matches = [(t1, t2) for t1, t2, _, _ in resultados]
+        self.torneo.submit_results(resultados)
+
+    def test_historial(self):
+        self.assertEqual(self.torneo.teams["C"].history, [(1, "D", 3, 1), (2, "B", 2, 1), (3, "A", 0, 2)])
+        self.assertEqual(self.torneo.teams["D"].history[0], (1, "C", 1, 3))
+
+    def test_criterios(self):
+        # (directo, Buchholz, Buchholz mediano, Sonneborn-Berger)
+        self.assertEqual(self.torneo.tiebreaks.get("C"), (1, 15, 5, 9))
+        self.assertEqual(self.torneo.tiebreaks.get("D"), (0, 15, 5, 8))
+        self.assertEqual(self.torneo.tiebreaks.get("A"), (0, 14, 5, 9))
+
+    def test_ordenan_la_tabla_final(self):
+        self.assertEqual([t.id for t in self.torneo.sorted_teams()], ["A", "D", "C", "B"])
+        self.assertEqual([t.id for t, _ in self.torneo.final_standings()], ["A", "C", "D", "B"])
+
+    def test_se_actualizan_con_correcciones(self):
+        self.torneo.correct_points("B", 10)
+        self.assertEqual(self.torneo.tiebreaks.get("C")[1], 21)
+        self.assertEqual(self.torneo.final_standings()[0][0].id, "B")
+
+    def test_puntos_por_ronda_tambien_llenan_el_historial(self):
+        torneo = Tournament()
+        for eid in "ABC":
+            torneo.add_team(eid, eid)
+        torneo.generate_pairings()
+        libre = next(t1 for t1, t2 in torneo.current_matches if t2 == "BYE")
+        torneo.apply_round_points({t1: 2 for t1, t2 in torneo.current_matches})
+        for equipo in torneo.teams.values():
+            self.assertEqual(len(equipo.history), 1)
+        self.assertEqual(torneo.teams[libre].history, [(1, "BYE", 2, 0)])
+
+    def test_se_conservan_al_cargar(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "Desempates.trugo")
+            self.torneo.save_snapshot(ruta)
+            cargado = Tournament.load_snapshot(ruta)
+        self.assertEqual(cargado.final_standings(), [(cargado.teams[t.id], v) for t, v in self.torneo.final_standings()])
+
+    def test_miles_de_equipos(self):
+        torneo = Tournament()
+        for i in range(3000):
+            torneo.add_team(str(i), str(i))
+        for _ in range(12):
+            torneo.generate_pairings()
+            torneo.submit_results([(t1, t2, 2, 1) for t1, t2 in torneo.current_matches])
+        inicio = time.perf_counter()
+        tabla = torneo.final_standings()
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        self.assertEqual(len(tabla), 3000)
+
+
+class TestFotoCompacta(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.carpeta.name, "Torneo.trugo")
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def test_ida_y_vuelta(self):
+        """Nombres con comas o con "(ID: " ya no rompen la carga."""
+        torneo = Tournament("Copa, edición 2")
+        torneo.add_team("1", "Tigres, del Norte")
+        torneo.add_team("2", "Leones (ID: 9)")
+        torneo.add_team("3", "Pumas")
+        torneo.generate_pairings()
+        torneo.apply_round_points({t1: 3 for t1, t2 in torneo.current_matches})
+        torneo.generate_pairings()
+        torneo.save_snapshot(self.ruta)
+
+        cargado = Tournament.load_snapshot(self.ruta)
+        self.assertEqual(cargado.to_dict(), torneo.to_dict())
+        self.assertEqual([t.id for t in cargado.sorted_teams()], [t.id for t in torneo.sorted_teams()])
+
+    def test_lee_fotos_de_la_version_anterior(self):
+        """La versión 2 guardaba los rivales como lista; se sigue leyendo."""
+        import json
+        torneo = Tournament("Vieja")
+        for i in range(6):
+            torneo.add_team(str(i), str(i))
+        for _ in range(2):
+            torneo.generate_pairings()
+            torneo.submit_results([(t1, t2, 2, 1) for t1, t2 in torneo.current_matches])
+        torneo.save_snapshot(self.ruta)
+        with open(self.ruta, encoding="utf-8") as f:
+            lineas = [json.loads(linea) for linea in f]
+        lineas[0]["version"] = 2
+        for fila in lineas[1:7]:
+            fila[4] = [int(slot) for slot in fila[4].split()]
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(linea) + "\n" for linea in lineas)
+
+        cargado = Tournament.load_snapshot(self.ruta)
+        self.assertEqual(cargado.to_dict(), torneo.to_dict())
+        for equipo in torneo.teams.values():
+            for rival in torneo.teams.values():
+                self.assertEqual(cargado.teams[equipo.id].has_played(cargado.teams[rival.id]), equipo.has_played(rival))
+
+    def test_rechaza_versiones_futuras(self):
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write('{"format":"trugo-snapshot","version":99,"name":"X","round":0,"teams":0}\n')
+        with self.assertRaises(ValueError):
+            Tournament.load_snapshot(self.ruta)
+
+    def test_carga_rapida(self):
+        """10.000 equipos y 12 rondas se cargan muy por debajo de un segundo."""
+        torneo = Tournament("Grande")
+        for i in range(10000):
+            torneo.add_team(str(i), f"Equipo {i}")
+        for _ in range(12):
+            torneo.generate_pairings()
+            torneo.apply_round_points({t1: 2 for t1, t2 in torneo.current_matches})
+        torneo.save_snapshot(self.ruta)
+
+        inicio = time.perf_counter()
+        cargado = Tournament.load_snapshot(self.ruta)
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertEqual(len(cargado.teams), 10000)
+        self.assertEqual(cargado.sorted_teams()[0].id, torneo.sorted_teams()[0].id)
+
+
+class TestBaseSQLite(unittest.TestCase):
+
+    def setUp(self):
+        from storage_sqlite import SQLiteStore
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(os.path.join(self.carpeta.name, "temporada.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.carpeta.cleanup()
+
+    def _torneo(self, nombre, rondas):
+        torneo = Tournament(nombre)
+        for eid, equipo in (("1", "Tigres"), ("2", "Leones"), ("3", "Pumas")):
+            torneo.add_team(eid, equipo)
+        torneo.attach_store(self.store)
+        for ronda in range(rondas):
+            torneo.generate_pairings()
+            torneo.submit_results([(t1, t2, 3, 1) for t1, t2 in torneo.current_matches])
+        return torneo
+
+    def test_guarda_y_carga(self):
+        torneo = self._torneo("Apertura", 2)
+        torneo.correct_points("2", 20)
+        torneo.add_team("4", "Zorros")
+        torneo.generate_pairings()
+
+        cargado = self.store.load_tournament("Apertura")
+        self.assertEqual(cargado.current_round, 3)
+        self.assertEqual(cargado.current_matches, torneo.current_matches)
+        for tid, equipo in torneo.teams.items():
+            self.assertEqual(cargado.teams[tid].total_points, equipo.total_points)
+            self.assertEqual(cargado.teams[tid].opponents_played, equipo.opponents_played)
+            self.assertEqual(cargado.teams[tid].received_bye, equipo.received_bye)
+            self.assertEqual(cargado.teams[tid].history, equipo.history)
+        self.assertEqual([t.id for t in cargado.standings], [t.id for t in torneo.standings])
+
+    def test_resultados_de_un_equipo_en_toda_la_temporada(self):
+        self._torneo("Apertura", 2)
+        self._torneo("Clausura", 3)
+        self.assertEqual(self.store.list_tournaments(), ["Clausura", "Apertura"])
+
+        partidos = self.store.team_results(name="Tigres")
+        self.assertEqual(len(partidos), 5)
+        self.assertEqual({p["tournament"] for p in partidos}, {"Apertura", "Clausura"})
+        for partido in partidos:
+            self.assertIn(partido["score"], (1, 3))
+
+        solo_apertura = self.store.team_results(team_id="1", tournament_name="Apertura")
+        self.assertEqual([p["round"] for p in solo_apertura], [1, 2])
+
+    def test_ronda_en_una_sola_transaccion(self):
+        """Si falla la carga de una ronda no queda ningún resultado a medias."""
+        torneo = self._torneo("Apertura", 1)
+        torneo.generate_pairings()
+        with self.assertRaises(KeyError):
+            # Un equipo inexistente hace fallar la transacción completa
+            self.store.record(torneo, {"type": "round_results", "round": 2,
+                                       "results": [list(torneo.current_matches[1]) + [3, 1], ["X", "Y", 1, 1]]})
+        pendientes = self.store.conn.execute(
+            "SELECT COUNT(*) FROM matches WHERE round = 2 AND score1 IS NOT NULL").fetchone()[0]
+        self.assertEqual(pendientes, 0)
+
+
+class TestServidor(unittest.TestCase):
+
+    def _con_servidor(self, prueba, data_dir=None):
+        """Levanta el servidor en un puerto libre, corre prueba(cliente) y lo cierra."""
+        import asyncio
+        from server import Client, TournamentHost, TournamentServer
+
+        async def correr():
+            servidor = TournamentServer(TournamentHost(data_dir))
+            puerto = await servidor.start("127.0.0.1", 0)
+            cliente = Client("127.0.0.1", puerto)
+            try:
+                return await prueba(cliente, puerto)
+            finally:
+                await cliente.close()
+                await servidor.stop()
+        return asyncio.run(correr())
+
+    def test_torneo_completo(self):
+        async def prueba(c, puerto):
+            self.assertEqual((await c.request("POST", "/tournaments", {"name": "Copa Sur"}))[0], 201)
+            self.assertEqual((await c.request("POST", "/tournaments", {"name": "Copa Sur"}))[0], 409)
+            equipos = [{"id": str(i), "name": f"Eq{i}"} for i in range(5)]
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/teams", {"teams": equipos}))[1], {"teams": 5})
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/teams", {"teams": equipos[:1]}))[0], 409)
+
+            estado, ronda = await c.request("POST", "/tournaments/Copa%20Sur/pairings")
+            self.assertEqual((estado, ronda["round"], len(ronda["matches"])), (200, 1, 3))
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/pairings"))[0], 409)
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/results", {"results": [["0", "1", 1, 1]]}))[0], 400)
+
+            (uno, dos), (tres, cuatro) = ronda["matches"][:2]
+            mezclados = {"results": [[int(uno), dos, 3, 1], [tres, cuatro, 1, 1]]}
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/results", mezclados))[0], 400)
+            resultados = [[t1, t2, 3, 1] for t1, t2 in ronda["matches"]]
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/results", {"results": resultados}))[0], 200)
+            self.assertEqual((await c.request("POST", "/tournaments/Copa%20Sur/results", {"results": resultados}))[0], 409)
+
+            estado, tabla = await c.request("GET", "/tournaments/Copa%20Sur/standings")
+            self.assertEqual(estado, 200)
+            self.assertEqual([fila["points"] for fila in tabla["standings"]], [3, 3, 3, 1, 1])
+            self.assertIn("buchholz", tabla["standings"][0]["tiebreaks"])
+            self.assertEqual((await c.request("GET", "/tournaments/Otro"))[0], 404)
+        self._con_servidor(prueba)
+
+    def test_nombres_con_el_mismo_archivo(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            async def prueba(c, puerto):
+                self.assertEqual((await c.request("POST", "/tournaments", {"name": "Copa"}))[0], 201)
+                await c.request("POST", "/tournaments/Copa/teams", {"teams": [{"id": "A", "name": "A"}]})
+                for nombre in ("Copa!", "copa", " Copa?"):
+                    self.assertEqual((await c.request("POST", "/tournaments", {"name": nombre}))[0], 409)
+                self.assertEqual((await c.request("GET", "/tournaments"))[1], {"tournaments": ["Copa"]})
+            self._con_servidor(prueba, carpeta)
+
+            async def revisar(c, puerto):
+                self.assertEqual((await c.request("POST", "/tournaments", {"name": "Copa!"}))[0], 409)
+            self._con_servidor(revisar, carpeta)
+
+    def test_content_length_invalido(self):
+        import asyncio
+
+        async def prueba(c, puerto):
+            for largo in ("-1", "abc", "1_0"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+                writer.write(f"POST /tournaments HTTP/1.1\r\nContent-Length: {largo}\r\n\r\n".encode("latin-1"))
+                await writer.drain()
+                self.assertEqual((await reader.readline()).split()[1], b"400")
+                writer.close()
+            self.assertEqual((await c.request("GET", "/tournaments"))[0], 200)
+        self._con_servidor(prueba)
+
+    def test_muchos_torneos_a_la_vez(self):
+        import asyncio
+        from server import Client
+
+        async def prueba(c, puerto):
+            clientes = [Client("127.0.0.1", puerto) for _ in range(50)]
+
+            async def jugar(cliente, i):
+                ruta = f"/tournaments/T{i}"
+                await cliente.request("POST", "/tournaments", {"name": f"T{i}"})
+                await cliente.request("POST", ruta + "/teams", {"teams": [{"id": str(k), "name": str(k)} for k in range(8)]})
+                for _ in range(3):
+                    _, ronda = await cliente.request("POST", ruta + "/pairings")
+                    estado, _ = await cliente.request("POST", ruta + "/results",
+                                                      {"results": [[a, b, 2, 1] for a, b in ronda["matches"]]})
+                    self.assertEqual(estado, 200)
+                await cliente.close()
+
+            await asyncio.gather(*(jugar(cliente, i) for i, cliente in enumerate(clientes)))
+            _, lista = await c.request("GET", "/tournaments")
+            self.assertEqual(len(lista["tournaments"]), 50)
+            _, estado = await c.request("GET", "/tournaments/T7")
+            self.assertEqual((estado["round"], estado["results_pending"]), (3, False))
+        self._con_servidor(prueba)
+
+    def test_recupera_los_torneos_al_reiniciar(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            async def preparar(c, puerto):
+                await c.request("POST", "/tournaments", {"name": "Diario"})
+                await c.request("POST", "/tournaments/Diario/teams", {"teams": [{"id": "A", "name": "A"}, {"id": "B", "name": "B"}]})
+                await c.request("POST", "/tournaments/Diario/pairings")
+
+            async def revisar(c, puerto):
+                _, estado = await c.request("GET", "/tournaments/Diario")
+                self.assertEqual((estado["round"], estado["teams"], estado["results_pending"]), (1, 2, True))
+
+            self._con_servidor(preparar, carpeta)
+            self._con_servidor(revisar, carpeta)
+
+
+class TestEquiposCompactos(unittest.TestCase):
+
+    def setUp(self):
+        self.torneo = Tournament("Compacto")
+        for eid in "ABCD":
+            self.torneo.add_team(eid, "Eq" + eid)
+
+    def test_rivales_como_bits(self):
+        a, b, c = (self.torneo.teams[eid] for eid in "ABC")
+        self.assertEqual([t.index for t in (a, b, c)], [0, 1, 2])
+        self.torneo.generate_pairings()  # A-B, C-D
+        self.assertTrue(a.has_played(b))
+        self.assertFalse(a.has_played(c))
+        self.assertEqual(a.played, bytearray([0b10]))
+
+        # La vista de siempre: IDs, largo, recorrido y comparación con un set
+        self.assertIn("B", a.opponents_played)
+        self.assertNotIn("C", a.opponents_played)
+        self.assertNotIn("Z", a.opponents_played)
+        self.assertEqual(a.opponents_played, {"B"})
+        a.opponents_played.add("D")
+        self.assertEqual((sorted(a.opponents_played), len(a.opponents_played)), (["B", "D"], 2))
+        a.opponents_played.discard("B")
+        self.assertFalse(a.has_played(b))
+
+    def test_equipo_suelto_pasa_a_la_tabla_del_torneo(self):
+        suelto = Team("X", "Suelto")
+        suelto.opponents_played = {"C", "Fantasma"}
+        self.torneo.teams["X"] = suelto
+        self.assertIs(suelto.id_table, self.torneo.id_table)
+        self.assertEqual(suelto.index, 4)
+        self.assertTrue(suelto.has_played(self.torneo.teams["C"]))
+        self.assertEqual(suelto.opponents_played, {"C", "Fantasma"})
+
+    def test_indices_estables(self):
+        """Un equipo quitado conserva su índice: puede figurar como rival de otros."""
+        self.torneo.generate_pairings()
+        self.torneo.remove_team("B")
+        self.assertIn("B", self.torneo.teams["A"].opponents_played)
+        self.assertEqual(self.torneo.add_team("E", "EqE").index, 4)
+        self.assertEqual(self.torneo.add_team("B", "EqB").index, 1)
+
+    def test_sin_diccionario_por_equipo(self):
+        self.assertFalse(hasattr(Team("1", "A"), "__dict__"))
+
+    def test_bits_acotados_por_la_cantidad_de_equipos(self):
+        torneo = Tournament("Grande")
+        for i in range(2000):
+            torneo.add_team(str(i), str(i))
+        for _ in range(6):
+            torneo.generate_pairings()
+            torneo.apply_round_points({t1: 1 for t1, t2 in torneo.current_matches})
+        self.assertLessEqual(max(len(t.played) for t in torneo.teams.values()), 2000 // 8)
+        self.assertTrue(all(len(t.opponents_played) == 6 for t in torneo.teams.values()))
+
+
+class TestSimulador(unittest.TestCase):
+
+    def test_potencia_de_dos_sin_empates(self):
+        """Con 8 equipos y 3 rondas siempre queda un único invicto (conflictos.md)."""
+        from simulator import simulate
+        resumen = simulate(8, runs=50, workers=1)
+        self.assertEqual((resumen["top_tie"], resumen["no_undefeated"], resumen["repeat_byes"]), (0, 0, 0))
+
+    def test_detecta_el_empate_de_conflictos(self):
+        from simulator import simulate, RESULTS_STRENGTH
+        resumen = simulate(6, runs=200, workers=1)
+        self.assertGreater(resumen["top_tie"], 0)
+        self.assertLessEqual(resumen["unresolved"], resumen["top_tie"])
+        self.assertEqual(resumen["gap_max"], 1)
+        self.assertEqual(simulate(6, runs=20, results=RESULTS_STRENGTH, workers=1)["runs"], 20)
+
+    def test_mismo_resultado_con_procesos(self):
+        from simulator import simulate
+        tiempos = ("pair_ms_mean", "pair_ms_p95", "pair_ms_max")
+        solo = simulate(10, rounds=4, runs=120, workers=1)
+        repartido = simulate(10, rounds=4, runs=120, workers=2)
+        for clave in tiempos:
+            del solo[clave], repartido[clave]
+        self.assertEqual(solo, repartido)
+
+
+class TestPronostico(unittest.TestCase):
+
+    def _torneo(self, equipos, rondas):
+        torneo = Tournament("Pronóstico")
+        for i in range(equipos):
+            torneo.add_team(str(i), f"Eq{i}")
+        for _ in range(rondas):
+            torneo.generate_pairings()
+            torneo.submit_results([(a, b, 1, 0) for a, b in torneo.current_matches])
+        return torneo
+
+    def test_rondas_recomendadas(self):
+        from forecast import plan_rounds
+        self.assertEqual(plan_rounds(16)[0], 4)  # Potencia de dos: ⌈log2(E)⌉ alcanza
+        rondas, probadas = plan_rounds(12)
+        self.assertEqual(probadas[0][0], 4)
+        self.assertGreater(probadas[0][1], 0)  # El empate de conflictos.md
+        self.assertIn(rondas, [r for r, _ in probadas])
+
+    def test_probabilidades_suman_uno_y_k(self):
+        from forecast import title_probabilities
+        torneo = self._torneo(10, 2)
+        torneo.generate_pairings()
+        probabilidades = title_probabilities(torneo, 4, top_k=3, seed=1)
+        self.assertEqual(set(probabilidades), set(torneo.teams))
+        self.assertAlmostEqual(sum(p for p, _ in probabilidades.values()), 1.0)
+        self.assertAlmostEqual(sum(q for _, q in probabilidades.values()), 3.0)
+        # El único invicto tiene más chances que cualquiera sin victorias
+        invicto = torneo.sorted_teams()[0].id
+        self.assertGreater(probabilidades[invicto][0], max(p for tid, (p, _) in probabilidades.items()
+                                                           if torneo.teams[tid].total_points == 0))
+
+    def test_torneo_terminado_es_seguro(self):
+        from forecast import title_probabilities
+        torneo = self._torneo(8, 3)
+        probabilidades = title_probabilities(torneo, 3, seed=1)
+        lider = torneo.sorted_teams()[0].id
+        self.assertEqual(probabilidades[lider][0], 1.0)
+
+    def test_resultados_confirmados_cuentan(self):
+        from forecast import title_probabilities
+        torneo = self._torneo(4, 0)
+        torneo.generate_pairings()
+        torneo.record_match_result(0, 1, 0, 0)
+        probabilidades = title_probabilities(torneo, 1, seed=1)
+        perdedor = torneo.current_matches[0][1]
+        self.assertEqual(probabilidades[perdedor][0], 0.0)
+
+    def test_menos_simulaciones_con_mas_equipos(self):
+        from forecast import default_simulations
+        self.assertGreaterEqual(default_simulations(8), default_simulations(1000))
+        self.assertGreaterEqual(default_simulations(1000), default_simulations(10000))
+        self.assertGreater(default_simulations(10 ** 6), 0)
+
+    def test_en_segundo_plano_gana_el_ultimo_pedido(self):
+        import threading
+        from forecast import ForecastWorker, forecast_inputs, run_forecast, title_probabilities
+        torneo = self._torneo(10, 2)
+        trabajador = ForecastWorker()
+        frenar = threading.Event()
+        trabajador.submit("lento", frenar.wait, 5)
+        for rondas in (3, 4, 5):  # Mientras tanto llegan tres pedidos: sólo se corre el último
+            trabajador.submit("forecast", run_forecast, forecast_inputs(torneo, rondas), 3, None, 1)
+        frenar.set()
+        resultados = {}
+        limite = time.time() + 5
+        while (trabajador.busy() or not resultados) and time.time() < limite:
+            resultados.update(trabajador.poll())
+            time.sleep(0.01)
+        resultados.update(trabajador.poll())
+        self.assertEqual(resultados["forecast"], title_probabilities(torneo, 5, seed=1))
+
+
+class TestGuardadoEnSegundoPlano(unittest.TestCase):
+
+    def setUp(self):
+        from autosave import AutosaveWriter
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.escritor = AutosaveWriter(delay=0.05)
+
+    def tearDown(self):
+        self.escritor.close(5)
+        self.carpeta.cleanup()
+
+    def test_junta_las_rafagas(self):
+        ruta = os.path.join(self.carpeta.name, "Torneo.txt")
+        for i in range(50):
+            self.escritor.submit([(ruta, f"versión {i}")])
+        self.assertTrue(self.escritor.flush(5))
+        with open(ruta, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "versión 49")
+        self.assertLess(self.escritor.writes, 50)
+        self.assertEqual(os.listdir(self.carpeta.name), ["Torneo.txt"])  # Sin temporales
+
+    def test_avisa_los_errores(self):
+        ruta = os.path.join(self.carpeta.name, "no", "existe.txt")
+        self.escritor.submit([(ruta, "x")])
+        self.escritor.flush(5)
+        errores = self.escritor.errors()
+        self.assertEqual([r for r, _ in errores], [ruta])
+        self.assertIsInstance(errores[0][1], OSError)
+        self.assertEqual(self.escritor.errors(), [])
+
+    def test_un_error_cualquiera_no_corta_el_hilo(self):
+        def diario_cerrado():
+            raise ValueError("I/O operation on closed file.")
+        ruta = os.path.join(self.carpeta.name, "Despues.txt")
+        self.escritor.submit_call("Torneo.journal", diario_cerrado)
+        self.escritor.submit([(ruta, "sigue")])
+        self.assertTrue(self.escritor.flush(2))
+        self.assertEqual([(nombre, type(e)) for nombre, e in self.escritor.errors()], [("Torneo.journal", ValueError)])
+        with open(ruta, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "sigue")
+        self.assertTrue(self.escritor._thread.is_alive())
+
+    def test_el_torneo_no_espera_al_disco(self):
+        torneo = Tournament("Fondo")
+        for eid in "ABC":
+            torneo.add_team(eid, eid)
+        torneo.writer = self.escritor
+        reporte = os.path.join(self.carpeta.name, "Fondo.txt")
+        self.assertEqual(torneo.save_tournament_data(reporte), reporte)
+        torneo.generate_pairings()
+        torneo.save_tournament_data(reporte)
+        self.escritor.flush(5)
+        cargado = Tournament.load_snapshot(os.path.join(self.carpeta.name, "Fondo.trugo"))
+        self.assertEqual(cargado.to_dict(), torneo.to_dict())
+        self.assertEqual(Tournament.load(reporte).current_matches, torneo.current_matches)
+
+    def test_el_diario_se_escribe_en_segundo_plano(self):
+        ruta = os.path.join(self.carpeta.name, "Fondo.journal")
+        torneo = Tournament("Fondo")
+        torneo.writer = self.escritor
+        torneo.attach_journal(ruta, compact_every=3)
+        for i in range(8):
+            torneo.add_team(f"E{i}", f"Equipo {i}")
+        torneo.generate_pairings()
+        torneo.record_match_result(1, 5, 3, 0)
+        torneo.detach_journal()
+        self.assertTrue(self.escritor.flush(5))
+        self.assertEqual(self.escritor.errors(), [])
+        cargado = Tournament.load_journal(ruta, reopen=False)
+        self.assertEqual(cargado.to_dict(), torneo.to_dict())
+
+    def test_errores_del_diario_van_a_la_interfaz(self):
+        torneo = Tournament("Diario")
+        torneo.add_team("A", "A")
+        avisos = []
+        torneo.on_storage_error = avisos.append
+        torneo.attach_journal(os.path.join(self.carpeta.name, "Diario.journal"))
+
+        def disco_lleno(evento, writer=None):
+            raise OSError("No queda espacio en el disco")
+        torneo.journal.append = disco_lleno
+        torneo.add_team("B", "B")
+        self.assertEqual(avisos, ["Error al guardar datos: No queda espacio en el disco"])
+        torneo.detach_journal()
+
+
+class TestImportarEquipos(unittest.TestCase):
+
+    def test_lee_y_valida_todas_las_filas(self):
+        from team_import import parse_teams
+        texto = ("id,nombre\n"
+                 "10,Los Pumas\n"
+                 "Leones,11\n"
+                 "\n"
+                 "12,Tigres 2\n"
+                 "abc,Zorros\n"
+                 "10,Otra vez\n"
+                 "5,Ya inscripto\n"
+                 "13\n")
+        equipos, errores = parse_teams(texto, {"5": None})
+        self.assertEqual(equipos, [("10", "Los Pumas"), ("11", "Leones")])
+        # Todas las filas malas juntas, con su número de línea
+        self.assertEqual([linea for linea, _ in errores], [5, 6, 7, 8, 9])
+        self.assertIn("nombre", errores[0][1])
+        self.assertIn("número entero", errores[1][1])
+        self.assertIn("repetido", errores[2][1])
+        self.assertIn("ya existe", errores[3][1])
+
+    def test_texto_pegado_de_una_planilla(self):
+        from team_import import parse_teams
+        equipos, errores = parse_teams("Pumas\t1\t\nLeones\t2\n")
+        self.assertEqual(errores, [])
+        self.assertEqual(equipos, [("1", "Pumas"), ("2", "Leones")])
+        self.assertEqual(parse_teams("1;Pumas;\n"), ([("1", "Pumas")], []))
+        self.assertEqual(parse_teams("\n  \n"), ([], []))
+
+    def test_alta_en_bloque_con_un_solo_evento(self):
+        from team_import import parse_teams
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "Bloque.journal")
+            torneo = Tournament("Bloque")
+            torneo.add_team("1", "Uno")
+            torneo.attach_journal(ruta)
+            texto = "\n".join(f"{i},Equipo" for i in range(2, 5002))
+            inicio = time.perf_counter()
+            equipos, errores = parse_teams(texto, torneo.teams)
+            torneo.add_teams(equipos)
+            demora = time.perf_counter() - inicio
+            torneo.detach_journal()
+            self.assertEqual(errores, [])
+            self.assertEqual(len(torneo.teams), 5001)
+            self.assertLess(demora, 1.0)
+            self.assertEqual([t.id for t in torneo.sorted_teams()[:3]], ["1", "2", "3"])
+
+            cargado = Tournament.load_journal(ruta, reopen=False)
+            self.assertEqual(cargado.to_dict(), torneo.to_dict())
+
+
+class TestLineaDeComandos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.diario = self.ruta("Liga.journal")
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta.name, nombre)
+
+    def escribir(self, nombre, texto):
+        with open(self.ruta(nombre), "w", encoding="utf-8") as f:
+            f.write(texto)
+        return self.ruta(nombre)
+
+    def leer_csv(self, nombre):
+        import csv
+        with open(self.ruta(nombre), encoding="utf-8") as f:
+            return list(csv.reader(f))[1:]
+
+    def resultados(self, nombre, pareos):
+        """Gana siempre el primero de cada mesa (el libre se lleva 1 punto)."""
+        filas = ["id1,id2,puntos1,puntos2"]
+        filas += [f"{t1},{t2},1,0" for _mesa, t1, _n1, t2, _n2 in pareos]
+        return self.escribir(nombre, "\n".join(filas) + "\n")
+
+    def test_torneo_completo_sin_pantalla(self):
+        from batch import main
+        equipos = self.escribir("equipos.csv", "".join(f"{i},Equipo\n" for i in range(1, 6)))
+        self.assertEqual(main([self.diario, "--new", "Liga", "--teams", equipos,
+                               "--pair", "--pairings", self.ruta("r1.csv")]), 0)
+        pareos = self.leer_csv("r1.csv")
+        self.assertEqual(len(pareos), 3)  # 5 equipos: dos partidos y un libre
+
+        r1 = self.resultados("res1.csv", pareos)
+        self.assertEqual(main([self.diario, "--results", r1, "--pair", "--pairings", self.ruta("r2.csv")]), 0)
+        r2 = self.resultados("res2.csv", self.leer_csv("r2.csv"))
+        self.assertEqual(main([self.diario, "--results", r2, "--standings", self.ruta("tabla.csv")]), 0)
+
+        torneo = Tournament.load_journal(self.diario, reopen=False)
+        self.assertEqual(torneo.current_round, 2)
+        self.assertFalse(torneo.results_pending())
+        tabla = self.leer_csv("tabla.csv")
+        self.assertEqual([fila[1] for fila in tabla], [team.id for team, _ in torneo.final_standings()])
+        self.assertEqual(sum(int(fila[3]) for fila in tabla), 6)  # 3 puntos por ronda
+
+    def test_archivo_con_errores_no_se_aplica(self):
+        from batch import main
+        torneo = Tournament("Liga")
+        for eid in "1234":
+            torneo.add_team(eid, "Equipo")
+        torneo.attach_journal(self.diario)
+        (a, b), (c, d) = torneo.generate_pairings()
+        torneo.detach_journal()
+
+        malo = self.escribir("malo.csv", f"{b},{a},2,1\n{c},9,1,0\n{c},{d},x,0\n")
+        self.assertEqual(main([self.diario, "--results", malo]), 1)
+        self.assertEqual(Tournament.load_journal(self.diario, reopen=False).round_scores.missing(), 2)
+
+        # Por partes: primero una mesa (con los equipos al revés) y después la otra
+        self.assertEqual(main([self.diario, "--results", self.escribir("a.csv", f"{b},{a},2,1\n")]), 0)
+        self.assertEqual(main([self.diario, "--results", self.escribir("b.csv", f"{c},{d},0,3\n")]), 0)
+        torneo = Tournament.load_journal(self.diario, reopen=False)
+        self.assertFalse(torneo.results_pending())
+        self.assertEqual(torneo.teams[a].total_points, 1)
+        self.assertEqual(torneo.teams[b].total_points, 2)
+
+    def test_archivo_malo_no_deja_la_ronda_armada(self):
+        from batch import main
+        equipos = self.escribir("equipos.csv", "".join(f"{i},Equipo\n" for i in range(1, 5)))
+        self.assertEqual(main([self.diario, "--new", "Liga", "--teams", equipos,
+                               "--pair", "--pairings", self.ruta("r1.csv")]), 0)
+        r1 = self.resultados("res1.csv", self.leer_csv("r1.csv"))
+        self.assertEqual(main([self.diario, "--results", r1]), 0)
+        esperado = Tournament.load_journal(self.diario, reopen=False).to_dict()
+
+        # El mismo archivo otra vez (ya no son partidos de la ronda) o uno que no existe
+        self.assertEqual(main([self.diario, "--results", r1]), 1)
+        self.assertEqual(main([self.diario, "--results", self.ruta("no_existe.csv")]), 1)
+        torneo = Tournament.load_journal(self.diario, reopen=False)
+        self.assertEqual(torneo.to_dict(), esperado)
+        self.assertEqual((torneo.current_round, torneo.results_pending()), (1, False))
+
+    def test_puntajes_que_no_son_enteros(self):
+        from batch import parse_results
+        pareos = [("1", "2"), ("3", "4")]
+        self.assertEqual(parse_results(["1,2,²,1"], pareos), ([], [(1, "Los puntajes deben ser enteros no negativos.")]))
+        resultados, errores = parse_results(["id1,id2,puntos1,puntos2", "1,2,2,1", "3,4,1.5,0", "4,3,-1,2"], pareos)
+        self.assertEqual(resultados, [(0, 2, 1)])
+        self.assertEqual([linea for linea, _ in errores], [3, 4])
+
+    def test_no_necesita_tkinter(self):
+        codigo = "import sys, batch; sys.exit('tkinter' in sys.modules)"
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(resultado.returncode, 0)
+
+
+class TestMedicionDeTiempos(unittest.TestCase):
+
+    def test_apagado_no_anota_nada(self):
+        from timing import Timings
+        registro = Timings()
+
+        @registro.timed()
+        def pareo(x):
+            return x * 2
+
+        self.assertEqual(pareo(2), 4)
+        self.assertEqual(registro.stats, {})
+        registro.enable()
+        pareo(3)
+        with registro.measure("guardado"):
+            pass
+        self.assertEqual(registro.stats["pareo"].count, 1)
+        self.assertEqual(sorted(fila[0] for fila in registro.summary()), ["guardado", "pareo"])
+
+    def test_histograma_y_volcado(self):
+        import json
+        from timing import BUCKETS_MS, Timings
+        registro = Timings()
+        registro.configure_from_env({"TRUGO_TIMING": "1"})
+        self.assertTrue(registro.enabled)
+        for ms in (0.5, 0.5, 3, 7000):
+            registro.record("pareo", ms / 1000)
+        stat = registro.stats["pareo"]
+        self.assertEqual(stat.buckets[0], 2)
+        self.assertEqual(stat.buckets[BUCKETS_MS.index(5)], 1)
+        self.assertEqual(stat.buckets[-1], 1)
+        self.assertEqual(stat.percentile(0.5), 1)
+        self.assertAlmostEqual(stat.percentile(0.95), 7000)
+        with tempfile.TemporaryDirectory() as carpeta:
+            with open(registro.dump(os.path.join(carpeta, "t.json")), encoding="utf-8") as f:
+                volcado = json.load(f)
+        self.assertEqual(volcado["pareo"]["count"], 4)
+        self.assertEqual(sum(hits for _limite, hits in volcado["pareo"]["histogram_ms"]), 4)
+
+    def test_linea_de_comandos_con_tiempos(self):
+        import json
+        from batch import main
+        from timing import timings
+        with tempfile.TemporaryDirectory() as carpeta:
+            equipos = os.path.join(carpeta, "equipos.csv")
+            with open(equipos, "w", encoding="utf-8") as f:
+                f.write("1,Uno\n2,Dos\n")
+            salida = os.path.join(carpeta, "tiempos.json")
+            try:
+                self.assertEqual(main([os.path.join(carpeta, "T.journal"), "--new", "T", "--teams", equipos,
+                                       "--pair", "--timing", salida]), 0)
+            finally:
+                timings.enabled = False
+                timings.reset()
+            with open(salida, encoding="utf-8") as f:
+                volcado = json.load(f)
+        self.assertEqual(volcado["generate_pairings"]["count"], 1)
+        self.assertIn("compact_journal", volcado)
+
+
+class TestDeshacer(unittest.TestCase):
+
+    def setUp(self):
+        self.torneo = Tournament("Deshacer")
+        for i in range(1, 8):
+            self.torneo.add_team(str(i), f"Equipo {chr(64 + i)}")
+        self.torneo.enable_undo()
+
+    def jugar(self):
+        """Gana siempre el primero de cada mesa 2 a 1 (el libre se lleva 1)."""
+        self.torneo.submit_results([(t1, t2, 2, 0 if t2 == "BYE" else 1) for t1, t2 in self.torneo.current_matches])
+
+    def estado(self):
+        return self.torneo.to_dict(), self.torneo.final_standings()
+
+    def test_rondas_y_correcciones_ida_y_vuelta(self):
+        estados = [self.estado()]
+        for _ in range(3):
+            self.torneo.generate_pairings()
+            estados.append(self.estado())
+            self.jugar()
+            estados.append(self.estado())
+        self.torneo.correct_points("3", 40)
+        estados.append(self.estado())
+
+        for esperado in reversed(estados[:-1]):
+            self.assertIsNotNone(self.torneo.undo())
+            self.assertEqual(self.estado(), esperado)
+        self.assertIsNone(self.torneo.undo())
+        for esperado in estados[1:]:
+            self.assertIsNotNone(self.torneo.redo())
+            self.assertEqual(self.estado(), esperado)
+        self.assertIsNone(self.torneo.redo())
+
+    def test_un_paso_nuevo_descarta_lo_deshecho(self):
+        self.torneo.generate_pairings()
+        self.jugar()
+        self.assertEqual(self.torneo.undo(), "Resultados de la ronda 1")
+        self.assertEqual(self.torneo.undo(), "Pareo de la ronda 1")
+        self.torneo.generate_pairings()  # Otro pareo en lugar del deshecho
+        self.assertFalse(self.torneo.can_redo())
+        self.assertEqual(self.torneo.current_round, 1)
+
+    def test_resultados_parciales_y_grupos(self):
+        self.torneo.generate_pairings()
+        self.torneo.record_match_result(1, 3, 0, 0)  # Un partido cargado, la ronda sigue abierta
+        with self.torneo.undo_group("Corrección de puntajes"):
+            self.torneo.correct_points("1", 10)
+            self.torneo.correct_points("2", 20)
+        self.assertEqual(self.torneo.undo(), "Corrección de puntajes")
+        self.assertEqual((self.torneo.teams["1"].total_points, self.torneo.teams["2"].total_points), (0, 0))
+        self.assertEqual(self.torneo.round_scores.missing(), len(self.torneo.current_matches) - 1)
+        self.assertEqual(self.torneo.round_scores.versions[1], 1)
+
+    def test_las_fotos_comparten_los_equipos_sin_cambios(self):
+        from undo import CHUNK
+        torneo = Tournament("Grande")
+        torneo.add_teams((str(i), "Equipo") for i in range(1000))
+        torneo.enable_undo()
+        for i in range(20):
+            torneo.correct_points(str(i * 37), i + 1)
+        estados = torneo.undo_history._states
+        for antes, despues in zip(estados, estados[1:]):
+            distintos = sum(a is not b for a, b in zip(antes.teams.chunks(), despues.teams.chunks()))
+            self.assertEqual(distintos, 1)  # Una corrección copia un solo bloque
+        self.assertEqual(len(estados[-1].teams.chunks()), -(-1000 // CHUNK))
+
+    def test_el_diario_queda_como_lo_deshecho(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "Deshacer.journal")
+            self.torneo.attach_journal(ruta)
+            self.torneo.generate_pairings()
+            self.jugar()
+            self.torneo.generate_pairings()
+            self.torneo.undo()
+            self.torneo.undo()
+            self.torneo.detach_journal()
+            cargado = Tournament.load_journal(ruta, reopen=False)
+        self.assertEqual(cargado.to_dict(), self.torneo.to_dict())
+        self.assertEqual(cargado.current_round, 1)
+        self.assertTrue(cargado.results_pending())
+
+    def test_inscribir_equipos_empieza_de_nuevo(self):
+        self.torneo.generate_pairings()
+        self.torneo.add_team("99", "Tarde")
+        self.assertFalse(self.torneo.can_undo())
+        self.jugar()
+        self.assertEqual(self.torneo.undo(), None)  # La foto de base es la de después de inscribir
+        self.assertFalse(self.torneo.can_redo())
+
+
+class TestPlanillaDeCorrecciones(unittest.TestCase):
+
+    def setUp(self):
+        self.torneo = Tournament("Correcciones")
+        for eid, nombre in (("10", "Zorros"), ("11", "aguilas"), ("12", "Leones"), ("13", "Tigres")):
+            self.torneo.add_team(eid, nombre)
+        self.planilla = CorrectionSheet(self.torneo.teams)
+
+    def test_busca_por_nombre_o_id_sin_perder_lo_escrito(self):
+        self.assertEqual([t.name for t in self.planilla.visible], ["aguilas", "Leones", "Tigres", "Zorros"])
+        leones = self.torneo.teams["12"]
+        self.planilla.set(leones, "7")
+        self.assertEqual([t.id for t in self.planilla.search("TIG")], ["13"])
+        self.assertEqual([t.id for t in self.planilla.search("12")], ["12"])
+        self.planilla.search("")
+        self.assertEqual(len(self.planilla.visible), 4)
+        self.assertEqual(self.planilla.get(leones), "7")
+
+    def test_solo_devuelve_los_cambiados(self):
+        zorros, tigres = self.torneo.teams["10"], self.torneo.teams["13"]
+        self.planilla.set(zorros, " 5 ")
+        self.planilla.set(tigres, "3")
+        self.planilla.set(tigres, "0")  # Vuelve al valor actual: deja de contar
+        self.assertTrue(self.planilla.is_dirty(zorros))
+        self.assertFalse(self.planilla.is_dirty(tigres))
+        self.assertEqual(self.planilla.changes(), {"10": 5})
+
+        self.planilla.set(tigres, "x")
+        with self.assertRaises(ValueError) as error:
+            self.planilla.changes()
+        self.assertIn("Tigres", str(error.exception))
+
+        self.planilla.set(tigres, "²")
+        with self.assertRaises(ValueError) as error:
+            self.planilla.changes()
+        self.assertIn("Puntaje inválido para: Tigres", str(error.exception))
+
+    def test_correcciones_anotadas_y_un_solo_paso(self):
+        self.torneo.enable_undo()
+        self.torneo.generate_pairings()
+        eventos = []
+        self.torneo._record = eventos.append
+        cambiados = self.torneo.correct_many({"10": 4, "11": 0, "12": 6}, "Planilla mal sumada")
+        self.assertEqual(cambiados, ["10", "12"])
+        self.assertEqual(eventos, [
+            {"type": "score_corrected", "id": "10", "old": 0, "new": 4, "round": 1, "reason": "Planilla mal sumada"},
+            {"type": "score_corrected", "id": "12", "old": 0, "new": 6, "round": 1, "reason": "Planilla mal sumada"},
+        ])
+        self.assertEqual(self.torneo.undo(), "Corrección de puntajes")
+        self.assertEqual(self.torneo.teams["10"].total_points, 0)
+        self.assertEqual(self.torneo.teams["12"].total_points, 0)
+
+    def test_auditoria_en_la_base(self):
+        from storage_sqlite import SQLiteStore
+        with tempfile.TemporaryDirectory() as carpeta:
+            store = SQLiteStore(os.path.join(carpeta, "temporada.sqlite3"))
+            try:
+                self.torneo.attach_store(store)
+                self.torneo.correct_many({"13": 9}, "Reclamo de mesa 2")
+                store.save_tournament(self.torneo)  # Guardar todo de nuevo no borra la auditoría
+                filas = store.corrections("Correcciones")
+                self.assertEqual([(f["team_id"], f["old"], f["new"], f["round"], f["reason"]) for f in filas],
+                                 [("13", 0, 9, 0, "Reclamo de mesa 2")])
+                self.assertEqual(store.load_tournament("Correcciones").teams["13"].total_points, 9)
+            finally:
+                store.close()
+
+
+class TestExportacion(unittest.TestCase):
+
+    def setUp(self):
+        self.torneo = Tournament("Liga <Norte>")
+        for i in range(1, 6):
+            self.torneo.add_team(str(i), f"Equipo {i}")
+        for _ in range(2):
+            self.torneo.generate_pairings()
+            self.torneo.submit_results([(t1, t2, 3, 0 if t2 == "BYE" else 1) for t1, t2 in self.torneo.current_matches])
+        self.torneo.generate_pairings()
+        self.torneo.record_match_result(1, 2, 2, 0)  # Ronda 3 abierta, con un resultado (el 0 es el libre)
+
+    def test_tabla_sin_reordenar_igual_a_la_de_siempre(self):
+        valores = self.torneo.tiebreaks.values()
+        esperado = sorted(((t, valores[t.id]) for t in self.torneo.standings),
+                          key=lambda item: (item[0].total_points,) + item[1], reverse=True)
+        self.assertEqual(self.torneo.final_standings(), esperado)
+
+    def test_resultados_una_vez_por_partido(self):
+        from export import results_rows
+        filas = list(results_rows(self.torneo))
+        # 2 rondas cerradas de 3 partidos (uno libre) y uno confirmado de la abierta
+        self.assertEqual(len(filas), 7)
+        self.assertEqual(filas[-1][0], 3)
+        self.assertEqual(filas[-1][5:], (2, 2))
+        partidos = {(f[0], frozenset((f[1], f[3]))) for f in filas}
+        self.assertEqual(len(partidos), 7)
+
+    def test_csv_json_y_html(self):
+        import json
+        from export import export
+        with tempfile.TemporaryDirectory() as carpeta:
+            base = os.path.join(carpeta, "liga")
+            escritos = export(self.torneo, base)
+            self.assertEqual(sorted(os.path.basename(p) for p in escritos),
+                             ["liga.html", "liga.json", "liga_pareos.csv", "liga_posiciones.csv", "liga_resultados.csv"])
+            with open(base + "_posiciones.csv", encoding="utf-8") as f:
+                lineas = f.read().splitlines()
+            self.assertEqual(lineas[0].split(",")[:4], ["posicion", "id", "equipo", "puntos"])
+            self.assertEqual(len(lineas), 6)
+            with open(base + ".json", encoding="utf-8") as f:
+                datos = json.load(f)
+            self.assertEqual(datos["round"], 3)
+            self.assertEqual([fila["id"] for fila in datos["standings"]],
+                             [t.id for t, _ in self.torneo.final_standings()])
+            self.assertEqual(len(datos["pairings"]), 3)
+            self.assertEqual(len(datos["results"]), 7)
+            with open(base + ".html", encoding="utf-8") as f:
+                pagina = f.read()
+            self.assertIn("Liga &lt;Norte&gt;", pagina)
+            self.assertEqual(pagina.count("<tr>"), 3 + 5 + 3 + 7)
+
+    def test_memoria_acotada_por_el_grupo_de_empatados(self):
+        """
+        Exportar sólo guarda el grupo de empatados que está ordenando: la
+        memoria crece con el grupo más grande, no con el texto exportado.
+        """
+        import tracemalloc
+        from itertools import groupby
+        from export import write_html, write_json
+
+        class Contador:
+            largo = 0
+
+            def write(self, texto):
+                self.largo += len(texto)
+
+        torneo = Tournament("Grande")
+        for i in range(3000):
+            torneo.add_team(str(i), f"Equipo {i}")
+        for _ in range(2):
+            torneo.generate_pairings()
+            torneo.submit_results([(t1, t2, 2, 0 if t2 == "BYE" else 1) for t1, t2 in torneo.current_matches])
+        torneo.tiebreaks.values()  # Los desempates son del modelo: se calculan antes de medir
+        grupo = max(len(list(empatados)) for _, empatados in groupby(torneo.standings, key=lambda t: t.total_points))
+        for escribir in (write_json, write_html):
+            salida = Contador()
+            tracemalloc.start()
+            escribir(salida, torneo)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Unos 128 bytes por equipo del grupo, más lo de una fila (16 KB de sobra)
+            self.assertLess(pico, 16384 + 128 * grupo)
+            self.assertLess(pico, salida.largo / 4)
+
+
+class TestPantallaEnVivo(unittest.TestCase):
+
+    def setUp(self):
+        self.torneo = Tournament("En vivo")
+        for i in range(1, 8):
+            self.torneo.add_team(str(i), f"Equipo {i}")
+        self.torneo.generate_pairings()
+
+    def test_solo_viajan_las_diferencias(self):
+        from live_display import LivePublisher, apply_delta, diff_views, public_view
+        publicador = LivePublisher()
+        self.assertEqual(publicador.publish(self.torneo), {})  # Sin pantallas no se calcula nada
+        recibidos = []
+        copia = apply_delta({}, diff_views(None, publicador.subscribe(recibidos.append, self.torneo)))
+
+        self.torneo.record_match_result(2, 5, 1, 0)
+        delta = publicador.publish(self.torneo)
+        self.assertEqual(recibidos, [delta])
+        # La ronda sigue abierta: cambian el partido y lo que falta, no la tabla
+        self.assertEqual(set(delta), {"missing", "matches"})
+        self.assertEqual([fila[0] for fila in delta["matches"]["rows"]], [2])
+        self.assertEqual(publicador.publish(self.torneo), {})
+
+        for indice, (_, rival) in enumerate(self.torneo.current_matches):
+            if self.torneo.round_scores.confirmed[indice] is None:
+                self.torneo.record_match_result(indice, 3, 0 if rival == "BYE" else 2, 0)
+        self.torneo.generate_pairings()
+        publicador.publish(self.torneo)
+        for delta in recibidos:
+            apply_delta(copia, delta)
+        self.assertEqual(copia, public_view(self.torneo))
+
+    def test_pagina_por_server_sent_events(self):
+        import json
+        import socket
+        from live_display import LiveServer, diff_views, public_view
+
+        def leer_evento(archivo):
+            campos = {}
+            for linea in archivo:
+                linea = linea.decode("utf-8").rstrip("\n")
+                if not linea:
+                    if "data" in campos:
+                        return campos["event"], json.loads(campos["data"])
+                    continue
+                clave, _, valor = linea.partition(": ")
+                campos[clave] = valor
+
+        servidor = LiveServer()
+        puerto = servidor.start("127.0.0.1", 0)
+        try:
+            servidor.publish(diff_views(None, public_view(self.torneo)))
+            with socket.create_connection(("127.0.0.1", puerto), timeout=5) as conexion:
+                conexion.sendall(b"GET /events HTTP/1.1\r\nHost: test\r\n\r\n")
+                archivo = conexion.makefile("rb")
+                while archivo.readline() not in (b"\r\n", b""):
+                    pass  # Encabezados de la respuesta
+                tipo, vista = leer_evento(archivo)
+                self.assertEqual(tipo, "snapshot")
+                self.assertEqual(vista, public_view(self.torneo))
+                servidor.publish({"missing": 2, "matches": {"length": 4, "rows": [[1, [2, "A", "B", 1, 0]]]}})
+                self.assertEqual(leer_evento(archivo), ("delta", {"missing": 2, "matches": {"length": 4, "rows": [[1, [2, "A", "B", 1, 0]]]}}))
+            with socket.create_connection(("127.0.0.1", puerto), timeout=5) as conexion:
+                conexion.sendall(b"GET / HTTP/1.1\r\nHost: test\r\n\r\n")
+                respuesta = conexion.makefile("rb").read().decode("utf-8")
+            self.assertIn("EventSource", respuesta)
+        finally:
+            servidor.stop()
+
+
+class TestResultadosPorPartido(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.torneo = Tournament("Torneo")
+        for eid in "ABCD":
+            self.torneo.add_team(eid, "Eq" + eid)
+        self.torneo.generate_pairings()
+
+    def tearDown(self):
+        self.torneo.detach_journal()
+        self.carpeta.cleanup()
+
+    def test_versiones_y_conflictos(self):
+        from tournament_engine import ResultConflict
+        self.assertEqual(self.torneo.record_match_result(0, 3, 1, 0), (1, False))
+        with self.assertRaises(ResultConflict) as error:
+            self.torneo.record_match_result(0, 2, 2, 0)  # Otro árbitro cargó sobre la versión vieja
+        self.assertEqual(error.exception.version, 1)
+        self.assertEqual(self.torneo.record_match_result(0, 2, 2, 1), (2, False))
+        self.assertEqual(self.torneo.round_scores.confirmed[0], (2, 2))
+        with self.assertRaises(ValueError):
+            self.torneo.record_match_result(1, -1, 2, 0)
+        with self.assertRaises(ValueError):
+            self.torneo.record_match_result(5, 1, 2, 0)
+
+    def test_el_ultimo_resultado_cierra_la_ronda(self):
+        (a, b), (c, d) = self.torneo.current_matches
+        self.torneo.record_match_result(1, 1, 0, 0)
+        self.assertTrue(self.torneo.results_pending())
+        self.assertEqual(self.torneo.teams[c].total_points, 0)  # Todavía no se suma nada
+        self.assertEqual(self.torneo.record_match_result(0, 2, 2, 0), (1, True))
+        self.assertFalse(self.torneo.results_pending())
+        self.assertEqual([self.torneo.teams[e].total_points for e in (a, b, c, d)], [2, 2, 1, 0])
+        self.assertEqual(self.torneo.teams[c].history, [(1, d, 1, 0)])
+        with self.assertRaises(ValueError):
+            self.torneo.record_match_result(0, 3, 3, 1)  # Ronda cerrada
+
+    def test_el_diario_conserva_los_resultados_sueltos(self):
+        ruta = os.path.join(self.carpeta.name, "Torneo.journal")
+        self.torneo.attach_journal(ruta)
+        self.torneo.record_match_result(1, 4, 1, 0)
+        self.torneo.record_match_result(1, 4, 2, 1)
+        self.torneo.detach_journal()
+
+        cargado = Tournament.load_journal(ruta, reopen=False)
+        scores = cargado.round_scores
+        self.assertEqual((scores.confirmed[1], scores.versions[1], scores.missing()), ((4, 2), 2, 1))
+        self.assertEqual(cargado.record_match_result(0, 1, 1, 0), (1, True))
+
+    def test_enviar_la_planilla_es_un_solo_evento(self):
+        ruta = os.path.join(self.carpeta.name, "Torneo.journal")
+        self.torneo.attach_journal(ruta)
+        self.torneo.record_match_result(0, 3, 0, 0)
+        scores = self.torneo.round_scores
+        scores.set(1, 0, "-1")
+        scores.set(1, 1, "2")
+        with self.assertRaises(ValueError):
+            self.torneo.submit_round_scores()
+        self.assertEqual((scores.missing(), self.torneo.results_pending()), (1, True))  # No cambió nada
+
+        scores.set(1, 0, "1")
+        self.torneo.submit_round_scores()
+        self.torneo.detach_journal()
+        import json
+        with open(ruta, encoding="utf-8") as f:
+            self.assertEqual([json.loads(linea)["type"] for linea in f], ["match_result", "round_results"])
+        self.assertEqual(Tournament.load_journal(ruta, reopen=False).to_dict(), self.torneo.to_dict())
+
+    def test_los_resultados_sueltos_no_compactan(self):
+        ruta = os.path.join(self.carpeta.name, "Torneo.journal")
+        self.torneo.attach_journal(ruta, compact_every=1)
+        self.torneo.journal.snapshot_size = 0  # Por tamaño ya tocaría compactar
+        self.torneo.record_match_result(0, 3, 0, 0)
+        self.assertEqual(self.torneo.journal.since_snapshot, 1)
+        self.torneo.record_match_result(1, 1, 0, 0)  # Cierra la ronda: ahora sí
+        self.assertEqual(self.torneo.journal.since_snapshot, 0)
+
+    def test_la_foto_conserva_los_resultados_sueltos(self):
+        ruta = os.path.join(self.carpeta.name, "Torneo.trugo")
+        self.torneo.record_match_result(0, 3, 0, 0)
+        self.torneo.save_snapshot(ruta)
+        cargado = Tournament.load_snapshot(ruta)
+        self.assertEqual((cargado.round_scores.confirmed, cargado.round_scores.versions),
+                         (self.torneo.round_scores.confirmed, self.torneo.round_scores.versions))
+        self.assertTrue(cargado.results_pending())
+
+    def test_arbitros_a_la_vez_en_el_servidor(self):
+        import asyncio
+        from server import Client, TournamentHost, TournamentServer
+
+        async def correr():
+            servidor = TournamentServer(TournamentHost())
+            puerto = await servidor.start("127.0.0.1", 0)
+            clientes = [Client("127.0.0.1", puerto) for _ in range(4)]
+            try:
+                c = clientes[0]
+                await c.request("POST", "/tournaments", {"name": "Mesas"})
+                await c.request("POST", "/tournaments/Mesas/teams",
+                                {"teams": [{"id": str(i), "name": str(i)} for i in range(8)]})
+                await c.request("POST", "/tournaments/Mesas/pairings")
+
+                # Dos árbitros cargan la mesa 1 sobre la misma versión: sólo uno gana
+                respuestas = await asyncio.gather(*(cliente.request("POST", "/tournaments/Mesas/matches/1",
+                                                                    {"scores": [2, 1], "version": 0})
+                                                    for cliente in clientes[:2]))
+                self.assertEqual(sorted(estado for estado, _ in respuestas), [200, 409])
+                self.assertEqual([datos["version"] for estado, datos in respuestas if estado == 409], [1])
+
+                respuestas = await asyncio.gather(*(cliente.request("POST", f"/tournaments/Mesas/matches/{mesa}",
+                                                                    {"scores": [1, 1], "version": 0})
+                                                    for mesa, cliente in zip((2, 3, 4), clientes[1:])))
+                self.assertEqual([estado for estado, _ in respuestas], [200, 200, 200])
+                cierre = [datos for _, datos in respuestas if datos["round_closed"]]
+                self.assertEqual(len(cierre), 1)
+                self.assertEqual(cierre[0]["next"]["round"], 2)
+                self.assertEqual((await c.request("POST", "/tournaments/Mesas/matches/9", {"scores": [1, 1]}))[0], 400)
+            finally:
+                for cliente in clientes:
+                    await cliente.close()
+                await servidor.stop()
+        asyncio.run(correr())
+
+
 if __name__ == '__main__':
     print("Iniciando pruebas de lógica de Trugo...")
     unittest.main()
\ No newline at end of file
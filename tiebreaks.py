@@ -0,0 +1,137 @@
+"""
+Desempates para la tabla final (ver conflictos.md).
+
+Cuando varios equipos terminan con los mismos puntos, se ordenan por estos
+criterios, en el orden de TIEBREAK_ORDER:
+
+- Resultado directo: resultados (1 ganado, 0.5 empatado, 0 perdido) contra
+  los rivales que terminaron con los mismos puntos que el equipo.
+- Buchholz: suma de los puntos de todos sus rivales.
+- Buchholz mediano: igual, sin contar al mejor ni al peor rival.
+- Sonneborn-Berger: suma de los puntos de los rivales ponderada por el
+  resultado contra cada uno (a quién le ganó pesa más que a quién no).
+
+El índice guarda una matriz rival/resultado con una fila por equipo que se
+completa a medida que se cargan resultados, y calcula todos los criterios
+de todos los equipos en una sola pasada, sólo cuando cambió algo.
+"""
+
+HEAD_TO_HEAD = "head_to_head"
+BUCHHOLZ = "buchholz"
+MEDIAN_BUCHHOLZ = "median_buchholz"
+SONNEBORN_BERGER = "sonneborn_berger"
+
+# Orden en que se aplican (y en que aparecen en cada tupla de valores)
+TIEBREAK_ORDER = (HEAD_TO_HEAD, BUCHHOLZ, MEDIAN_BUCHHOLZ, SONNEBORN_BERGER)
+
+TIEBREAK_LABELS = {
+    HEAD_TO_HEAD: "Directo",
+    BUCHHOLZ: "Buchholz",
+    MEDIAN_BUCHHOLZ: "Mediano",
+    SONNEBORN_BERGER: "S-B",
+}
+
+NO_TIEBREAKS = (0,) * len(TIEBREAK_ORDER)
+
+
+def match_result(points_for, points_against):
+    """Resultado de un partido para el equipo: 1 ganado, 0.5 empatado, 0 perdido."""
+    if points_for > points_against:
+        return 1
+    if points_for == points_against:
+        return 0.5
+    return 0
+
+
+class TiebreakIndex:
+    """
+    Matriz rival/resultado del torneo. Tournament le avisa de cada equipo y
+    de cada resultado; values() devuelve {id: (criterios en TIEBREAK_ORDER)}.
+    """
+    def __init__(self):
+        self._slots = {}      # id -> fila de la matriz
+        self._teams = []      # fila -> Team (un equipo quitado conserva su fila)
+        self._opponents = []  # fila -> filas de los rivales, una por partido
+        self._results = []    # fila -> resultado de cada uno de esos partidos
+        self._values = None   # Caché del último cálculo (None = hay que recalcular)
+
+    def add(self, team):
+        if self._opponents is None:
+            self._build_rows()
+        self._slots[team.id] = len(self._teams)
+        self._teams.append(team)
+        self._opponents.append([])
+        self._results.append([])
+        self._values = None
+
+    def remove(self, team):
+        if self._slots.get(team.id) is not None and self._teams[self._slots[team.id]] is team:
+            del self._slots[team.id]
+            self._values = None
+
+    def rebuild(self, teams):
+        """
+        Vuelve a empezar con estos equipos. Las filas se arman desde el
+        historial de cada equipo recién cuando se piden los valores, así cargar
+        un torneo no paga por desempates que quizás nunca se muestren.
+        """
+        self.__init__()
+        self._teams = list(teams)
+        self._slots = {team.id: slot for slot, team in enumerate(self._teams)}
+        self._opponents = self._results = None
+
+    def _build_rows(self):
+        slots = self._slots
+        self._opponents = []
+        self._results = []
+        for team in self._teams:
+            played = [(slots[oid], pf, pa) for _round, oid, pf, pa in team.history if oid in slots]
+            self._opponents.append([slot for slot, _pf, _pa in played])
+            self._results.append([1 if pf > pa else 0.5 if pf == pa else 0 for _slot, pf, pa in played])
+
+    def add_result(self, team1_id, team2_id, score1, score2):
+        """Anota un partido entre dos equipos (no se llama para el BYE)."""
+        if self._opponents is None:
+            return  # Ya está en el historial: entra al armar las filas
+        slot1 = self._slots[team1_id]
+        slot2 = self._slots[team2_id]
+        self._opponents[slot1].append(slot2)
+        self._results[slot1].append(match_result(score1, score2))
+        self._opponents[slot2].append(slot1)
+        self._results[slot2].append(match_result(score2, score1))
+        self._values = None
+
+    def invalidate(self):
+        """Cambiaron puntos: los criterios se recalculan la próxima vez que se pidan."""
+        self._values = None
+
+    def values(self):
+        if self._values is None:
+            self._values = self._compute()
+        return self._values
+
+    def get(self, team_id):
+        return self.values().get(team_id, NO_TIEBREAKS)
+
+    def _compute(self):
+        if self._opponents is None:
+            self._build_rows()
+        points = [team.total_points for team in self._teams]
+        values = {}
+        for team_id, slot in self._slots.items():
+            own = points[slot]
+            buchholz = sonneborn = head_to_head = 0
+            highest = lowest = None
+            for opponent, result in zip(self._opponents[slot], self._results[slot]):
+                p = points[opponent]
+                buchholz += p
+                sonneborn += p * result
+                if p == own:
+                    head_to_head += result
+                if highest is None or p > highest:
+                    highest = p
+                if lowest is None or p < lowest:
+                    lowest = p
+            median = buchholz - highest - lowest if len(self._opponents[slot]) > 2 else buchholz
+            values[team_id] = (head_to_head, buchholz, median, sonneborn)
+        return values
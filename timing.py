@@ -0,0 +1,176 @@
+"""
+Medición de tiempos de las operaciones lentas (pareo, guardado, dibujo).
+
+Un cambio de ronda encadena el pareo, el guardado y el redibujo de las
+pantallas en una sola llamada, y en un evento real no se ve cuál de esos
+pasos es el que tarda. Las funciones marcadas con @timings.timed("nombre")
+(o los bloques dentro de `with timings.measure("nombre")`) anotan cuánto
+tardaron: cantidad de llamadas, tiempo total y máximo, y un histograma por
+tramos (BUCKETS_MS).
+
+Está apagado por defecto y apagado cuesta una sola comprobación por
+llamada. Se prende con la variable de entorno TRUGO_TIMING:
+
+    TRUGO_TIMING=1 python tournament_app.py            (F12 abre el panel de tiempos)
+    TRUGO_TIMING=tiempos.json python tournament_app.py (además se vuelca al salir)
+
+o con --timing ARCHIVO en batch.py. El volcado es un JSON con una entrada
+por operación (ver Timings.to_dict).
+
+Este módulo no importa el motor ni tkinter.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from journal import write_atomic
+
+ENV_VAR = "TRUGO_TIMING"
+
+# Límite superior (en milisegundos) de cada tramo del histograma; el último tramo es "más que eso"
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class TimingStat:
+    """Medidas acumuladas de una operación."""
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, limit in enumerate(BUCKETS_MS):
+            if ms <= limit:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction):
+        """Cota superior (en ms) del percentil según el histograma (el máximo si cae en el último tramo)."""
+        needed = fraction * self.count
+        seen = 0
+        for limit, hits in zip(BUCKETS_MS, self.buckets):
+            seen += hits
+            if hits and seen >= needed:
+                return min(limit, self.max)
+        return self.max
+
+
+class Timings:
+    """Registro de tiempos por nombre de operación. Se puede usar desde varios hilos."""
+    def __init__(self):
+        self.enabled = False
+        self.dump_path = None
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self, dump_path=None):
+        """Empieza a medir. Con `dump_path`, los tiempos se vuelcan ahí al terminar el programa."""
+        self.enabled = True
+        if dump_path and self.dump_path is None:
+            atexit.register(self._dump_at_exit)
+        self.dump_path = dump_path or self.dump_path
+
+    def configure_from_env(self, environ=os.environ):
+        """Lee TRUGO_TIMING: "1" prende la medición; cualquier otro valor es además el archivo de volcado."""
+        value = environ.get(ENV_VAR, "").strip()
+        if value and value != "0":
+            self.enable(None if value == "1" else value)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = TimingStat()
+            stat.add(seconds)
+
+    @contextmanager
+    def measure(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name=None):
+        """Decorador: mide cada llamada a la función (con su nombre o `name`)."""
+        def decorate(func):
+            label = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def summary(self):
+        """
+        Filas (nombre, llamadas, total ms, promedio ms, p50 ms, p95 ms, máximo ms),
+        de la operación que más tiempo se llevó en total a la que menos.
+        """
+        with self._lock:
+            stats = list(self.stats.items())
+        rows = [(name, s.count, s.total, s.total / s.count, s.percentile(0.5), s.percentile(0.95), s.max)
+                for name, s in stats]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            stats = list(self.stats.items())
+        return {
+            name: {"count": s.count, "total_ms": round(s.total, 3), "mean_ms": round(s.total / s.count, 3),
+                   "max_ms": round(s.max, 3),
+                   "histogram_ms": [[limit, hits] for limit, hits in zip(BUCKETS_MS + (None,), s.buckets)]}
+            for name, s in stats
+        }
+
+    def report(self):
+        """Resumen en texto, una operación por línea."""
+        lines = [f"{'operación':<22}{'llamadas':>9}{'total ms':>11}{'prom. ms':>10}"
+                 f"{'p50 ≤':>9}{'p95 ≤':>9}{'máx ms':>10}"]
+        for name, count, total, mean, p50, p95, worst in self.summary():
+            lines.append(f"{name:<22}{count:>9}{total:>11.1f}{mean:>10.2f}{p50:>9.1f}{p95:>9.1f}{worst:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Escribe los tiempos en JSON (de forma atómica)."""
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        write_atomic(path, lambda f: f.write(text))
+        return path
+
+    def _dump_at_exit(self):
+        if self.dump_path and self.stats:
+            try:
+                self.dump(self.dump_path)
+            except OSError as e:
+                print(f"No se pudieron guardar los tiempos en {self.dump_path}: {e}")
+
+
+# Registro único del programa: el motor, la interfaz y batch.py anotan acá
+timings = Timings()
+timings.configure_from_env()
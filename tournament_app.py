@@ -1,6 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, font, messagebox, filedialog
-import os  # Necesario para crear y leer archivos del sistema
+from bisect import bisect_left
+import sys
+import time
+
+# El modelo y la lógica de pareos viven en un módulo sin tkinter
+from tournament_engine import CorrectionSheet, Team, Tournament, BYE, PAIRING_GREEDY, PAIRING_OPTIMAL, PAIRING_SCORE_GROUPS, PAIRING_SEARCH
+from journal import JOURNAL_EXTENSION
+from snapshot import SNAPSHOT_EXTENSION
+from tiebreaks import TIEBREAK_ORDER, TIEBREAK_LABELS
+from autosave import AutosaveWriter
+from timing import timings
 
 # =============================================================================
 # CONFIGURACIÓN Y CONSTANTES
@@ -21,25 +31,329 @@ FONT_MAIN      = ("Helvetica", 11)
 FONT_HEADER    = ("Helvetica", 20, "bold")
 FONT_SUBHEADER = ("Helvetica", 14, "bold")
 
+# Alto (en píxeles) de cada tarjeta de partido en la lista virtual
+MATCH_ROW_HEIGHT = 80
+
+# Alto (en píxeles) de cada fila del editor de correcciones
+CORRECTION_ROW_HEIGHT = 36
+
+# Equipos que se muestran en el panel de probabilidades
+FORECAST_ROWS = 8
+
+# Cada cuántos milisegundos se revisa si terminó una estimación en segundo plano (ver forecast.py)
+FORECAST_POLL_MS = 100
+
+# Cada cuántos milisegundos se revisa el guardado en segundo plano (errores y avisos)
+AUTOSAVE_POLL_MS = 300
+
+# Segundos que se espera al cerrar la ventana para terminar de guardar
+AUTOSAVE_CLOSE_TIMEOUT = 5
+
+# Segundos que se espera antes de cargar un archivo a que termine lo pendiente
+AUTOSAVE_FLUSH_TIMEOUT = 5
+
 # =============================================================================
-# MODELO DE DATOS
+# COMPONENTES REUTILIZABLES
 # =============================================================================
 
-class Team:
+class VirtualList:
     """
-    Representa a un equipo en el torneo.
-    Guarda su nombre, ID, puntos acumulados y con quién ha jugado.
+    Lista con scroll que sólo dibuja las filas visibles.
+
+    En lugar de crear un widget por elemento, mantiene un pequeño "pool" de
+    filas (las que entran en pantalla más un par extra) y, al desplazarse,
+    las reubica y les asigna el elemento que corresponde. Así una lista de
+    miles de partidos cuesta lo mismo que una de diez.
+
+    - create_row(parent) crea y devuelve el widget de una fila.
+    - bind_row(widget, index) carga en la fila los datos del elemento index.
+    Las filas tienen altura fija (row_height, en píxeles).
     """
-    def __init__(self, team_id, name):
-        self.id = team_id              # Identificador único (ej. "EQ01")
-        self.name = name               # Nombre visible (ej. "Los Tigres")
-        self.total_points = 0          # Puntos totales en el torneo
-        self.opponents_played = set()  # Conjunto de IDs de equipos contra los que ya jugó
-        self.received_bye = False      # Marca si ya recibió una victoria libre (BYE)
+    def __init__(self, parent, row_height, create_row, bind_row, bg=COLOR_FONDO_MAIN):
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.count = 0
+        self._rows = []  # [widget, id de ventana en el canvas, índice asignado]
+
+        self.canvas = tk.Canvas(parent, bg=bg, highlightthickness=0, yscrollincrement=row_height // 4)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        # La rueda del mouse se captura sólo mientras el puntero está sobre la lista
+        self.canvas.bind("<Enter>", lambda e: self._bind_wheel(True))
+        self.canvas.bind("<Leave>", self._on_leave)
 
-    def __repr__(self):
-        # Representación en texto para depuración
-        return f"Equipo({self.name}, Pts: {self.total_points})"
+    def pack(self):
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def set_count(self, count, reset_scroll=True):
+        """Cambia la cantidad de elementos y vuelve a dibujar las filas visibles."""
+        self.count = count
+        self.canvas.configure(scrollregion=(0, 0, 0, count * self.row_height))
+        if reset_scroll:
+            self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a cargar los datos de las filas visibles (por ejemplo, si cambió el modelo)."""
+        for row in self._rows:
+            row[2] = None
+        self._layout()
+
+    def refresh_index(self, index):
+        """Vuelve a cargar sólo la fila del elemento index, si está en pantalla."""
+        for widget, _, bound in self._rows:
+            if bound == index:
+                self.bind_row(widget, index)
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self._layout()
+
+    def _bind_wheel(self, active):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            if active:
+                self.canvas.bind_all(sequence, self._on_wheel)
+            else:
+                self.canvas.unbind_all(sequence)
+
+    def _on_leave(self, event):
+        # Pasar de la lista a una de sus filas también genera <Leave>: se ignora
+        widget = self.canvas.winfo_containing(event.x_root, event.y_root)
+        inside = widget is not None and (widget == self.canvas or str(widget).startswith(str(self.canvas) + "."))
+        if not inside:
+            self._bind_wheel(False)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -1, "units")
+        else:
+            self.yview("scroll", 1, "units")
+
+    def _on_configure(self, event):
+        for widget, item, _ in self._rows:
+            self.canvas.itemconfigure(item, width=event.width)
+        self._layout()
+
+    def _layout(self):
+        height = max(self.canvas.winfo_height(), self.row_height)
+        needed = height // self.row_height + 2
+        while len(self._rows) < needed:
+            widget = self.create_row(self.canvas)
+            item = self.canvas.create_window(0, -self.row_height, window=widget, anchor="nw",
+                                             width=self.canvas.winfo_width(), height=self.row_height)
+            self._rows.append([widget, item, None])
+
+        first = max(0, int(self.canvas.canvasy(0) // self.row_height))
+        for k, row in enumerate(self._rows):
+            widget, item, bound = row
+            index = first + k
+            if index < self.count:
+                self.canvas.coords(item, 0, index * self.row_height)
+                if bound != index:
+                    self.bind_row(widget, index)
+                    row[2] = index
+            else:
+                # Fila sobrante: se deja fuera de la zona visible
+                self.canvas.coords(item, 0, -2 * self.row_height)
+                row[2] = None
+
+
+def _stable_positions(sequence):
+    """
+    Índices de una subsecuencia creciente más larga de `sequence` (los
+    valores negativos se ignoran). Son las filas que pueden quedarse donde
+    están; sólo hace falta mover las demás.
+    """
+    tails = []        # tails[k] = índice del menor final de una subsecuencia de largo k+1
+    tail_values = []  # sequence[tails[k]], para la búsqueda binaria
+    previous = [-1] * len(sequence)
+    for i, value in enumerate(sequence):
+        if value < 0:
+            continue
+        k = bisect_left(tail_values, value)
+        if k > 0:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    stable = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        stable.add(i)
+        i = previous[i]
+    return stable
+
+
+class TreeSync:
+    """
+    Mantiene un Treeview igual a una lista de filas (iid, valores) tocando
+    sólo lo que cambió: inserta las filas nuevas, borra las que ya no están,
+    actualiza los valores distintos y mueve únicamente las filas que quedan
+    fuera de su lugar (las que no forman parte de la subsecuencia estable).
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self._values = {}  # iid -> valores mostrados
+        self._order = []   # iids en el orden actual del Treeview
+
+    def update(self, rows):
+        tree = self.tree
+        rows = list(rows)
+        new_ids = [iid for iid, _ in rows]
+        new_set = set(new_ids)
+
+        gone = [iid for iid in self._order if iid not in new_set]
+        if gone:
+            tree.delete(*gone)
+
+        old_pos = {}
+        for iid in self._order:
+            if iid in new_set:
+                old_pos[iid] = len(old_pos)
+        positions = [old_pos.get(iid, -1) for iid in new_ids]
+        stable = _stable_positions(positions)
+
+        # Se desenganchan las filas a mover; las que quedan ya están en orden relativo
+        to_move = [new_ids[i] for i, pos in enumerate(positions) if pos >= 0 and i not in stable]
+        if to_move:
+            tree.detach(*to_move)
+
+        for i, (iid, values) in enumerate(rows):
+            if positions[i] < 0:
+                tree.insert("", i, iid=iid, values=values)
+                continue
+            if i not in stable:
+                tree.move(iid, "", i)
+            if self._values[iid] != values:
+                tree.item(iid, values=values)
+
+        self._values = dict(rows)
+        self._order = new_ids
+
+
+class MatchRow(ttk.Frame):
+    """
+    Fila reciclable de la lista de partidos: nombres, puntos, dos casillas y
+    el botón para confirmar ese partido solo. Lo que se escribe va directo a
+    tournament.round_scores; la fila no guarda datos propios, sólo muestra el
+    partido que se le asigna con show().
+    """
+    def __init__(self, parent, controller, on_confirm):
+        super().__init__(parent, style="Main.TFrame", padding=(5, 5))
+        self.controller = controller
+        self.on_confirm = on_confirm
+        self.index = None
+        self._loading = False
+
+        card = ttk.Frame(self, style="Card.TFrame", padding=(15, 5))
+        card.pack(fill="both", expand=True)
+
+        self.t1_lbl = ttk.Label(card, style="Card.TLabel", justify="right", width=20, anchor="e")
+        self.t1_lbl.pack(side="left", padx=10)
+
+        self.s1_var = tk.StringVar()
+        self.s1_ent = ttk.Entry(card, width=5, font=("Helvetica", 14, "bold"), justify="center", textvariable=self.s1_var)
+        self.s1_ent.pack(side="left", padx=5)
+
+        ttk.Label(card, text="vs", style="Card.TLabel", foreground=COLOR_ACENTO).pack(side="left", padx=10)
+
+        self.s2_var = tk.StringVar()
+        self.s2_ent = ttk.Entry(card, width=5, font=("Helvetica", 14, "bold"), justify="center", textvariable=self.s2_var)
+        self.s2_ent.pack(side="left", padx=5)
+
+        self.t2_lbl = ttk.Label(card, style="Card.TLabel", justify="left", width=20, anchor="w")
+        self.t2_lbl.pack(side="left", padx=10)
+
+        self.ok_btn = ttk.Button(card, text="✔", width=3, command=lambda: self.on_confirm(self.index))
+        self.ok_btn.pack(side="right", padx=5)
+        self.state_lbl = ttk.Label(card, style="Card.TLabel", width=10, anchor="e")
+        self.state_lbl.pack(side="right")
+
+        self.s1_var.trace_add("write", lambda *args: self._store(0, self.s1_var))
+        self.s2_var.trace_add("write", lambda *args: self._store(1, self.s2_var))
+
+    def show(self, index):
+        """Muestra el partido `index` de la ronda actual."""
+        tournament = self.controller.tournament
+        team1_id, team2_id = tournament.current_matches[index]
+        scores = tournament.round_scores
+        team1 = tournament.teams[team1_id]
+
+        self.index = index
+        self._loading = True
+        self.t1_lbl.config(text=f"{team1.name}\n({team1.total_points} pts)")
+        self.s1_var.set(scores.get(index, 0))
+
+        # Manejo de BYE
+        if team2_id == BYE:
+            # Input 1 habilitado, Input 2 deshabilitado en 0
+            self.t2_lbl.config(text="--- LIBRE ---")
+            self.s2_ent.config(state="normal")
+            self.s2_var.set(scores.get(index, 1))
+            self.s2_ent.config(state="disabled")
+        else:
+            team2 = tournament.teams[team2_id]
+            self.t2_lbl.config(text=f"{team2.name}\n({team2.total_points} pts)")
+            self.s2_ent.config(state="normal")
+            self.s2_var.set(scores.get(index, 1))
+        self.state_lbl.config(text="Cargado" if scores.confirmed[index] is not None else "")
+        self._loading = False
+
+    def _store(self, side, var):
+        if not self._loading and self.index is not None:
+            self.controller.tournament.round_scores.set(self.index, side, var.get())
+
+
+class CorrectionRow(ttk.Frame):
+    """
+    Fila reciclable del editor de correcciones: nombre, puntaje actual y la
+    casilla con el puntaje nuevo. Como MatchRow, no guarda datos propios: lo
+    que se escribe va a la CorrectionSheet, y un punto marca los equipos
+    cambiados.
+    """
+    def __init__(self, parent, sheet, on_change):
+        super().__init__(parent, style="Main.TFrame", padding=(5, 2))
+        self.sheet = sheet
+        self.on_change = on_change
+        self.team = None
+        self._loading = False
+
+        self.name_lbl = ttk.Label(self, style="Popup.TLabel", width=24, anchor="w")
+        self.name_lbl.pack(side="left", padx=(5, 10))
+        self.points_lbl = ttk.Label(self, style="Popup.TLabel", width=6, anchor="e")
+        self.points_lbl.pack(side="left")
+        ttk.Label(self, text="→", style="Popup.TLabel").pack(side="left", padx=8)
+        self.var = tk.StringVar()
+        ttk.Entry(self, width=8, justify="center", textvariable=self.var).pack(side="left")
+        self.dirty_lbl = ttk.Label(self, style="Popup.TLabel", foreground=COLOR_ACENTO, width=2)
+        self.dirty_lbl.pack(side="left", padx=5)
+
+        self.var.trace_add("write", lambda *args: self._store())
+
+    def show(self, team):
+        self.team = team
+        self._loading = True
+        self.name_lbl.config(text=f"{team.name} ({team.id})")
+        self.points_lbl.config(text=team.total_points)
+        self.var.set(self.sheet.get(team))
+        self._loading = False
+        self._mark()
+
+    def _mark(self):
+        self.dirty_lbl.config(text="●" if self.sheet.is_dirty(self.team) else "")
+
+    def _store(self):
+        if not self._loading and self.team is not None:
+            self.sheet.set(self.team, self.var.get())
+            self._mark()
+            self.on_change()
 
 
 # =============================================================================
@@ -76,6 +390,22 @@ class SetupFrame(ttk.Frame):
         load_btn = ttk.Button(name_frame, text="📂 Cargar Torneo Existente", style="TButton", command=self.controller.load_tournament)
         load_btn.pack(pady=5)
 
+        # Modo de pareo: el óptimo evita revanchas reordenando toda la tabla
+        self.pairing_mode_var = tk.StringVar(value=PAIRING_GREEDY)
+        modes_frame = ttk.Frame(name_frame, style="Main.TFrame")
+        modes_frame.pack(pady=5)
+        for text, mode in (("Clásico", PAIRING_GREEDY),
+                           ("Por grupos de puntaje", PAIRING_SCORE_GROUPS),
+                           ("Óptimo (evitar revanchas)", PAIRING_OPTIMAL),
+                           ("Búsqueda (tiempo limitado)", PAIRING_SEARCH)):
+            ttk.Radiobutton(modes_frame, text=text, value=mode, variable=self.pairing_mode_var).pack(side="left", padx=5)
+
+        # Copia opcional en la base de datos de la temporada (todos los torneos en un archivo)
+        from storage_sqlite import DEFAULT_DB_PATH
+        self.use_store_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(name_frame, text=f"Guardar también en la base de la temporada ({DEFAULT_DB_PATH})",
+                        variable=self.use_store_var).pack(pady=5)
+
         # --- Sección: Formulario de Ingreso de Equipos ---
         input_card = ttk.Frame(center_frame, style="Card.TFrame", padding=20)
         input_card.pack(fill="x", pady=10)
@@ -95,6 +425,12 @@ class SetupFrame(ttk.Frame):
         add_button = ttk.Button(grid_frame, text="+ Agregar Equipo", style="Primary.TButton", command=self.add_team)
         add_button.grid(row=2, column=0, columnspan=2, pady=15, sticky="ew")
 
+        # Alta en bloque: archivo CSV o dos columnas copiadas de una planilla (ver team_import.py)
+        import_button = ttk.Button(grid_frame, text="📄 Importar CSV", style="TButton", command=self.import_teams_file)
+        import_button.grid(row=3, column=0, padx=(0, 5), sticky="ew")
+        paste_button = ttk.Button(grid_frame, text="📋 Pegar Equipos", style="TButton", command=self.paste_teams)
+        paste_button.grid(row=3, column=1, padx=(5, 0), sticky="ew")
+
         # Mensajes de Error
         self.error_label = ttk.Label(center_frame, text="", foreground=COLOR_PELIGRO, style="SubHeader.TLabel", font=("Helvetica", 10))
         self.error_label.pack(pady=5)
@@ -131,29 +467,16 @@ class SetupFrame(ttk.Frame):
         name = self.team_name_entry.get()
         team_id = self.team_id_entry.get()
         
-        # 1. Validar campos vacíos
-        if not name or not team_id:
-            self.error_label.config(text="⚠️ Por favor completa ambos campos.")
-            return
-
-        # 2. VALIDACIÓN: Verificar que sea numérico
-        if not team_id.isdigit():
-            self.error_label.config(text="⚠️ El ID debe ser un número entero (ej: 10, 50).")
-            return
-
-        # 3. Validar duplicados
-        if team_id in self.controller.teams:
-            self.error_label.config(text="⚠️ El ID del equipo ya existe.")
+        # Mismas reglas que la importación en bloque: campos completos, ID
+        # numérico y no repetido, nombre sin números
+        from team_import import validate_team
+        message = validate_team(team_id, name, self.controller.teams)
+        if message is not None:
+            self.error_label.config(text=f"⚠️ {message}")
             return
 
-        #4. Validar que el nombre no contenga números
-        if any(char.isdigit() for char in name):
-            self.error_label.config(text="⚠️ El nombre no debe contener numeros.")
-            return
-        
         # Crear y guardar equipo
-        new_team = Team(team_id, name)
-        self.controller.teams[team_id] = new_team
+        self.controller.tournament.add_team(team_id, name)
         
         # Actualizar interfaz
         self.team_list_box.insert(tk.END, f" {name}  [ID: {team_id}]")
@@ -161,6 +484,52 @@ class SetupFrame(ttk.Frame):
         self.team_id_entry.delete(0, tk.END)
         self.error_label.config(text="")
 
+    def import_teams_file(self):
+        """Importa equipos desde un archivo CSV (ID y nombre por fila)."""
+        path = filedialog.askopenfilename(title="Importar equipos",
+                                          filetypes=[("CSV", "*.csv"), ("Texto", "*.txt"), ("Todos los archivos", "*.*")])
+        if not path:
+            return
+        from team_import import parse_teams
+        try:
+            # utf-8-sig: las planillas suelen guardar el CSV con BOM
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                teams, errors = parse_teams(f, self.controller.teams)
+        except (OSError, UnicodeDecodeError) as e:
+            self.error_label.config(text=f"⚠️ No se pudo leer el archivo: {e}")
+            return
+        self.import_teams(teams, errors)
+
+    def paste_teams(self):
+        """Importa equipos desde el portapapeles (por ejemplo, dos columnas copiadas de una planilla)."""
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            self.error_label.config(text="⚠️ El portapapeles está vacío.")
+            return
+        from team_import import parse_teams
+        self.import_teams(*parse_teams(text, self.controller.teams))
+
+    def import_teams(self, teams, errors):
+        """
+        Registra los equipos leídos por parse_teams. Si alguna fila tiene
+        problemas no se importa ninguno (así se corrige el archivo y se
+        vuelve a importar entero) y se muestran todas las filas juntas.
+        """
+        if errors:
+            self.error_label.config(text=f"⚠️ {len(errors)} filas con problemas: no se importó ningún equipo.")
+            from team_import import format_errors
+            messagebox.showerror("Importar equipos", format_errors(errors))
+            return
+        if not teams:
+            self.error_label.config(text="⚠️ No se encontraron equipos para importar.")
+            return
+        self.controller.tournament.add_teams(teams)
+        # Un solo insert para todas las filas: la lista se redibuja una vez
+        self.team_list_box.insert(tk.END, *(f" {name}  [ID: {team_id}]" for team_id, name in teams))
+        self.team_list_box.see(tk.END)
+        self.error_label.config(text="")
+
     def correct_team(self):
         """Elimina el equipo seleccionado y devuelve sus datos a los inputs."""
         selection = self.team_list_box.curselection()
@@ -177,8 +546,7 @@ class SetupFrame(ttk.Frame):
             name = parts[0].strip()
             team_id = parts[1].rstrip("]")
             
-            if team_id in self.controller.teams:
-                del self.controller.teams[team_id]
+            self.controller.tournament.remove_team(team_id)
             self.team_list_box.delete(index)
             
             self.team_name_entry.delete(0, tk.END)
@@ -190,6 +558,10 @@ class SetupFrame(ttk.Frame):
         except Exception:
             self.error_label.config(text="⚠️ Error al procesar la selección.")
 
+    def selected_pairing_mode(self):
+        """Modo de pareo elegido en la pantalla de configuración."""
+        return self.pairing_mode_var.get()
+
     def start_tournament(self):
         """Valida e inicia el torneo."""
         t_name = self.tournament_name_entry.get().strip()
@@ -202,8 +574,12 @@ class SetupFrame(ttk.Frame):
             return
             
         self.controller.tournament_name = t_name
+        self.controller.tournament.pairing_mode = self.selected_pairing_mode()
         self.error_label.config(text="")
         
+        self.controller.start_storage()
+        self.controller.tournament.enable_undo()
+        self.controller.frames[MatchFrame].plan()
         self.controller.generate_pairings()
         self.controller.show_frame(MatchFrame)
 
@@ -225,7 +601,7 @@ class MatchFrame(ttk.Frame):
         self.header_label.pack(side="left")
         
         end_btn = ttk.Button(top_bar, text="Finalizar Torneo", style="Danger.TButton", 
-                           command=lambda: self.controller.show_frame(StandingsFrame))
+                           command=self.controller.finish_tournament)
         end_btn.pack(side="right")
 
         self.error_label = ttk.Label(self, text="", foreground=COLOR_PELIGRO, style="SubHeader.TLabel", font=("Helvetica", 10))
@@ -247,18 +623,20 @@ class MatchFrame(ttk.Frame):
         left_col = ttk.Frame(main_content, style="Main.TFrame")
         left_col.grid(row=0, column=0, sticky="nsew", padx=(0, 20)) # sticky nsew para estirar
 
-        self.canvas = tk.Canvas(left_col, bg=COLOR_FONDO_MAIN, highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(left_col, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas, style="Main.TFrame")
+        # Cabecera de columnas (fija, fuera de la zona con scroll)
+        header_row = ttk.Frame(left_col, style="Main.TFrame")
+        header_row.pack(side="top", fill="x", pady=(0, 10))
+        ttk.Label(header_row, text="Equipo 1", style="SubHeader.TLabel", width=20, anchor="e").pack(side="left", padx=10)
+        ttk.Label(header_row, text="Pts", style="SubHeader.TLabel", width=10, anchor="center").pack(side="left", padx=5)
+        ttk.Label(header_row, text="", width=4).pack(side="left") 
+        ttk.Label(header_row, text="Pts", style="SubHeader.TLabel", width=10, anchor="center").pack(side="left", padx=5)
+        ttk.Label(header_row, text="Equipo 2", style="SubHeader.TLabel", width=20, anchor="w").pack(side="left", padx=10)
 
-        self.window_id = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.bind('<Configure>', lambda e: self.canvas.itemconfig(self.window_id, width=e.width))
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        # Lista virtual: sólo existen las filas que entran en pantalla
+        self.match_list = VirtualList(left_col, MATCH_ROW_HEIGHT,
+                                      create_row=lambda parent: MatchRow(parent, self.controller, self.confirm_match),
+                                      bind_row=lambda row, index: row.show(index))
+        self.match_list.pack()
 
         # Columna Derecha: Ranking en vivo (Más grande ahora)
         right_col = ttk.Frame(main_content, style="Card.TFrame", padding=15)
@@ -276,90 +654,203 @@ class MatchFrame(ttk.Frame):
         self.side_tree.heading('points', text='Pts')
         self.side_tree.column('points', width=60, anchor='center')
         self.side_tree.pack(fill="both", expand=True)
+        self.side_sync = TreeSync(self.side_tree)
 
         # Botón para corregir errores manuales
         edit_btn = ttk.Button(right_col, text="✏️ Corregir Puntajes", style="TButton", command=self.edit_scores)
         edit_btn.pack(fill="x", pady=(10, 0))
 
+        # Deshacer/rehacer rondas y correcciones (ver undo.py); también con Ctrl+Z / Ctrl+Y
+        undo_row = ttk.Frame(right_col, style="Card.TFrame")
+        undo_row.pack(fill="x", pady=(5, 0))
+        self.undo_btn = ttk.Button(undo_row, text="↶ Deshacer", style="TButton", command=self.undo)
+        self.undo_btn.pack(side="left", fill="x", expand=True, padx=(0, 2))
+        self.redo_btn = ttk.Button(undo_row, text="↷ Rehacer", style="TButton", command=self.redo)
+        self.redo_btn.pack(side="left", fill="x", expand=True, padx=(2, 0))
+        self.controller.bind("<Control-z>", lambda event: self.undo())
+        self.controller.bind("<Control-y>", lambda event: self.redo())
+
+        ttk.Button(right_col, text="📤 Exportar", style="TButton",
+                   command=self.controller.export_tournament).pack(fill="x", pady=(5, 0))
+
+        # Pantalla pública para proyectar: ventana aparte o página web (ver live_display.py)
+        live_row = ttk.Frame(right_col, style="Card.TFrame")
+        live_row.pack(fill="x", pady=(5, 0))
+        ttk.Button(live_row, text="📺 Pantalla", style="TButton",
+                   command=self.controller.open_public_display).pack(side="left", fill="x", expand=True, padx=(0, 2))
+        ttk.Button(live_row, text="🌐 Web", style="TButton",
+                   command=self.controller.start_live_server).pack(side="left", fill="x", expand=True, padx=(2, 0))
+
+        # Probabilidades de salir campeón con las rondas que faltan (ver forecast.py).
+        # forecast trae NumPy, que tarda en importarse: se carga recién al armar
+        # esta pantalla y no al abrir la ventana (ver FrameRegistry)
+        from forecast import TOP_K, ForecastWorker
+        self.forecast_worker = ForecastWorker()
+        self._forecast_polling = False
+        ttk.Label(right_col, text="Probabilidades", style="SideHeader.TLabel").pack(pady=(15, 5))
+        rounds_row = ttk.Frame(right_col, style="Card.TFrame")
+        rounds_row.pack(fill="x")
+        ttk.Label(rounds_row, text="Rondas del torneo:", style="Card.TLabel").pack(side="left")
+        self.rounds_var = tk.StringVar()
+        ttk.Spinbox(rounds_row, from_=1, to=99, width=4, textvariable=self.rounds_var,
+                    command=self.update_forecast).pack(side="left", padx=5)
+        self.plan_label = ttk.Label(rounds_row, text="", style="Card.TLabel")
+        self.plan_label.pack(side="left")
+
+        cols_forecast = ('name', 'first', 'top')
+        self.forecast_tree = ttk.Treeview(right_col, columns=cols_forecast, show='headings', height=FORECAST_ROWS)
+        self.forecast_tree.heading('name', text='Equipo')
+        self.forecast_tree.column('name', width=200)
+        self.forecast_tree.heading('first', text='Campeón')
+        self.forecast_tree.column('first', width=70, anchor='center')
+        self.forecast_tree.heading('top', text=f'Top {TOP_K}')
+        self.forecast_tree.column('top', width=70, anchor='center')
+        self.forecast_tree.pack(fill="x", pady=(5, 0))
+        self.forecast_sync = TreeSync(self.forecast_tree)
+
         # --- Pie de página ---
         footer = ttk.Frame(self, style="Main.TFrame", padding=20)
         footer.pack(side="bottom", fill="x")
+
+        self.progress_label = ttk.Label(footer, text="", style="SubHeader.TLabel")
+        self.progress_label.pack(pady=(0, 5))
         
         self.submit_btn = ttk.Button(footer, text="Enviar Puntajes y Siguiente Ronda →", style="Success.TButton", command=self.submit_scores)
         self.submit_btn.pack(fill="x", ipady=5)
 
+    @timings.timed()
     def display_matches(self):
-        """Genera los widgets (etiquetas e inputs) para cada partido."""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.controller.match_entry_widgets = []
+        """Muestra los partidos de la ronda actual (sólo se dibujan las filas visibles)."""
         self.header_label.config(text=f"Ronda {self.controller.current_round}")
-        
-        self.canvas.yview_moveto(0)
-
-        # Cabecera de columnas
-        header_row = ttk.Frame(self.scrollable_frame, style="Main.TFrame")
-        header_row.pack(fill="x", pady=(0, 10))
-        ttk.Label(header_row, text="Equipo 1", style="SubHeader.TLabel", width=20, anchor="e").pack(side="left", padx=10)
-        ttk.Label(header_row, text="Pts", style="SubHeader.TLabel", width=10, anchor="center").pack(side="left", padx=5)
-        ttk.Label(header_row, text="", width=4).pack(side="left") 
-        ttk.Label(header_row, text="Pts", style="SubHeader.TLabel", width=10, anchor="center").pack(side="left", padx=5)
-        ttk.Label(header_row, text="Equipo 2", style="SubHeader.TLabel", width=20, anchor="w").pack(side="left", padx=10)
-
-        for i, (team1_id, team2_id) in enumerate(self.controller.current_matches):
-            team1 = self.controller.teams[team1_id]
-            
-            match_card = ttk.Frame(self.scrollable_frame, style="Card.TFrame", padding=15)
-            match_card.pack(fill="x", pady=5, padx=5)
-            
-            # Equipo 1
-            t1_lbl = ttk.Label(match_card, text=f"{team1.name}\n({team1.total_points} pts)", style="Card.TLabel", justify="right", width=20, anchor="e")
-            t1_lbl.pack(side="left", padx=10)
-            
-            s1_ent = ttk.Entry(match_card, width=5, font=("Helvetica", 14, "bold"), justify="center")
-            s1_ent.pack(side="left", padx=5)
-            
-            ttk.Label(match_card, text="vs", style="Card.TLabel", foreground=COLOR_ACENTO).pack(side="left", padx=10)
-            
-            s2_ent = ttk.Entry(match_card, width=5, font=("Helvetica", 14, "bold"), justify="center")
-            s2_ent.pack(side="left", padx=5)
-            
-            # Manejo de BYE
-            if team2_id == "BYE":
-                t2_text = "--- LIBRE ---"
-                # Input 1 habilitado, Input 2 deshabilitado en 0
-                s2_ent.insert(0, "0"); s2_ent.config(state="disabled") 
-                self.controller.match_entry_widgets.append((s1_ent, None, team1_id, "BYE"))
-            else:
-                team2 = self.controller.teams[team2_id]
-                t2_text = f"{team2.name}\n({team2.total_points} pts)"
-                self.controller.match_entry_widgets.append((s1_ent, s2_ent, team1_id, team2_id))
-
-            t2_lbl = ttk.Label(match_card, text=t2_text, style="Card.TLabel", justify="left", width=20, anchor="w")
-            t2_lbl.pack(side="left", padx=10)
-
+        self.match_list.set_count(len(self.controller.current_matches))
+        self.update_progress()
         self.update_sidebar()
+        self.update_forecast()
+        self.update_undo_buttons()
+        self.controller.schedule_live()
+
+    def update_undo_buttons(self):
+        tournament = self.controller.tournament
+        self.undo_btn.state(["!disabled"] if tournament.can_undo() else ["disabled"])
+        self.redo_btn.state(["!disabled"] if tournament.can_redo() else ["disabled"])
+
+    def undo(self):
+        """Deshace el último paso (pareo de una ronda, sus resultados o una corrección)."""
+        if self.winfo_ismapped():
+            self._after_restore("Deshecho", self.controller.tournament.undo())
+
+    def redo(self):
+        if self.winfo_ismapped():
+            self._after_restore("Rehecho", self.controller.tournament.redo())
+
+    def _after_restore(self, verb, label):
+        if label is None:
+            return
+        if self.controller.tournament.journal is None:
+            self.controller.save_tournament_data()
+        self.display_matches()
+        self.error_label.config(text="")
+        self.controller.status_label.config(text=f"{verb}: {label}", foreground=COLOR_TEXTO)
+
+    def update_progress(self):
+        scores = self.controller.tournament.round_scores
+        self.progress_label.config(text=f"Resultados cargados: {len(scores) - scores.missing()} / {len(scores)}")
 
+    @timings.timed()
     def update_sidebar(self):
-        """Actualiza la tabla lateral con las posiciones actuales."""
-        for row in self.side_tree.get_children():
-            self.side_tree.delete(row)
-            
-        sorted_teams = sorted(self.controller.teams.values(), key=lambda t: t.total_points, reverse=True)
-        
-        for i, team in enumerate(sorted_teams):
-            self.side_tree.insert("", "end", values=(i+1, team.name, team.total_points))
+        """Actualiza la tabla lateral con las posiciones actuales (sólo las filas que cambiaron)."""
+        self.side_sync.update((team.id, (i+1, team.name, team.total_points))
+                              for i, team in enumerate(self.controller.tournament.standings))
+
+    @timings.timed()
+    def plan(self):
+        """
+        Propone la cantidad de rondas para los equipos inscriptos (ver
+        forecast.plan_rounds). La simulación corre en segundo plano: el
+        resultado lo muestra _check_forecast.
+        """
+        from forecast import plan_rounds
+        self.plan_label.config(text="(calculando…)")
+        self._run_forecast("plan", plan_rounds, len(self.controller.tournament.teams))
+
+    @timings.timed()
+    def update_forecast(self):
+        """
+        Recalcula las probabilidades de campeón y de top k con las rondas que
+        faltan. Acá sólo se copian los datos del torneo; la simulación corre
+        en segundo plano (ver forecast.ForecastWorker).
+        """
+        from forecast import forecast_inputs, run_forecast
+        tournament = self.controller.tournament
+        try:
+            total_rounds = max(int(self.rounds_var.get()), tournament.current_round)
+        except ValueError:
+            return
+        self._run_forecast("forecast", run_forecast, forecast_inputs(tournament, total_rounds))
+
+    def _run_forecast(self, kind, func, *args):
+        self.forecast_worker.submit(kind, func, *args)
+        if not self._forecast_polling:
+            self._forecast_polling = True
+            self.after(FORECAST_POLL_MS, self._check_forecast)
+
+    def _check_forecast(self):
+        """Muestra las estimaciones que terminó el hilo de trabajo; sigue revisando mientras haya pendientes."""
+        busy = self.forecast_worker.busy()  # Antes de poll(): lo que terminó antes ya está en results
+        results = self.forecast_worker.poll()
+        if "plan" in results:
+            self._show_plan(results["plan"])
+        if "forecast" in results:
+            self._show_forecast(results["forecast"])
+        if busy or self.forecast_worker.busy():
+            self.after(FORECAST_POLL_MS, self._check_forecast)
+        else:
+            self._forecast_polling = False
+
+    def _show_plan(self, result):
+        if isinstance(result, Exception):
+            self.plan_label.config(text=f"(no se pudo estimar: {result})")
+            return
+        rounds, tried = result
+        tie = dict(tried)[rounds]
+        self.rounds_var.set(max(rounds, self.controller.current_round))
+        self.plan_label.config(text=f"(sugeridas {rounds}, empate arriba ≈ {tie:.0%})")
+        self.update_forecast()  # Con la cantidad de rondas nueva
+
+    def _show_forecast(self, result):
+        if isinstance(result, Exception):
+            self.plan_label.config(text=f"(no se pudo estimar: {result})")
+            return
+        teams = self.controller.teams
+        # Si mientras tanto se cargó otro torneo, sus equipos no están: se saltean
+        best = sorted(((team_id, value) for team_id, value in result.items() if team_id in teams),
+                      key=lambda item: item[1], reverse=True)[:FORECAST_ROWS]
+        self.forecast_sync.update((team_id, (teams[team_id].name, f"{first:.0%}", f"{top:.0%}"))
+                                  for team_id, (first, top) in best)
 
     def edit_scores(self):
-        """Abre ventana emergente para editar puntajes manualmente."""
+        """
+        Abre el editor de correcciones de puntaje. Sólo dibuja las filas
+        visibles (con un buscador por nombre o ID) y al guardar aplica
+        únicamente los equipos cambiados.
+        """
+        tournament = self.controller.tournament
+        sheet = CorrectionSheet(tournament.teams)
+
         popup = tk.Toplevel(self)
         popup.title("Corregir Puntajes Totales")
-        popup.geometry("400x500")
+        popup.geometry("480x560")
         popup.configure(bg=COLOR_FONDO_MAIN)
-        popup.grab_set() 
+        popup.grab_set()
 
         ttk.Label(popup, text="Editar Puntajes Totales", style="Header.TLabel", font=("Helvetica", 14, "bold")).pack(pady=15)
-        ttk.Label(popup, text="Modifica los valores y guarda.", style="Popup.TLabel").pack(pady=(0,10))
+
+        search_row = ttk.Frame(popup, style="Main.TFrame")
+        search_row.pack(fill="x", padx=20, pady=(0, 10))
+        ttk.Label(search_row, text="Buscar:", style="Popup.TLabel").pack(side="left")
+        search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_row, textvariable=search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=(10, 0))
 
         footer_frame = ttk.Frame(popup, style="Main.TFrame")
         footer_frame.pack(side="bottom", fill="x", pady=20, padx=20)
@@ -367,75 +858,122 @@ class MatchFrame(ttk.Frame):
         list_frame = ttk.Frame(popup, style="Main.TFrame")
         list_frame.pack(side="top", fill="both", expand=True, padx=10)
 
-        canvas = tk.Canvas(list_frame, bg=COLOR_FONDO_MAIN, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas, style="Main.TFrame")
-        window_id = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        
-        scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        entries = {}
-        sorted_teams = sorted(self.controller.teams.values(), key=lambda t: t.name)
-        
-        for team in sorted_teams:
-            frame = ttk.Frame(scrollable_frame, style="Main.TFrame")
-            frame.pack(fill="x", pady=5)
-            
-            ttk.Label(frame, text=team.name, style="Popup.TLabel", width=20, anchor="e").pack(side="left", padx=10)
-            ent = ttk.Entry(frame, width=10, justify="center")
-            ent.insert(0, str(team.total_points))
-            ent.pack(side="left", padx=10)
-            entries[team.id] = ent
-            
+        count_label = ttk.Label(footer_frame, text="", style="Popup.TLabel")
+
+        def update_count():
+            count_label.config(text=f"{sheet.dirty_count()} equipos cambiados")
+
+        rows = VirtualList(list_frame, CORRECTION_ROW_HEIGHT,
+                           create_row=lambda parent: CorrectionRow(parent, sheet, update_count),
+                           bind_row=lambda row, index: row.show(sheet.visible[index]))
+        rows.pack()
+        rows.set_count(len(sheet.visible))
+        search_var.trace_add("write", lambda *args: rows.set_count(len(sheet.search(search_var.get()))))
+
+        reason_row = ttk.Frame(footer_frame, style="Main.TFrame")
+        reason_row.pack(fill="x", pady=(0, 10))
+        ttk.Label(reason_row, text="Motivo:", style="Popup.TLabel").pack(side="left")
+        reason_var = tk.StringVar()
+        ttk.Entry(reason_row, textvariable=reason_var).pack(side="left", fill="x", expand=True, padx=(10, 0))
+        count_label.pack(pady=(0, 10))
+        update_count()
+
         def save_corrections():
             try:
-                for tid, entry in entries.items():
-                    val = entry.get()
-                    if not val.strip(): continue
-                    self.controller.teams[tid].total_points = int(val)
-                self.update_sidebar()
-                self.display_matches() 
-                self.controller.save_tournament_data()
-                messagebox.showinfo("Éxito", "Puntajes actualizados.", parent=popup)
-                popup.destroy()
-            except ValueError:
-                messagebox.showerror("Error", "Solo números enteros.", parent=popup)
+                changes = sheet.changes()
+            except ValueError as e:
+                messagebox.showerror("Error", f"Solo números enteros.\n{e}", parent=popup)
+                return
+            # Cada corrección queda anotada (con el motivo) y se deshacen todas juntas
+            changed = tournament.correct_many(changes, reason_var.get().strip() or None)
+            popup.destroy()
+            if changed:
+                self.after_corrections(changed)
 
         btn_save = ttk.Button(footer_frame, text="Guardar Cambios", command=save_corrections, style="Primary.TButton")
         btn_save.pack(fill="x")
+        search_entry.focus_set()
 
-    def submit_scores(self):
-        """Procesa los puntajes ingresados y pasa de ronda."""
-        round_points = {team_id: 0 for team_id in self.controller.teams}
-        try:
-            for (entry1, entry2, team1_id, team2_id) in self.controller.match_entry_widgets:
-                if team2_id == "BYE":
-                    s1 = entry1.get()
-                    if not s1:
-                        self.error_label.config(text="⚠️ Ingresa el puntaje para el equipo libre.")
-                        return
-                    round_points[team1_id] += int(s1)
-                    continue
-                
-                s1 = entry1.get()
-                s2 = entry2.get()
-                if not s1 or not s2:
-                    self.error_label.config(text="⚠️ Ingresa los puntajes de todos los partidos.")
-                    return
-                round_points[team1_id] += int(s1)
-                round_points[team2_id] += int(s2)
-
-            for tid, pts in round_points.items():
-                self.controller.teams[tid].total_points += pts
-            
-            self.error_label.config(text="")
+    def after_corrections(self, changed):
+        """Redibuja sólo lo que tocaron las correcciones de los equipos `changed`."""
+        changed = set(changed)
+        self.update_sidebar()
+        for index, (team1_id, team2_id) in enumerate(self.controller.current_matches):
+            if team1_id in changed or team2_id in changed:
+                self.match_list.refresh_index(index)
+        self.update_forecast()
+        self.update_undo_buttons()
+        self.controller.schedule_live()
+        if self.controller.tournament.journal is None:
+            self.controller.save_tournament_data()
+        self.controller.status_label.config(text=f"Puntajes corregidos: {len(changed)}", foreground=COLOR_TEXTO)
+
+    def _confirm(self, index):
+        """
+        Confirma un partido con lo escrito en su fila. Devuelve True si con
+        él se cerró la ronda. Lanza ValueError si el puntaje no es válido.
+        """
+        tournament = self.controller.tournament
+        scores = tournament.round_scores
+        s1, s2 = int(scores.get(index, 0)), int(scores.get(index, 1))
+        if scores.confirmed[index] == (s1, s2):
+            return False
+        # Desde esta pantalla el operador corrige a sabiendas: se confirma sobre la versión actual
+        _version, closed = tournament.record_match_result(index, s1, s2, scores.versions[index])
+        return closed
+
+    def _after_confirm(self, closed, index=None):
+        self.error_label.config(text="")
+        if closed:
+            # Llegó el último resultado: la ronda siguiente se arma en el momento
             self.controller.generate_pairings()
             self.display_matches()
+        else:
+            if index is not None:
+                self.match_list.refresh_index(index)
+            else:
+                self.match_list.refresh()
+            self.update_progress()
+            self.controller.schedule_live()
+
+    def confirm_match(self, index):
+        """Confirma sólo el partido `index` (botón ✔ de su fila)."""
+        scores = self.controller.tournament.round_scores
+        if not scores.get(index, 0) or not scores.get(index, 1):
+            self.error_label.config(text=f"⚠️ Faltan puntajes en la mesa {index + 1}.")
+            return
+        try:
+            closed = self._confirm(index)
+        except ValueError:
+            self.error_label.config(text="⚠️ Puntaje inválido. Solo números enteros.")
+            return
+        self._after_confirm(closed, index)
+
+    @timings.timed()
+    def submit_scores(self):
+        """Confirma todos los partidos que falten y pasa de ronda."""
+        tournament = self.controller.tournament
+        scores = tournament.round_scores
+        if scores.closed:
+            # Ronda ya cerrada sin la siguiente armada (por ejemplo, después de deshacer su pareo)
+            self._after_confirm(True)
+            return
+
+        missing = scores.first_missing()
+        if missing is not None:
+            if tournament.current_matches[missing][1] == BYE:
+                self.error_label.config(text="⚠️ Ingresa el puntaje para el equipo libre.")
+            else:
+                self.error_label.config(text="⚠️ Ingresa los puntajes de todos los partidos.")
+            return
+
+        try:
+            # Un solo evento para toda la ronda (no uno por partido); valida todo antes de cambiar nada
+            tournament.submit_round_scores()
         except ValueError:
             self.error_label.config(text="⚠️ Puntaje inválido. Solo números enteros.")
+            return
+        self._after_confirm(True)
 
 
 class StandingsFrame(ttk.Frame):
@@ -454,7 +992,7 @@ class StandingsFrame(ttk.Frame):
         table_frame = ttk.Frame(center, style="Card.TFrame", padding=2)
         table_frame.pack(fill="both", expand=True)
 
-        cols = ('rank', 'name', 'points', 'played')
+        cols = ('rank', 'name', 'points') + TIEBREAK_ORDER + ('played',)
         self.tree = ttk.Treeview(table_frame, columns=cols, show='headings', height=10)
         
         self.tree.heading('rank', text='#')
@@ -463,10 +1001,15 @@ class StandingsFrame(ttk.Frame):
         self.tree.column('name', width=300)
         self.tree.heading('points', text='Puntos')
         self.tree.column('points', width=80, anchor='center')
+        # Desempates, en el orden en que se aplican (ver tiebreaks.py)
+        for key in TIEBREAK_ORDER:
+            self.tree.heading(key, text=TIEBREAK_LABELS[key])
+            self.tree.column(key, width=80, anchor='center')
         self.tree.heading('played', text='Oponentes')
         self.tree.column('played', width=300, anchor='w')
         
         self.tree.pack(side="left", fill="both", expand=True)
+        self.tree_sync = TreeSync(self.tree)
         
         scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
@@ -475,23 +1018,130 @@ class StandingsFrame(ttk.Frame):
         btn_area = ttk.Frame(center, style="Main.TFrame")
         btn_area.pack(pady=30)
         
+        ttk.Button(btn_area, text="📤 Exportar (CSV, JSON, HTML)", style="TButton",
+                   command=self.controller.export_tournament).pack(side="left", ipady=10, padx=20)
         ttk.Button(btn_area, text="Comenzar Nuevo Torneo", style="Primary.TButton", 
-                   command=self.controller.reset_tournament).pack(ipady=10, padx=20)
+                   command=self.controller.reset_tournament).pack(side="left", ipady=10, padx=20)
 
+    @timings.timed()
     def display_standings(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        
-        sorted_teams = sorted(self.controller.teams.values(), key=lambda t: t.total_points, reverse=True)
-        for i, team in enumerate(sorted_teams):
-            opponents = [self.controller.teams[oid].name for oid in team.opponents_played if oid in self.controller.teams]
-            self.tree.insert("", "end", values=(i+1, team.name, team.total_points, ", ".join(opponents)))
+        tournament = self.controller.tournament
+        self.tree_sync.update((team.id, (i+1, team.name, team.total_points)
+                               + tuple(f"{value:g}" for value in tiebreaks)
+                               + (tournament.opponents_text(team),))
+                              for i, (team, tiebreaks) in enumerate(tournament.final_standings()))
+
+
+class PublicDisplay(tk.Toplevel):
+    """
+    PANTALLA PÚBLICA: ventana de sólo lectura para el proyector, con los
+    pareos de la ronda y la tabla. Se abre en pantalla completa (Escape la
+    achica, F11 vuelve). No lee el torneo: recibe del LivePublisher del
+    controlador sólo las filas que cambiaron y actualiza ésas.
+    """
+    def __init__(self, controller):
+        super().__init__(controller)
+        self.controller = controller
+        self.title("Trugo - Pantalla pública")
+        self.configure(bg=COLOR_FONDO_MAIN)
+        self.attributes("-fullscreen", True)
+        self.bind("<Escape>", lambda event: self.attributes("-fullscreen", False))
+        self.bind("<F11>", lambda event: self.attributes("-fullscreen", not self.attributes("-fullscreen")))
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.name_label = ttk.Label(self, style="Header.TLabel", font=("Helvetica", 36, "bold"))
+        self.name_label.pack(pady=(30, 5))
+        self.info_label = ttk.Label(self, style="SubHeader.TLabel", font=("Helvetica", 22))
+        self.info_label.pack(pady=(0, 20))
+
+        body = ttk.Frame(self, style="Main.TFrame")
+        body.pack(fill="both", expand=True, padx=40, pady=(0, 40))
+        body.columnconfigure(0, weight=3)
+        body.columnconfigure(1, weight=2)
+        body.rowconfigure(0, weight=1)
+
+        self.match_tree = ttk.Treeview(body, columns=("table", "team1", "score", "team2"), show="headings",
+                                       style="Display.Treeview", selectmode="none")
+        for column, title, width, anchor in (("table", "Mesa", 90, "center"), ("team1", "Equipo 1", 320, "e"),
+                                             ("score", "", 140, "center"), ("team2", "Equipo 2", 320, "w")):
+            self.match_tree.heading(column, text=title)
+            self.match_tree.column(column, width=width, anchor=anchor)
+        self.match_tree.grid(row=0, column=0, sticky="nsew", padx=(0, 30))
+
+        self.standings_tree = ttk.Treeview(body, columns=("rank", "name", "points"), show="headings",
+                                           style="Display.Treeview", selectmode="none")
+        for column, title, width, anchor in (("rank", "#", 70, "center"), ("name", "Equipo", 320, "w"),
+                                             ("points", "Pts", 100, "center")):
+            self.standings_tree.heading(column, text=title)
+            self.standings_tree.column(column, width=width, anchor=anchor)
+        self.standings_tree.grid(row=0, column=1, sticky="nsew")
+
+        from live_display import diff_views
+        self._view = {"name": "", "round": 0, "missing": 0}
+        self._lengths = {"matches": 0, "standings": 0}
+        view = controller.live_publisher().subscribe(self.apply, controller.tournament)
+        self.apply(diff_views(None, view))
+
+    def close(self):
+        self.controller.live.unsubscribe(self.apply)
+        self.destroy()
+
+    def apply(self, delta):
+        """Muestra unas diferencias de live_display.diff_views."""
+        for key in self._view:
+            if key in delta:
+                self._view[key] = delta[key]
+        self.name_label.config(text=self._view["name"])
+        missing = self._view["missing"]
+        self.info_label.config(text=f"Ronda {self._view['round']}" + (f" — faltan {missing} resultados" if missing else ""))
+        if "matches" in delta:
+            self._apply_rows(self.match_tree, "matches", delta["matches"], self._match_values)
+        if "standings" in delta:
+            self._apply_rows(self.standings_tree, "standings", delta["standings"], tuple)
+
+    @staticmethod
+    def _match_values(row):
+        table, name1, name2, score1, score2 = row
+        score = "vs" if score1 is None else f"{score1} - {score2}"
+        return table, name1, score, "--- LIBRE ---" if name2 == BYE else name2
+
+    def _apply_rows(self, tree, key, change, values):
+        # Las filas se identifican por posición ("matches3"): sólo se tocan las que cambiaron
+        length = change["length"]
+        for index in range(length, self._lengths[key]):
+            tree.delete(f"{key}{index}")
+        for index, row in change["rows"]:
+            iid = f"{key}{index}"
+            if tree.exists(iid):
+                tree.item(iid, values=values(row))
+            else:
+                tree.insert("", "end", iid=iid, values=values(row))
+        self._lengths[key] = length
 
 
 # =============================================================================
 # CONTROLADOR PRINCIPAL
 # =============================================================================
 
+class FrameRegistry(dict):
+    """
+    Pantallas de la aplicación {clase: frame}. Cada pantalla se construye la
+    primera vez que se pide (show_frame o app.frames[Clase]): al abrir la
+    ventana sólo se arma la de configuración, y quien carga un torneo
+    guardado nunca construye la tabla final si no llega a verla.
+    """
+    def __init__(self, container, controller):
+        super().__init__()
+        self._container = container
+        self._controller = controller
+
+    def __missing__(self, cls):
+        frame = self[cls] = cls(self._container, self._controller)
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.lower()  # Construirla no la muestra: eso lo hace show_frame
+        return frame
+
+
 class TournamentApp(tk.Tk):
     """
     Controlador principal de la aplicación.
@@ -509,26 +1159,111 @@ class TournamentApp(tk.Tk):
         self.geometry(f"{window_width}x{window_height}+{pos_x}+{pos_y}")
         self.configure(bg=COLOR_FONDO_MAIN) 
 
-        self.teams = {}
-        self.current_round = 0
-        self.current_matches = []
-        self.match_entry_widgets = []
-        self.tournament_name = "Torneo_Trugo"
+        # Los guardados se escriben desde otro hilo: la ventana nunca espera al disco
+        self.autosave = AutosaveWriter()
+        self._autosave_writes = 0
+        self.tournament = Tournament()
+        self.store = None  # Base SQLite de la temporada; se abre recién si se usa
+        # Pantallas públicas en vivo (ver live_display.py); se arman recién al abrir la primera
+        self.live = None
+        self.live_server = None
+        self._live_pending = False
 
         self.setup_styles()
 
+        # Barra de estado: resultado de los guardados y errores de disco
+        self.status_label = ttk.Label(self, text="", style="SubHeader.TLabel", font=("Helvetica", 10))
+        self.status_label.pack(side="bottom", fill="x", padx=20, pady=(0, 5))
+
         container = ttk.Frame(self, style="Main.TFrame")
         container.pack(side="top", fill="both", expand=True, padx=20, pady=20)
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
 
-        self.frames = {}
-        for F in (SetupFrame, MatchFrame, StandingsFrame):
-            frame = F(container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.frames = FrameRegistry(container, self)
 
         self.show_frame(SetupFrame)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(AUTOSAVE_POLL_MS, self._check_autosave)
+
+        # Medición de tiempos (TRUGO_TIMING, ver timing.py): F12 abre el panel
+        if timings.enabled:
+            self.bind_all("<F12>", lambda event: self.show_timings())
+            self.status_label.config(text="⏱ Medición de tiempos activa (F12 para verla)")
+
+    @property
+    def tournament(self):
+        return self._tournament
+
+    @tournament.setter
+    def tournament(self, value):
+        # Todo torneo que se muestra guarda en segundo plano y avisa sus errores en la barra de estado
+        value.writer = self.autosave
+        value.on_storage_error = self.report_error
+        self._tournament = value
+
+    def report_error(self, message):
+        self.status_label.config(text=f"⚠️ {message}", foreground=COLOR_PELIGRO)
+
+    def _check_autosave(self):
+        """Muestra en la barra de estado lo que pasó con los guardados en segundo plano."""
+        errors = self.autosave.errors()
+        if errors:
+            path, error = errors[-1]
+            self.report_error(f"No se pudo guardar {path}: {error}")
+        elif self.autosave.writes != self._autosave_writes:
+            self.status_label.config(text=f"💾 Guardado {time.strftime('%H:%M:%S')}", foreground=COLOR_TEXTO)
+        self._autosave_writes = self.autosave.writes
+        self.after(AUTOSAVE_POLL_MS, self._check_autosave)
+
+    def on_close(self):
+        """Antes de cerrar se termina de escribir lo pendiente (con un límite de espera)."""
+        self.tournament.detach_journal()
+        self.autosave.close(AUTOSAVE_CLOSE_TIMEOUT)
+        if self.live_server is not None:
+            self.live_server.stop()
+        self.destroy()
+
+    def show_timings(self):
+        """Panel de depuración con los tiempos medidos hasta ahora (ver timing.py)."""
+        popup = tk.Toplevel(self)
+        popup.title("Tiempos")
+        popup.geometry("720x360")
+        popup.configure(bg=COLOR_FONDO_MAIN)
+
+        cols = ('name', 'count', 'total', 'mean', 'p50', 'p95', 'max')
+        tree = ttk.Treeview(popup, columns=cols, show='headings')
+        for col, text, width in (('name', 'Operación', 200), ('count', 'Llamadas', 70), ('total', 'Total ms', 90),
+                                 ('mean', 'Prom. ms', 80), ('p50', 'p50 ≤ ms', 80), ('p95', 'p95 ≤ ms', 80),
+                                 ('max', 'Máx ms', 80)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor='w' if col == 'name' else 'e')
+        sync = TreeSync(tree)
+
+        def refresh():
+            sync.update((name, (name, count, f"{total:.1f}", f"{mean:.2f}", f"{p50:.1f}", f"{p95:.1f}", f"{worst:.1f}"))
+                        for name, count, total, mean, p50, p95, worst in timings.summary())
+
+        def reset():
+            timings.reset()
+            refresh()
+
+        def save():
+            filename = filedialog.asksaveasfilename(parent=popup, title="Guardar tiempos", defaultextension=".json",
+                                                    filetypes=[("JSON", "*.json")])
+            if filename:
+                try:
+                    timings.dump(filename)
+                except OSError as e:
+                    messagebox.showerror("Tiempos", f"No se pudo guardar: {e}", parent=popup)
+
+        buttons = ttk.Frame(popup, style="Main.TFrame")
+        buttons.pack(side="bottom", fill="x", padx=10, pady=10)
+        ttk.Button(buttons, text="Actualizar", command=refresh).pack(side="left")
+        ttk.Button(buttons, text="Reiniciar", command=reset).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Guardar JSON…", command=save).pack(side="right")
+        tree.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+        refresh()
 
     def setup_styles(self):
         style = ttk.Style()
@@ -546,6 +1281,11 @@ class TournamentApp(tk.Tk):
         style.configure("SideHeader.TLabel", font=("Helvetica", 12, "bold"), background=COLOR_FONDO_SEC, foreground=COLOR_ACENTO)
         style.configure("Popup.TLabel", background=COLOR_FONDO_MAIN, foreground=COLOR_TEXTO, font=("Helvetica", 10))
 
+        style.configure("TRadiobutton", background=COLOR_FONDO_MAIN, foreground=COLOR_TEXTO)
+        style.map("TRadiobutton", background=[('active', COLOR_FONDO_MAIN)])
+        style.configure("TCheckbutton", background=COLOR_FONDO_MAIN, foreground=COLOR_TEXTO)
+        style.map("TCheckbutton", background=[('active', COLOR_FONDO_MAIN)])
+
         style.configure("TButton", background=COLOR_FONDO_SEC, foreground=COLOR_TEXTO, borderwidth=0, padding=(10, 10))
         style.map("TButton", background=[('active', COLOR_ACENTO)], foreground=[('active', COLOR_FONDO_MAIN)])
 
@@ -564,10 +1304,49 @@ class TournamentApp(tk.Tk):
         style.configure("Treeview", background=COLOR_FONDO_SEC, fieldbackground=COLOR_FONDO_SEC, foreground=COLOR_TEXTO, borderwidth=0, rowheight=30)
         style.map("Treeview", background=[('selected', COLOR_ACENTO)], foreground=[('selected', COLOR_FONDO_MAIN)])
         style.configure("Treeview.Heading", background=COLOR_FONDO_MAIN, foreground=COLOR_TEXTO, font=("Helvetica", 10, "bold"), relief="flat")
+        # Pantalla pública (proyector): letra grande
+        style.configure("Display.Treeview", font=("Helvetica", 22), rowheight=44)
+        style.configure("Display.Treeview.Heading", font=("Helvetica", 16, "bold"))
         style.map("Treeview.Heading", background=[('active', COLOR_FONDO_SEC)])
         
         style.configure("Vertical.TScrollbar", gripcount=0, background=COLOR_FONDO_SEC, darkcolor=COLOR_FONDO_MAIN, lightcolor=COLOR_FONDO_MAIN, troughcolor=COLOR_FONDO_MAIN, bordercolor=COLOR_FONDO_MAIN, arrowcolor=COLOR_TEXTO)
 
+    # --- Acceso directo al estado del motor ---
+    # La GUI y las pruebas siguen usando app.teams, app.current_round, etc.;
+    # estas propiedades simplemente delegan en self.tournament.
+
+    @property
+    def teams(self):
+        return self.tournament.teams
+
+    @teams.setter
+    def teams(self, value):
+        self.tournament.teams = value
+
+    @property
+    def current_round(self):
+        return self.tournament.current_round
+
+    @current_round.setter
+    def current_round(self, value):
+        self.tournament.current_round = value
+
+    @property
+    def current_matches(self):
+        return self.tournament.current_matches
+
+    @current_matches.setter
+    def current_matches(self, value):
+        self.tournament.current_matches = value
+
+    @property
+    def tournament_name(self):
+        return self.tournament.tournament_name
+
+    @tournament_name.setter
+    def tournament_name(self, value):
+        self.tournament.tournament_name = value
+
     def show_frame(self, cont):
         frame = self.frames[cont]
         if cont == StandingsFrame:
@@ -577,11 +1356,7 @@ class TournamentApp(tk.Tk):
         frame.tkraise()
 
     def reset_tournament(self):
-        self.teams = {}
-        self.current_round = 0
-        self.current_matches = []
-        self.match_entry_widgets = []
-        self.tournament_name = "Torneo_Trugo"
+        self.tournament.reset()
         
         setup = self.frames[SetupFrame]
         setup.team_list_box.delete(0, tk.END)
@@ -590,142 +1365,149 @@ class TournamentApp(tk.Tk):
         setup.error_label.config(text="")
         
         self.show_frame(SetupFrame)
+        self.schedule_live()
 
     def save_tournament_data(self):
+        # Sólo arma el contenido: lo escribe el hilo de guardado (ver _check_autosave)
+        self.tournament.save_tournament_data()
+
+    def schedule_live(self):
+        """Avisa a las pantallas públicas cuando la ventana quede libre (varios cambios seguidos, un solo aviso)."""
+        if self.live is not None and self.live.subscribers and not self._live_pending:
+            self._live_pending = True
+            self.after_idle(self._publish_live)
+
+    def _publish_live(self):
+        self._live_pending = False
+        self.live.publish(self.tournament)
+
+    def live_publisher(self):
+        # live_display trae asyncio (para la página web): se importa recién al usarlo
+        if self.live is None:
+            from live_display import LivePublisher
+            self.live = LivePublisher()
+        return self.live
+
+    def open_public_display(self):
+        """Abre (o trae al frente) la ventana de pantalla completa para el proyector."""
+        for child in self.winfo_children():
+            if isinstance(child, PublicDisplay):
+                child.deiconify()
+                child.lift()
+                return
+        PublicDisplay(self)
+
+    def start_live_server(self):
+        """Publica la pantalla pública como página web en la red local."""
+        from live_display import DEFAULT_LIVE_HOST, DEFAULT_LIVE_PORT, LiveServer, diff_views
+        if self.live_server is None:
+            server = LiveServer()
+            try:
+                port = server.start(DEFAULT_LIVE_HOST, DEFAULT_LIVE_PORT)
+            except OSError as e:
+                messagebox.showerror("Pantalla web", f"No se pudo abrir el puerto {DEFAULT_LIVE_PORT}: {e}")
+                return
+            self.live_server = server
+            view = self.live_publisher().subscribe(server.publish, self.tournament)
+            server.publish(diff_views(None, view))
+            self.live_server_port = port
+        import socket
         try:
-            safe_name = "".join([c for c in self.tournament_name if c.isalnum() or c in (' ', '_', '-')]).strip()
-            if not safe_name: safe_name = "Torneo_Trugo"
-            filename = f"{safe_name}.txt"
-            
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"=========================================\n")
-                f.write(f"   {self.tournament_name}\n")
-                f.write(f"   ESTADO DEL TORNEO: RONDA {self.current_round}\n")
-                f.write(f"=========================================\n\n")
-                
-                sorted_teams = sorted(self.teams.values(), key=lambda t: t.total_points, reverse=True)
-                for team in sorted_teams:
-                    f.write(f"EQUIPO: {team.name} (ID: {team.id})\n")
-                    f.write(f"  > Puntos Totales: {team.total_points}\n")
-                    
-                    rival_names = [self.teams[oid].name for oid in team.opponents_played if oid in self.teams]
-                    rivals_str = ", ".join(rival_names) if rival_names else "Ninguno"
-                    f.write(f"  > Rivales: {rivals_str}\n")
-                    
-                    rival_ids_str = ",".join(list(team.opponents_played))
-                    f.write(f"  > SYSTEM_IDS_RIVALES: {rival_ids_str}\n")
-                    f.write("-" * 40 + "\n")
-                
-                f.write("\n=== SYSTEM_PAREOS_ACTUALES ===\n")
-                for t1, t2 in self.current_matches:
-                    f.write(f"{t1},{t2}\n")
-            
-            print(f"Datos guardados exitosamente en {filename}")
-        except Exception as e:
-            print(f"Error al guardar datos: {e}")
+            address = socket.gethostbyname(socket.gethostname())
+        except OSError:
+            address = "localhost"
+        self.status_label.config(text=f"🌐 Pantalla en vivo: http://{address}:{self.live_server_port}/",
+                                 foreground=COLOR_TEXTO)
+
+    def export_tournament(self):
+        """Exporta tabla, pareos y resultados en CSV, JSON y HTML (ver export.py)."""
+        filename = filedialog.asksaveasfilename(title="Exportar torneo", initialfile=self.tournament_name,
+                                                filetypes=[("Todos los formatos (CSV, JSON, HTML)", "*")])
+        if not filename:
+            return
+        from export import export
+        try:
+            written = export(self.tournament, filename)
+        except OSError as e:
+            messagebox.showerror("Exportar", f"No se pudo exportar: {e}")
+            return
+        self.status_label.config(text=f"Exportado: {len(written)} archivos ({filename}.*)", foreground=COLOR_TEXTO)
+
+    def start_storage(self, journal=True):
+        """
+        Empieza a anotar el torneo en su diario de eventos y, si se eligió en
+        la pantalla de configuración, también en la base de la temporada.
+        """
+        if journal:
+            try:
+                self.tournament.attach_journal()
+            except OSError as e:
+                self.report_error(f"Error al guardar datos: {e}")
+
+        if self.frames[SetupFrame].use_store_var.get():
+            try:
+                if self.store is None:
+                    from storage_sqlite import DEFAULT_DB_PATH, SQLiteStore
+                    self.store = SQLiteStore(DEFAULT_DB_PATH)
+                self.tournament.attach_store(self.store)
+            except Exception as e:
+                self.report_error(f"Error al guardar en la base de datos: {e}")
+
+    def finish_tournament(self):
+        """Deja el torneo compactado en disco y muestra la tabla final."""
+        try:
+            self.tournament.compact_journal()
+        except OSError as e:
+            self.report_error(f"Error al guardar datos: {e}")
+        self.show_frame(StandingsFrame)
 
     def load_tournament(self):
-        filename = filedialog.askopenfilename(title="Seleccionar archivo de torneo", filetypes=[("Archivos de Texto", "*.txt")])
+        filename = filedialog.askopenfilename(title="Seleccionar archivo de torneo",
+                                              filetypes=[("Torneos de Trugo", "*.journal *.trugo *.txt"),
+                                                         ("Diario de eventos", "*.journal"),
+                                                         ("Foto del torneo", "*.trugo"),
+                                                         ("Archivos de Texto", "*.txt")])
         if not filename: return
-        
+
+        # Lo que falte escribir (diario, fotos) tiene que estar en el disco antes de leerlo
+        if not self.autosave.flush(AUTOSAVE_FLUSH_TIMEOUT):
+            messagebox.showerror("Error de Carga", "Todavía se están guardando datos del torneo abierto.\n"
+                                                   "Espera unos segundos y vuelve a intentarlo.")
+            return
+
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            
-            self.teams = {}
-            self.current_matches = []
-            
-            self.tournament_name = lines[1].strip()
-            round_line = lines[2].strip()
-            if "RONDA" in round_line:
-                self.current_round = int(round_line.split("RONDA")[-1].strip())
-            else:
-                raise ValueError("Formato de ronda inválido")
-            
-            current_team = None
-            parsing_matches = False
-            
-            for line in lines:
-                line = line.strip()
-                if not line: continue
-                
-                if line.startswith("=== SYSTEM_PAREOS_ACTUALES ==="):
-                    parsing_matches = True
-                    continue
-                
-                if parsing_matches:
-                    if "," in line:
-                        t1, t2 = line.split(",")
-                        self.current_matches.append((t1, t2))
-                    continue
-
-                if line.startswith("EQUIPO:"):
-                    parts = line.split("(ID: ")
-                    name = parts[0].replace("EQUIPO: ", "").strip()
-                    tid = parts[1].replace(")", "").strip()
-                    current_team = Team(tid, name)
-                    self.teams[tid] = current_team
-                
-                elif line.startswith("> Puntos Totales:"):
-                    if current_team:
-                        current_team.total_points = int(line.split(":")[1].strip())
-                        
-                elif line.startswith("> SYSTEM_IDS_RIVALES:"):
-                    if current_team:
-                        ids_str = line.split(":")[1].strip()
-                        if ids_str:
-                            current_team.opponents_played = set(ids_str.split(","))
-
-            if not self.teams: raise ValueError("No se encontraron equipos.")
-            
-            self.show_frame(MatchFrame)
-            self.frames[MatchFrame].display_matches()
+            # Se mide sólo la carga y el dibujo (no el diálogo ni el aviso)
+            with timings.measure("load_tournament"):
+                if filename.endswith(JOURNAL_EXTENSION):
+                    # El diario se reproduce y queda abierto para seguir anotando
+                    tournament = Tournament.load_journal(filename)
+                elif filename.endswith(SNAPSHOT_EXTENSION):
+                    tournament = Tournament.load_snapshot(filename)
+                else:
+                    tournament = Tournament.load(filename)
+                    tournament.pairing_mode = self.frames[SetupFrame].selected_pairing_mode()
+                self.tournament.detach_journal()
+                self.tournament = tournament
+                self.start_storage(journal=self.tournament.journal is None)
+                self.tournament.enable_undo()
+
+                self.frames[MatchFrame].plan()
+                self.show_frame(MatchFrame)  # Ya muestra los partidos (display_matches)
             messagebox.showinfo("Carga Exitosa", f"Torneo '{self.tournament_name}' cargado en la Ronda {self.current_round}.")
 
         except Exception as e:
             messagebox.showerror("Error de Carga", f"No se pudo cargar el archivo.\nDetalle: {e}")
 
     def generate_pairings(self):
-        self.current_round += 1
-        new_matches = []
-        
-        sorted_teams = sorted(self.teams.values(), key=lambda t: t.total_points, reverse=True)
-        unpaired_teams = list(sorted_teams)
-        
-        if len(unpaired_teams) % 2 != 0:
-            bye_team = None
-            for team in reversed(unpaired_teams):
-                if not team.received_bye:
-                    bye_team = team
-                    break
-            if bye_team is None:
-                bye_team = unpaired_teams[-1]
-                
-            bye_team.received_bye = True
-            new_matches.append((bye_team.id, "BYE"))
-            unpaired_teams.remove(bye_team)
-
-        while unpaired_teams:
-            team1 = unpaired_teams.pop(0)
-            found_opponent = False
-            for i, team2 in enumerate(unpaired_teams):
-                if team2.id not in team1.opponents_played:
-                    opponent = unpaired_teams.pop(i)
-                    new_matches.append((team1.id, opponent.id))
-                    team1.opponents_played.add(opponent.id)
-                    opponent.opponents_played.add(team1.id)
-                    found_opponent = True
-                    break
-            
-            if not found_opponent and unpaired_teams:
-                opponent = unpaired_teams.pop(0)
-                new_matches.append((team1.id, opponent.id))
-                team1.opponents_played.add(opponent.id)
-                opponent.opponents_played.add(team1.id)
-
-        self.current_matches = new_matches
-        self.save_tournament_data()
+        self.tournament.generate_pairings()
+        # Con diario, los pareos ya quedaron anotados: no hace falta reescribir todo
+        if self.tournament.journal is None:
+            self.save_tournament_data()
 
 if __name__ == "__main__":
+    # Con argumentos se maneja el torneo sin pantalla (ver batch.py)
+    if len(sys.argv) > 1:
+        from batch import main
+        sys.exit(main())
     app = TournamentApp()
     app.mainloop()
@@ -0,0 +1,1380 @@
+"""
+Motor del torneo suizo de Trugo.
+
+Este módulo NO importa tkinter: contiene el modelo (equipos, rondas, pareos)
+y la persistencia en texto. La interfaz gráfica (tournament_app.py) sólo
+llama a esta API, de modo que el motor puede usarse y probarse en una
+máquina sin pantalla.
+"""
+import io
+import os
+from bisect import bisect_left, insort
+from contextlib import nullcontext
+from itertools import count
+
+from journal import Journal, JOURNAL_EXTENSION, read_journal, write_atomic
+from matching import max_weight_matching
+from pairing_search import search_pairings
+from snapshot import SNAPSHOT_EXTENSION, read_snapshot, write_snapshot
+from team_store import IdTable, OpponentSet, bits_from, count_bits, has_bit, iter_bits, set_bit
+from tiebreaks import TiebreakIndex
+from timing import timings
+from undo import UNDO_LIMIT, UndoHistory
+
+# Identificador especial que ocupa el lugar del rival cuando un equipo queda libre
+BYE = "BYE"
+
+DEFAULT_TOURNAMENT_NAME = "Torneo_Trugo"
+
+# Modos de pareo disponibles
+PAIRING_GREEDY = "greedy"       # Primer rival nuevo hacia abajo en la tabla (histórico)
+PAIRING_OPTIMAL = "optimal"     # Emparejamiento de peso máximo (evita revanchas globalmente)
+PAIRING_SCORE_GROUPS = "groups" # Por grupos de puntaje con "flotantes" hacia el grupo de abajo
+PAIRING_SEARCH = "search"       # Codicioso mejorado con búsqueda con vuelta atrás (tiempo limitado)
+PAIRING_MODES = (PAIRING_GREEDY, PAIRING_OPTIMAL, PAIRING_SCORE_GROUPS, PAIRING_SEARCH)
+
+# Tamaño de los bloques del ranking que se resuelven con el algoritmo de Edmonds.
+# Si un bloque no admite pareo sin revanchas se fusiona con el siguiente, hasta
+# OPTIMAL_MAX_BLOCK equipos (más allá la revancha se considera inevitable).
+# 24 porque Edmonds crece más que cuadrático con el bloque: con 2.000 equipos y
+# 8 rondas, bloques de 40 tardan casi el doble (281 ms contra 195 ms la peor
+# ronda) y los pareos salen igual de parejos (sin revanchas, misma distancia de
+# puntos); con 16 la distancia de puntos empeora en torneos chicos.
+OPTIMAL_BLOCK_SIZE = 24
+OPTIMAL_MAX_BLOCK = 400
+
+# Tiempo máximo (segundos) que el modo de búsqueda puede tardar en armar una ronda
+SEARCH_BUDGET = 2.0
+
+# =============================================================================
+# MODELO DE DATOS
+# =============================================================================
+
+class Team:
+    """
+    Representa a un equipo en el torneo.
+    Guarda su nombre, ID, puntos acumulados y con quién ha jugado.
+
+    Usa __slots__ (sin __dict__ por equipo) y guarda los rivales como bits
+    sobre los índices de la tabla de IDs del torneo (ver team_store.py);
+    opponents_played los muestra como el conjunto de IDs de siempre.
+    """
+    __slots__ = ("id", "name", "_total_points", "received_bye", "_history", "_history_loader",
+                 "seq", "_observer", "id_table", "index", "_played")
+
+    def __init__(self, team_id, name, id_table=None):
+        self.id = team_id              # Identificador único (ej. "EQ01")
+        self.name = name               # Nombre visible (ej. "Los Tigres")
+        self._total_points = 0         # Puntos totales en el torneo (ver propiedad total_points)
+        # Un equipo suelto tiene su propia tabla; al inscribirlo pasa a la del torneo
+        self.id_table = id_table if id_table is not None else IdTable()
+        self.index = self.id_table.intern(team_id)  # Índice entero denso dentro del torneo
+        self._played = bytearray()     # Bit k prendido = ya jugó contra el equipo de índice k (ver played)
+        self.received_bye = False      # Marca si ya recibió una victoria libre (BYE)
+        self._history = []             # Partidos jugados (ver propiedad history)
+        self._history_loader = None    # Si no es None, arma el historial la primera vez que se lo pide
+        self.seq = 0                   # Orden de inscripción (lo asigna el torneo; desempata)
+        self._observer = None          # Función que el torneo usa para enterarse de cambios de puntos
+
+    @property
+    def total_points(self):
+        return self._total_points
+
+    @total_points.setter
+    def total_points(self, value):
+        # Avisamos al torneo para que mantenga sus índices al día sin reordenar todo
+        old = self._total_points
+        self._total_points = value
+        if self._observer is not None and value != old:
+            self._observer(self, old, value)
+
+    @property
+    def played(self):
+        """Rivales como bits (bytearray): el bit k está prendido si ya jugó contra el índice k."""
+        played = self._played
+        if played.__class__ is not bytearray:
+            # Recién cargado de una foto: los índices se pasan a bits la primera vez que se usan
+            if played.__class__ is str:
+                played = map(int, played.split())
+            played = self._played = bits_from(played)
+        return played
+
+    @played.setter
+    def played(self, bits):
+        self._played = bits
+
+    def set_opponent_indices(self, indices):
+        """
+        Difiere el armado de los bits de rivales (ver snapshot.py) hasta que
+        se usen: `indices` son los índices en la tabla de IDs, como lista o
+        como texto separado por espacios ("3 5 7").
+        """
+        self._played = indices
+
+    @property
+    def opponents_played(self):
+        """Conjunto (vista) de IDs de equipos contra los que ya jugó."""
+        return OpponentSet(self)
+
+    @opponents_played.setter
+    def opponents_played(self, team_ids):
+        self.played = bits_from(map(self.id_table.intern, team_ids))
+
+    def has_played(self, other):
+        """True si ya jugó contra `other` (otro Team del mismo torneo)."""
+        return has_bit(self.played, other.index)
+
+    @property
+    def history(self):
+        """Partidos jugados: lista de (ronda, id_rival o BYE, puntos_propios, puntos_rival)."""
+        if self._history_loader is not None:
+            self._history = self._history_loader()
+            self._history_loader = None
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value
+        self._history_loader = None
+
+    def set_history_loader(self, loader):
+        """Difiere el armado del historial (ver snapshot.py) hasta que se lo use."""
+        self._history_loader = loader
+
+    def __repr__(self):
+        # Representación en texto para depuración
+        return f"Equipo({self.name}, Pts: {self.total_points})"
+
+
+class ResultConflict(Exception):
+    """
+    Se intentó cargar el resultado de un partido sobre una versión vieja
+    (otro árbitro ya lo cargó o lo corrigió). `version` es la versión actual.
+    """
+    def __init__(self, index, version):
+        super().__init__(f"El resultado del partido {index + 1} ya fue cargado (versión {version}).")
+        self.index = index
+        self.version = version
+
+
+class RoundScores:
+    """
+    Planilla de la ronda: lo que se está escribiendo y lo ya confirmado.
+
+    Los valores en edición se guardan como texto, tal como los escribe el
+    operador, uno por lado de cada partido. Así la interfaz puede mostrar
+    sólo algunas filas y reciclar sus widgets sin perder lo que ya se
+    escribió.
+
+    Además cada partido puede confirmarse por separado (confirm), desde
+    cualquier mesa o árbitro, con un número de versión: quien confirma
+    indica sobre qué versión lo hace, y si otro se le adelantó recibe
+    ResultConflict en lugar de pisar el resultado. La ronda queda completa
+    cuando no falta ningún partido (ver Tournament.record_match_result).
+    """
+    def __init__(self, matches):
+        self.matches = matches
+        self._values = [["", "0" if team2 == BYE else ""] for _, team2 in matches]
+        self.confirmed = [None] * len(matches)  # (puntos1, puntos2) de cada partido confirmado
+        self.versions = [0] * len(matches)      # 0 = todavía sin resultado
+        self.closed = False                     # True cuando los resultados ya se sumaron
+        self._missing = len(matches)
+
+    def get(self, index, side):
+        """Texto cargado para el lado `side` (0 o 1) del partido `index`."""
+        return self._values[index][side]
+
+    def set(self, index, side, text):
+        self._values[index][side] = text
+
+    def first_missing(self):
+        """Índice del primer partido con algún puntaje vacío, o None si están todos."""
+        for index, (s1, s2) in enumerate(self._values):
+            if not s1 or not s2:
+                return index
+        return None
+
+    def results(self):
+        """
+        Resultados de la ronda como lista de (id1, id2, puntos1, puntos2).
+        Lanza ValueError si algún puntaje no es un número entero.
+        """
+        return [(team1_id, team2_id, int(s1), int(s2))
+                for (team1_id, team2_id), (s1, s2) in zip(self.matches, self._values)]
+
+    def confirm(self, index, score1, score2, version):
+        """
+        Confirma el resultado del partido `index` sobre la versión `version`
+        (0 si se carga por primera vez). Devuelve la versión nueva.
+        Lanza ResultConflict si la versión no es la actual, y ValueError si el
+        partido no existe, la ronda ya se cerró o los puntajes no son válidos.
+        """
+        self.check(index, score1, score2)
+        if version != self.versions[index]:
+            raise ResultConflict(index, self.versions[index])
+
+        if self.confirmed[index] is None:
+            self._missing -= 1
+        self.confirmed[index] = (score1, score2)
+        self.versions[index] += 1
+        self._values[index] = [str(score1), str(score2)]
+        return self.versions[index]
+
+    def check(self, index, score1, score2):
+        """Lanza ValueError si no se puede confirmar ese resultado (ver confirm)."""
+        if not 0 <= index < len(self.matches):
+            raise ValueError(f"No existe el partido {index + 1}.")
+        if self.closed:
+            raise ValueError("La ronda ya está cerrada.")
+        for score in (score1, score2):
+            if not isinstance(score, int) or isinstance(score, bool) or score < 0:
+                raise ValueError("Los puntajes deben ser enteros no negativos.")
+        if self.matches[index][1] == BYE and score2 != 0:
+            raise ValueError("El lado libre (BYE) va con 0 puntos.")
+
+    def missing(self):
+        """Cantidad de partidos sin resultado confirmado."""
+        return self._missing
+
+    def confirmed_results(self):
+        """Resultados confirmados como lista de (id1, id2, puntos1, puntos2)."""
+        return [(team1_id, team2_id, scores[0], scores[1])
+                for (team1_id, team2_id), scores in zip(self.matches, self.confirmed) if scores is not None]
+
+    def round_points(self):
+        """
+        Convierte lo cargado en {id: puntos de la ronda}.
+        Lanza ValueError si algún puntaje no es un número entero.
+        """
+        round_points = {}
+        for (team1_id, team2_id), (s1, s2) in zip(self.matches, self._values):
+            round_points[team1_id] = round_points.get(team1_id, 0) + int(s1)
+            if team2_id != BYE:
+                round_points[team2_id] = round_points.get(team2_id, 0) + int(s2)
+        return round_points
+
+    def snapshot(self):
+        """Lo confirmado hasta ahora, inmutable (ver undo.py)."""
+        return (tuple(self.confirmed), tuple(self.versions), self.closed)
+
+    def restore(self, state):
+        """Vuelve a lo confirmado en `state` (de snapshot(); los mismos pareos)."""
+        confirmed, versions, self.closed = state
+        self.confirmed = list(confirmed)
+        self.versions = list(versions)
+        self._missing = self.confirmed.count(None)
+        for index, scores in enumerate(self.confirmed):
+            if scores is not None:
+                self._values[index] = [str(scores[0]), str(scores[1])]
+
+    def __len__(self):
+        return len(self.matches)
+
+
+class CorrectionSheet:
+    """
+    Planilla de correcciones de puntaje: el total de cada equipo, editable.
+
+    Como RoundScores, guarda los valores en edición como texto y aparte de
+    los widgets, así la interfaz puede mostrar sólo las filas visibles (y
+    filtrarlas con search) sin perder lo que ya se escribió. Sólo se
+    recuerdan los equipos cuyo valor difiere del puntaje actual; changes()
+    devuelve únicamente esos.
+    """
+    def __init__(self, teams):
+        self.teams = teams
+        self.order = sorted(teams.values(), key=lambda team: (team.name.casefold(), team.seq))
+        self.visible = self.order
+        self._edits = {}  # id -> texto escrito, sólo si difiere del puntaje actual
+
+    def search(self, text):
+        """Deja visibles los equipos cuyo nombre o ID contiene `text` (sin distinguir mayúsculas)."""
+        text = text.strip().casefold()
+        if not text:
+            self.visible = self.order
+        else:
+            self.visible = [team for team in self.order
+                            if text in team.name.casefold() or text in team.id.casefold()]
+        return self.visible
+
+    def get(self, team):
+        """Texto a mostrar para `team`: lo escrito, o su puntaje actual."""
+        return self._edits.get(team.id, str(team.total_points))
+
+    def set(self, team, text):
+        text = text.strip()
+        if text == str(team.total_points):
+            self._edits.pop(team.id, None)
+        else:
+            self._edits[team.id] = text
+
+    def is_dirty(self, team):
+        return team.id in self._edits
+
+    def dirty_count(self):
+        return len(self._edits)
+
+    def changes(self):
+        """
+        {id: puntaje nuevo} de los equipos cambiados. Lanza ValueError (con
+        los nombres) si algún valor no es un entero no negativo.
+        """
+        changes = {}
+        invalid = []
+        for team_id, text in self._edits.items():
+            if text.isdecimal():  # isdigit() acepta "²", que int() rechaza
+                changes[team_id] = int(text)
+            else:
+                invalid.append(self.teams[team_id].name)
+        if invalid:
+            raise ValueError("Puntaje inválido para: " + ", ".join(sorted(invalid, key=str.casefold)))
+        return changes
+
+
+def _find_free(parent, i):
+    """
+    Devuelve la primera posición libre (sin pareja) a partir de i.
+    `parent` funciona como un "union-find" de saltos: cada posición ya
+    emparejada apunta a la siguiente, y se comprimen los caminos para que
+    recorrer la lista de libres sea prácticamente O(1) por paso.
+    """
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def _greedy_pass(ranking, force_rematch):
+    """
+    Recorre `ranking` de arriba hacia abajo: cada equipo libre juega con el
+    siguiente libre al que todavía no enfrentó. Si no queda ninguno y
+    `force_rematch` es True se fuerza la revancha con el siguiente libre; si
+    es False el equipo queda sin pareja. Devuelve (pares, sin_pareja).
+    """
+    n = len(ranking)
+    # parent[i] == i  -> posición i libre; parent[n] es el centinela del final
+    parent = list(range(n + 1))
+    pairs = []
+    leftover = []
+
+    i = _find_free(parent, 0)
+    while i < n:
+        team1 = ranking[i]
+        parent[i] = i + 1
+
+        first = _find_free(parent, i + 1)
+        if first >= n:
+            leftover.append(team1)
+            break
+        j = first
+        played = team1.played
+        while j < n and has_bit(played, ranking[j].index):
+            j = _find_free(parent, j + 1)
+        if j >= n:
+            if not force_rematch:
+                leftover.append(team1)
+                i = _find_free(parent, i + 1)
+                continue
+            # No queda rival nuevo: revancha forzada con el siguiente libre
+            j = first
+
+        parent[j] = j + 1
+        pairs.append((team1, ranking[j]))
+        i = _find_free(parent, i + 1)
+
+    return pairs, leftover
+
+
+def pair_greedy(ranking):
+    """
+    Pareo codicioso: cada equipo libre (de arriba hacia abajo) juega con el
+    siguiente libre al que todavía no enfrentó; si no queda ninguno, se
+    fuerza la revancha con el siguiente. `ranking` debe tener largo par.
+    Devuelve una lista de pares (Team, Team).
+    """
+    return _greedy_pass(ranking, force_rematch=True)[0]
+
+
+def _split_pairing(s1, s2):
+    """
+    Cada equipo de `s1`, en orden, juega con el primer equipo libre de `s2`
+    que no haya enfrentado. Devuelve (pares, sin_pareja_de_s1, sobrantes_de_s2).
+    """
+    m = len(s2)
+    parent = list(range(m + 1))
+    pairs = []
+    unpaired = []
+
+    for team in s1:
+        k = _find_free(parent, 0)
+        played = team.played
+        while k < m and has_bit(played, s2[k].index):
+            k = _find_free(parent, k + 1)
+        if k < m:
+            parent[k] = k + 1
+            pairs.append((team, s2[k]))
+        else:
+            unpaired.append(team)
+
+    return pairs, unpaired, [s2[k] for k in range(m) if parent[k] == k]
+
+
+def _pair_group(floaters, residents):
+    """
+    Parea un grupo de puntaje al estilo suizo. Primero los que bajaron del
+    grupo de arriba (`floaters`) juegan contra los mejores del grupo. Luego la
+    mitad de arriba del resto (S1) juega contra la mitad de abajo (S2). Los que
+    no consiguen rival nuevo intentan parearse entre sí y, si tampoco pueden,
+    "flotan" al grupo de abajo. Devuelve (pares, flotantes).
+    """
+    pairs, still_floating, residents = _split_pairing(floaters, residents)
+
+    half = len(residents) // 2
+    group_pairs, unpaired, rest = _split_pairing(residents[:half], residents[half:])
+    pairs.extend(group_pairs)
+
+    extra, new_floaters = _greedy_pass(still_floating + unpaired + rest, force_rematch=False)
+    return pairs + extra, new_floaters
+
+
+def pair_score_groups(ranking):
+    """
+    Pareo por grupos de puntaje (sistema suizo "holandés" simplificado).
+
+    `ranking` viene ordenado por puntos, así que cada grupo es un tramo
+    contiguo. Se parea dentro de cada grupo y los sobrantes bajan (float-down)
+    al grupo siguiente, donde juegan primero contra los mejores de ese grupo. Lo que sobre al final se
+    parea de forma codiciosa, aceptando revanchas si no hay otra opción.
+    `ranking` debe tener largo par. Devuelve una lista de pares (Team, Team).
+    """
+    pairs = []
+    floaters = []
+    n = len(ranking)
+    start = 0
+    while start < n:
+        end = start
+        points = ranking[start].total_points
+        while end < n and ranking[end].total_points == points:
+            end += 1
+        group_pairs, floaters = _pair_group(floaters, ranking[start:end])
+        pairs.extend(group_pairs)
+        start = end
+
+    if floaters:
+        pairs.extend(pair_greedy(floaters))
+    return pairs
+
+
+def _count_rematches(pairs):
+    return sum(1 for a, b in pairs if has_bit(a.played, b.index))
+
+
+def _solve_block(block):
+    """
+    Resuelve un bloque (largo par) del ranking como emparejamiento de peso
+    máximo sobre el grafo completo. El costo de cada cruce prioriza, en este
+    orden: evitar revanchas, diferencia de puntos (al cuadrado) y distancia en
+    la tabla. Los pesos son enteros, así el resultado es exacto.
+    """
+    n = len(block)
+    points = [t.total_points for t in block]
+    max_gap = max(points) - min(points)
+
+    # Una unidad de diferencia de puntos pesa más que cualquier distancia en la tabla,
+    # y una revancha pesa más que la suma de todos los demás costos del bloque.
+    gap_unit = n
+    max_cost = max_gap * max_gap * gap_unit + n
+    rematch_penalty = (n // 2 + 1) * max_cost + 1
+    base = rematch_penalty + max_cost + 1
+
+    edges = []
+    for i in range(n):
+        played = block[i].played
+        for j in range(i + 1, n):
+            gap = points[i] - points[j]
+            cost = gap * gap * gap_unit + (j - i)
+            if has_bit(played, block[j].index):
+                cost += rematch_penalty
+            edges.append((i, j, base - cost))
+
+    mate = max_weight_matching(edges, maxcardinality=True)
+    pairs = [(block[i], block[mate[i]]) for i in range(n) if i < mate[i]]
+    return pairs, _count_rematches(pairs)
+
+
+def _pair_block(block):
+    """
+    Parea un bloque ordenado. Si el pareo por vecinos (1-2, 3-4, ...) no tiene
+    revanchas, ya es el óptimo (minimiza la suma de diferencias al cuadrado y de
+    distancias en la tabla) y no hace falta correr Edmonds.
+    """
+    pairs = [(block[i], block[i + 1]) for i in range(0, len(block), 2)]
+    if not _count_rematches(pairs):
+        return pairs, 0
+    return _solve_block(block)
+
+
+def pair_optimal(ranking):
+    """
+    Pareo por emparejamiento de peso máximo (ver _solve_block).
+
+    Resolver el grafo completo es O(n^3), así que el ranking se recorre en
+    bloques de OPTIMAL_BLOCK_SIZE. Un bloque que sólo puede parearse con
+    revanchas se fusiona con el siguiente (o, al final, con los anteriores)
+    y se vuelve a resolver, de modo que una revancha sólo queda cuando ni
+    siquiera un bloque de OPTIMAL_MAX_BLOCK equipos la puede evitar.
+    `ranking` debe tener largo par. Devuelve una lista de pares (Team, Team).
+    """
+    n = len(ranking)
+    segments = []  # Lista de [bloque, pares, revanchas] ya resueltos
+    pending = []
+    pos = 0
+    while pos < n:
+        block = pending + ranking[pos:pos + OPTIMAL_BLOCK_SIZE]
+        pos += OPTIMAL_BLOCK_SIZE
+        pairs, rematches = _pair_block(block)
+        if rematches and pos < n and len(block) < OPTIMAL_MAX_BLOCK:
+            pending = block
+            continue
+        segments.append([block, pairs, rematches])
+        pending = []
+
+    # El último bloque no tiene "siguiente": se fusiona hacia atrás
+    while len(segments) > 1 and segments[-1][2]:
+        block = segments[-2][0] + segments[-1][0]
+        if len(block) > OPTIMAL_MAX_BLOCK:
+            break
+        pairs, rematches = _pair_block(block)
+        segments[-2:] = [[block, pairs, rematches]]
+
+    return [pair for segment in segments for pair in segment[1]]
+
+
+def pair_search(ranking, budget=SEARCH_BUDGET, workers=None):
+    """
+    Pareo codicioso mejorado con búsqueda con vuelta atrás (ver
+    pairing_search.py). Parte del pareo codicioso y, durante como mucho
+    `budget` segundos, busca otro con menos revanchas o menores diferencias
+    de puntos, repartiendo la búsqueda en `workers` procesos.
+    `ranking` debe tener largo par. Devuelve una lista de pares (Team, Team).
+    """
+    start = pair_greedy(ranking)
+    position = {team.index: i for i, team in enumerate(ranking)}
+    points = [team.total_points for team in ranking]
+    opponents = [frozenset(position[k] for k in iter_bits(team.played) if k in position) for team in ranking]
+    pairs = search_pairings(points, opponents, [(position[a.index], position[b.index]) for a, b in start],
+                            budget, workers)
+    return [(ranking[i], ranking[j]) for i, j in pairs]
+
+
+# =============================================================================
+# ÍNDICES
+# =============================================================================
+
+class StandingsIndex:
+    """
+    Tabla de posiciones mantenida al día de forma incremental.
+
+    Es el único orden del torneo: lo usan el pareo, la tabla lateral, la
+    tabla final y el reporte en texto. Guarda una lista ordenada de claves
+    (-puntos, seq, Team), así que los empates respetan el orden de
+    inscripción y el resultado es siempre estable. Mover un equipo es una
+    búsqueda binaria más un corrimiento de la lista (en C), y la posición de
+    un equipo o los primeros k se obtienen sin reordenar nada.
+
+    También lleva la cuenta de equipos por puntaje, para trabajar por
+    grupos de puntaje (ver pair_score_groups).
+    """
+    def __init__(self):
+        self._entries = []  # [(-puntos, seq, Team), ...] ordenado
+        self._counts = {}   # puntos -> cantidad de equipos con ese puntaje
+        self._scores = []   # puntajes con al menos un equipo, de menor a mayor
+
+    def add(self, team, points=None):
+        if points is None:
+            points = team.total_points
+        insort(self._entries, (-points, team.seq, team))
+        if points in self._counts:
+            self._counts[points] += 1
+        else:
+            self._counts[points] = 1
+            insort(self._scores, points)
+
+    def remove(self, team, points=None):
+        if points is None:
+            points = team.total_points
+        del self._entries[bisect_left(self._entries, (-points, team.seq))]
+        self._counts[points] -= 1
+        if not self._counts[points]:
+            del self._counts[points]
+            del self._scores[bisect_left(self._scores, points)]
+
+    def move(self, team, old_points, new_points):
+        self.remove(team, old_points)
+        self.add(team, new_points)
+
+    def rank(self, team):
+        """Posición (1 = primero) del equipo en la tabla. O(log n)."""
+        return bisect_left(self._entries, (-team.total_points, team.seq)) + 1
+
+    def top(self, k):
+        """Los primeros k equipos de la tabla."""
+        return [entry[2] for entry in self._entries[:k]]
+
+    def ranking(self):
+        """Todos los equipos de mayor a menor puntaje (empates por orden de inscripción)."""
+        return [entry[2] for entry in self._entries]
+
+    def scores(self):
+        """Puntajes existentes, de mayor a menor."""
+        return self._scores[::-1]
+
+    def rebuild(self, teams):
+        """Arma la tabla de una sola vez (un ordenamiento) en lugar de equipo por equipo."""
+        self._entries = sorted((-team.total_points, team.seq, team) for team in teams)
+        self._counts = {}
+        for entry in self._entries:
+            points = -entry[0]
+            self._counts[points] = self._counts.get(points, 0) + 1
+        self._scores = sorted(self._counts)
+
+    def group(self, points):
+        """Equipos con exactamente `points` puntos, en orden de inscripción."""
+        start = bisect_left(self._entries, (-points,))
+        end = start + self._counts.get(points, 0)
+        return [entry[2] for entry in self._entries[start:end]]
+
+    def __iter__(self):
+        return (entry[2] for entry in self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TeamRegistry(dict):
+    """
+    Diccionario {id: Team} del torneo. Además de guardar los equipos, les
+    asigna su número de inscripción y mantiene al día los índices del torneo
+    cuando se agregan o quitan equipos (incluso con app.teams[id] = Team(...)).
+    """
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+        self._seq = count(1)
+
+    def __setitem__(self, team_id, team):
+        if team_id in self:
+            self._owner._team_removed(dict.__getitem__(self, team_id))
+        team.seq = next(self._seq)
+        super().__setitem__(team_id, team)
+        self._owner._team_added(team)
+
+    def __delitem__(self, team_id):
+        team = dict.__getitem__(self, team_id)
+        super().__delitem__(team_id)
+        self._owner._team_removed(team)
+
+    def pop(self, team_id, *default):
+        if team_id in self:
+            team = dict.__getitem__(self, team_id)
+            del self[team_id]
+            return team
+        return super().pop(team_id, *default)
+
+    def update(self, *args, **kwargs):
+        for team_id, team in dict(*args, **kwargs).items():
+            self[team_id] = team
+
+    def load(self, teams):
+        """
+        Carga inicial en bloque ({id: Team}, registro vacío): asigna los números
+        de inscripción sin avisar equipo por equipo. Quien llama debe armar los
+        índices después (ver Tournament.teams).
+        """
+        dict.update(self, teams)
+        for team, seq in zip(teams.values(), self._seq):
+            team.seq = seq
+
+    def clear(self):
+        for team_id in list(self):
+            del self[team_id]
+
+
+class Tournament:
+    """
+    Estado completo de un torneo: equipos, ronda actual y pareos vigentes.
+    """
+    def __init__(self, name=DEFAULT_TOURNAMENT_NAME, pairing_mode=PAIRING_GREEDY):
+        self.undo_history = None   # Deshacer/rehacer opcional (ver enable_undo)
+        self.id_table = IdTable()  # ID -> índice entero de cada equipo (ver team_store.py)
+        self.teams = {}  # Ver propiedad: se convierte en un TeamRegistry
+        self.current_round = 0
+        self.current_matches = []
+        self.tournament_name = name
+        self.pairing_mode = pairing_mode
+        self.search_budget = SEARCH_BUDGET  # Ver pair_search
+        self.journal = None  # Diario de eventos (ver attach_journal)
+        self.store = None    # Base de datos opcional (ver attach_store)
+        self.writer = None   # Guardado en segundo plano opcional (ver autosave.AutosaveWriter)
+        self.on_storage_error = None  # Si no es None, recibe los errores de guardado en vez de imprimirlos
+
+    def reset(self):
+        """Vuelve el torneo a su estado inicial (sin equipos ni rondas)."""
+        self.id_table = IdTable()
+        self.teams = {}
+        self.current_round = 0
+        self.current_matches = []
+        self.tournament_name = DEFAULT_TOURNAMENT_NAME
+        self.detach_journal()
+        self.store = None
+        self.undo_history = None
+
+    @property
+    def current_matches(self):
+        return self._current_matches
+
+    @current_matches.setter
+    def current_matches(self, value):
+        # Cada juego de pareos nuevo empieza con la planilla de puntajes vacía
+        self._current_matches = value
+        self.round_scores = RoundScores(value)
+
+    # --- Equipos e índices ------------------------------------------------
+
+    @property
+    def teams(self):
+        return self._teams
+
+    @teams.setter
+    def teams(self, value):
+        # Asignar un diccionario nuevo reconstruye los índices desde cero
+        for team in getattr(self, "_teams", {}).values():
+            team._observer = None
+        self.standings = StandingsIndex()
+        self.tiebreaks = TiebreakIndex()
+        self._opponents_text = {}
+        self._teams = TeamRegistry(self)
+        self._teams.load(value)
+        observer = self._team_points_changed  # Un solo método ligado para todos
+        for team in self._teams.values():
+            if team.id_table is not self.id_table:
+                self.id_table.adopt(team)
+            team._observer = observer
+        self.standings.rebuild(self._teams.values())
+        self.tiebreaks.rebuild(list(self._teams.values()))
+        if self.undo_history is not None:
+            self.undo_history.roster_changed()
+
+    def _team_added(self, team):
+        self.id_table.adopt(team)
+        team._observer = self._team_points_changed
+        self.standings.add(team)
+        self.tiebreaks.add(team)
+        if self.undo_history is not None:
+            self.undo_history.roster_changed()
+
+    def _team_removed(self, team):
+        team._observer = None
+        self._opponents_text.clear()  # Su nombre puede figurar como rival de otros
+        self.standings.remove(team)
+        self.tiebreaks.remove(team)
+        if self.undo_history is not None:
+            self.undo_history.roster_changed()
+
+    def _team_points_changed(self, team, old_points, new_points):
+        self.standings.move(team, old_points, new_points)
+        self.tiebreaks.invalidate()
+        if self.undo_history is not None:
+            self.undo_history.touch(team)
+
+    def add_team(self, team_id, name):
+        """Crea y registra un equipo nuevo. Devuelve el objeto Team."""
+        team = Team(team_id, name, self.id_table)
+        self.teams[team_id] = team
+        self._record({"type": "team_added", "id": team_id, "name": name})
+        return team
+
+    def add_teams(self, teams):
+        """
+        Registra muchos equipos de una vez ([(id, nombre), ...], ya validados;
+        ver team_import.py). Queda un solo evento en el diario en lugar de uno
+        por equipo. Devuelve la lista de objetos Team.
+        """
+        teams = list(teams)
+        added = []
+        for team_id, name in teams:
+            team = Team(team_id, name, self.id_table)
+            self.teams[team_id] = team
+            added.append(team)
+        if teams:
+            self._record({"type": "teams_added", "teams": [[team_id, name] for team_id, name in teams]})
+        return added
+
+    def remove_team(self, team_id):
+        """Elimina un equipo (si existe)."""
+        if self.teams.pop(team_id, None) is not None:
+            self._record({"type": "team_removed", "id": team_id})
+
+    def sorted_teams(self):
+        """Equipos ordenados por puntos (mayor a menor). Los empates conservan el orden de registro."""
+        return self.standings.ranking()
+
+    def final_standings(self):
+        """
+        Tabla con desempates: lista de (Team, criterios) ordenada por puntos y
+        luego por los criterios de tiebreaks.TIEBREAK_ORDER. Si aún así quedan
+        iguales, conservan el orden de registro.
+        """
+        return list(self.iter_final_standings())
+
+    def iter_final_standings(self):
+        """
+        Lo mismo que final_standings, de a un equipo. La tabla ya viene
+        ordenada por (puntos, inscripción): sólo se ordena, por los
+        desempates, cada grupo de equipos con los mismos puntos.
+        """
+        values = self.tiebreaks.values()
+        group = []
+        for team in self.standings:
+            if group and team.total_points != group[0][0].total_points:
+                yield from self._sorted_tie(group)
+                group = []
+            group.append((team, values[team.id]))
+        yield from self._sorted_tie(group)
+
+    @staticmethod
+    def _sorted_tie(group):
+        if len(group) > 1:
+            group.sort(key=lambda item: item[1], reverse=True)  # Estable: conserva la inscripción
+        return group
+
+    def opponent_names(self, team):
+        """Nombres de los rivales que ya enfrentó el equipo."""
+        return [self.teams[oid].name for oid in team.opponents_played if oid in self.teams]
+
+    def opponents_text(self, team):
+        """
+        Rivales del equipo como texto ("A, B, C"). Se guarda en caché por
+        equipo y sólo se recalcula cuando cambia su lista de rivales.
+        """
+        # Los rivales sólo se agregan: si no cambió la cantidad, no cambió la lista
+        cached = self._opponents_text.get(team.id)
+        played = count_bits(team.played)
+        if cached is not None and cached[0] == played:
+            return cached[1]
+        text = ", ".join(self.opponent_names(team))
+        self._opponents_text[team.id] = (played, text)
+        return text
+
+    # --- Rondas ----------------------------------------------------------
+
+    def apply_round_points(self, round_points):
+        """Suma a cada equipo los puntos obtenidos en la ronda ({id: puntos})."""
+        for tid, pts in round_points.items():
+            self.teams[tid].total_points += pts
+        self.round_scores.closed = True
+        # El historial sale de los pareos vigentes: cada equipo juega un partido por ronda
+        for team1_id, team2_id in self.current_matches:
+            if team1_id in round_points or team2_id in round_points:
+                self._add_result(team1_id, team2_id, round_points.get(team1_id, 0),
+                                 round_points.get(team2_id, 0) if team2_id != BYE else 0)
+        self._record({"type": "round_points", "round": self.current_round, "points": round_points})
+        self._checkpoint(f"Resultados de la ronda {self.current_round}")
+
+    def submit_results(self, results):
+        """
+        Carga los resultados de la ronda: lista de (id1, id2, puntos1, puntos2),
+        con BYE como id2 para el equipo libre. Suma los puntos y anota la ronda
+        completa (partido por partido) como un solo evento.
+        """
+        round_points = {}
+        for team1_id, team2_id, s1, s2 in results:
+            round_points[team1_id] = round_points.get(team1_id, 0) + s1
+            if team2_id != BYE:
+                round_points[team2_id] = round_points.get(team2_id, 0) + s2
+        for tid, pts in round_points.items():
+            self.teams[tid].total_points += pts
+        self.round_scores.closed = True
+        for result in results:
+            self._add_result(*result)
+        self._record({"type": "round_results", "round": self.current_round,
+                      "results": [list(result) for result in results]})
+        self._checkpoint(f"Resultados de la ronda {self.current_round}")
+
+    def record_match_result(self, index, score1, score2, version):
+        """
+        Carga el resultado de un solo partido de la ronda en cuanto llega
+        (ver RoundScores.confirm para `version` y los errores). Queda anotado
+        enseguida en el diario. Cuando llega el último resultado la ronda se
+        cierra sola: se suman los puntos como con submit_results.
+        Devuelve (versión nueva, True si con este resultado se cerró la ronda);
+        al cerrarse, quien llama debería armar ya la ronda siguiente.
+        """
+        scores = self.round_scores
+        version = scores.confirm(index, score1, score2, version)
+        self._record({"type": "match_result", "round": self.current_round, "index": index,
+                      "scores": [score1, score2], "version": version})
+        if scores.missing():
+            if self.undo_history is not None:
+                self.undo_history.amend(self)
+            return version, False
+        self.submit_results(scores.confirmed_results())
+        return version, True
+
+    def submit_round_scores(self):
+        """
+        Cierra la ronda con lo escrito en la planilla (botón "Enviar"): lo
+        que falte o haya cambiado se confirma sin anotar partido por partido
+        y la ronda entera queda en el diario como un solo evento. Lanza
+        ValueError, sin cambiar nada, si algún puntaje no es válido.
+        """
+        scores = self.round_scores
+        results = scores.results()
+        for index, (_, _, s1, s2) in enumerate(results):
+            scores.check(index, s1, s2)
+        for index, (_, _, s1, s2) in enumerate(results):
+            if scores.confirmed[index] != (s1, s2):
+                scores.confirm(index, s1, s2, scores.versions[index])
+        self.submit_results(results)
+
+    def results_pending(self):
+        """True si hay pareos vigentes cuyos resultados todavía no se sumaron."""
+        return bool(self.current_matches) and not self.round_scores.closed
+
+    def _add_result(self, team1_id, team2_id, score1, score2):
+        """Anota un partido en el historial de ambos equipos y en la matriz de desempates."""
+        team1 = self.teams.get(team1_id)
+        team2 = self.teams.get(team2_id) if team2_id != BYE else None
+        if team1 is not None:
+            team1.history.append((self.current_round, team2_id, score1, score2))
+            self._touch(team1)
+        if team2 is not None:
+            team2.history.append((self.current_round, team1_id, score2, score1))
+            self._touch(team2)
+        if team1 is not None and team2 is not None:
+            self.tiebreaks.add_result(team1_id, team2_id, score1, score2)
+
+    def correct_points(self, team_id, new_points, reason=None):
+        """
+        Corrección manual del puntaje total de un equipo. Queda anotada en el
+        diario con el puntaje anterior, la ronda y el motivo (si se da).
+        """
+        team = self.teams[team_id]
+        old_points = team.total_points
+        if new_points == old_points:
+            return
+        team.total_points = new_points
+        event = {"type": "score_corrected", "id": team_id, "old": old_points, "new": new_points,
+                 "round": self.current_round}
+        if reason:
+            event["reason"] = reason
+        self._record(event)
+        self._checkpoint(f"Corrección de {team.name}")
+
+    def correct_many(self, changes, reason=None):
+        """
+        Aplica varias correcciones ({id: puntaje nuevo}, p. ej. de
+        CorrectionSheet.changes) como un solo paso para deshacer. Cada una
+        queda anotada por separado. Devuelve los IDs que cambiaron.
+        """
+        changed = []
+        label = "Corrección de puntajes" if len(changes) > 1 else None
+        with self.undo_group(label):
+            for team_id, new_points in changes.items():
+                if self.teams[team_id].total_points != new_points:
+                    self.correct_points(team_id, new_points, reason)
+                    changed.append(team_id)
+        return changed
+
+    @timings.timed()
+    def generate_pairings(self):
+        """
+        Arma los pareos de la siguiente ronda (sistema suizo).
+
+        El orden por puntos sale de self.standings (no se reordena nada).
+        Si la cantidad es impar, queda libre el peor ubicado que aún no tuvo
+        BYE. El resto se parea según self.pairing_mode (ver pair_greedy,
+        pair_optimal y pair_score_groups).
+        """
+        self.current_round += 1
+        new_matches = []
+
+        ranking = self.sorted_teams()
+        n = len(ranking)
+
+        if n % 2 != 0:
+            bye_index = n - 1
+            for i in range(n - 1, -1, -1):
+                if not ranking[i].received_bye:
+                    bye_index = i
+                    break
+            bye_team = ranking[bye_index]
+            bye_team.received_bye = True
+            self._touch(bye_team)
+            new_matches.append((bye_team.id, BYE))
+            del ranking[bye_index]
+
+        if self.pairing_mode == PAIRING_OPTIMAL:
+            pairs = pair_optimal(ranking)
+        elif self.pairing_mode == PAIRING_SCORE_GROUPS:
+            pairs = pair_score_groups(ranking)
+        elif self.pairing_mode == PAIRING_SEARCH:
+            pairs = pair_search(ranking, self.search_budget)
+        else:
+            pairs = pair_greedy(ranking)
+
+        for team1, team2 in pairs:
+            new_matches.append((team1.id, team2.id))
+            set_bit(team1.played, team2.index)
+            set_bit(team2.played, team1.index)
+            self._touch(team1)
+            self._touch(team2)
+
+        self.current_matches = new_matches
+        self._record({"type": "pairings", "round": self.current_round, "matches": new_matches})
+        self._checkpoint(f"Pareo de la ronda {self.current_round}")
+        return new_matches
+
+    # --- Deshacer y rehacer -----------------------------------------------
+
+    def enable_undo(self, limit=UNDO_LIMIT):
+        """
+        Empieza a guardar cada paso (pareo de una ronda, sus resultados, una
+        corrección) para poder deshacerlo y rehacerlo (ver undo.py).
+        """
+        self.undo_history = UndoHistory(self, limit)
+
+    def _touch(self, team):
+        if self.undo_history is not None:
+            self.undo_history.touch(team)
+
+    def _checkpoint(self, label):
+        if self.undo_history is not None:
+            self.undo_history.commit(self, label)
+
+    def undo_group(self, label):
+        """Bloque `with` cuyos cambios se deshacen juntos, como un solo paso `label`."""
+        if self.undo_history is None:
+            return nullcontext()
+        return self.undo_history.group(self, label)
+
+    def can_undo(self):
+        return self.undo_history is not None and self.undo_history.can_undo()
+
+    def can_redo(self):
+        return self.undo_history is not None and self.undo_history.can_redo()
+
+    def undo(self):
+        """Deshace el último paso. Devuelve su descripción (None si no había nada que deshacer)."""
+        if not self.can_undo():
+            return None
+        label = self.undo_history.undo(self)
+        self._state_restored()
+        return label
+
+    def redo(self):
+        """Rehace el último paso deshecho. Devuelve su descripción (o None)."""
+        if not self.can_redo():
+            return None
+        label = self.undo_history.redo(self)
+        self._state_restored()
+        return label
+
+    def _state_restored(self):
+        self.tiebreaks.rebuild(list(self.teams.values()))
+        self._opponents_text.clear()
+        # El diario sólo sabe agregar eventos: se reemplaza por una foto del estado restaurado
+        if self.journal is not None:
+            try:
+                self.compact_journal()
+            except OSError as e:
+                self.report_storage_error(f"Error al guardar datos: {e}")
+        if self.store is not None:
+            try:
+                self.store.save_tournament(self)
+            except Exception as e:
+                self.report_storage_error(f"Error al guardar en la base de datos: {e}")
+
+    # --- Diario de eventos -----------------------------------------------
+
+    def journal_path(self):
+        """Ruta del diario de eventos de este torneo."""
+        return self.safe_filename()[:-len(".txt")] + JOURNAL_EXTENSION
+
+    def attach_journal(self, path=None, compact_every=None):
+        """
+        Empieza a anotar los cambios en un diario. Primero guarda una foto del
+        estado actual, así el diario sólo necesita los eventos posteriores.
+        """
+        self.detach_journal()
+        journal = Journal(path or self.journal_path())
+        if compact_every is not None:
+            journal.compact_every = compact_every
+        self.journal = journal.open()
+        self.compact_journal()
+        return journal
+
+    def detach_journal(self):
+        if self.journal is not None:
+            self.journal.close(self.writer)
+            self.journal = None
+
+    @timings.timed()
+    def compact_journal(self):
+        """
+        Escribe una foto completa (y el reporte en texto) y vacía el diario.
+        Con self.writer ambos se arman acá, en memoria, y se escriben en
+        segundo plano, en orden con los eventos.
+        """
+        if self.journal is not None:
+            self.journal.write_snapshot(lambda f, seq: write_snapshot(f, self, seq, BYE), self.writer)
+            # El reporte legible se deja junto al diario ("X.journal" -> "X.txt")
+            report = os.path.splitext(self.journal.path)[0] + ".txt"
+            if self.writer is not None:
+                self.writer.submit([(report, self.report_text())])
+            else:
+                self.write_report(report)
+
+    def attach_store(self, store):
+        """Guarda el torneo en una base (ver storage_sqlite.SQLiteStore) y le envía cada cambio."""
+        store.save_tournament(self)
+        self.store = store
+
+    def _record(self, event):
+        if self.journal is not None:
+            try:
+                self.journal.append(event, self.writer)
+                # Los resultados sueltos llegan en medio de la ronda: la foto espera a su cierre
+                if event["type"] != "match_result" and self.journal.needs_snapshot():
+                    self.compact_journal()
+            except OSError as e:
+                # Igual que antes con el guardado en texto: el torneo sigue en memoria
+                self.report_storage_error(f"Error al guardar datos: {e}")
+        if self.store is not None:
+            try:
+                self.store.record(self, event)
+            except Exception as e:
+                self.report_storage_error(f"Error al guardar en la base de datos: {e}")
+
+    def report_storage_error(self, message):
+        """Avisa un error de guardado (a on_storage_error si hay, si no por consola)."""
+        if self.on_storage_error is not None:
+            self.on_storage_error(message)
+        else:
+            print(message)
+
+    def to_dict(self):
+        """Estado completo del torneo como dict (para fotos y exportación)."""
+        return {
+            "name": self.tournament_name,
+            "round": self.current_round,
+            "pairing_mode": self.pairing_mode,
+            "matches": [list(match) for match in self.current_matches],
+            "teams": [
+                {"id": t.id, "name": t.name, "points": t.total_points,
+                 "opponents": sorted(t.opponents_played), "bye": t.received_bye,
+                 "history": [list(match) for match in t.history]}
+                for t in sorted(self.teams.values(), key=lambda t: t.seq)
+            ],
+        }
+
+    def apply_event(self, event):
+        """Vuelve a aplicar un evento del diario (sin volver a anotarlo)."""
+        kind = event["type"]
+        if kind == "team_added":
+            self.add_team(event["id"], event["name"])
+        elif kind == "teams_added":
+            self.add_teams(event["teams"])
+        elif kind == "team_removed":
+            self.remove_team(event["id"])
+        elif kind == "pairings":
+            matches = [tuple(match) for match in event["matches"]]
+            for team1_id, team2_id in matches:
+                if team2_id == BYE:
+                    self.teams[team1_id].received_bye = True
+                else:
+                    self.teams[team1_id].opponents_played.add(team2_id)
+                    self.teams[team2_id].opponents_played.add(team1_id)
+            self.current_round = event["round"]
+            self.current_matches = matches
+        elif kind == "match_result":
+            # El cierre de la ronda viene después como su propio evento (round_results)
+            self.round_scores.confirm(event["index"], event["scores"][0], event["scores"][1], event["version"] - 1)
+        elif kind == "round_results":
+            self.submit_results([tuple(result) for result in event["results"]])
+        elif kind == "round_points":
+            self.apply_round_points(event["points"])
+        elif kind == "score_corrected":
+            self.correct_points(event["id"], event["new"], event.get("reason"))
+        else:
+            raise ValueError(f"Evento desconocido en el diario: {kind}")
+
+    @classmethod
+    @timings.timed("load_journal")
+    def load_journal(cls, path, reopen=True):
+        """
+        Reconstruye un torneo desde su foto y su diario. Si `reopen` es True,
+        el diario queda abierto para seguir anotando a continuación.
+        """
+        snapshot_path, events = read_journal(path)
+        if snapshot_path:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                tournament, header = read_snapshot(f, cls, Team, BYE)
+            last_seq = header.get("seq", 0)
+        else:
+            tournament, last_seq = cls(), 0
+        for event in events:
+            tournament.apply_event(event)
+        if not tournament.teams: raise ValueError("No se encontraron equipos.")
+
+        if reopen:
+            if events:
+                last_seq = events[-1]["seq"]
+            tournament.journal = Journal(path).open(last_seq)
+            tournament.journal.since_snapshot = len(events)
+        return tournament
+
+    # --- Persistencia ----------------------------------------------------
+
+    def safe_filename(self):
+        """Nombre de archivo derivado del nombre del torneo (sin caracteres raros)."""
+        safe_name = "".join([c for c in self.tournament_name if c.isalnum() or c in (' ', '_', '-')]).strip()
+        if not safe_name:
+            safe_name = DEFAULT_TOURNAMENT_NAME
+        return f"{safe_name}.txt"
+
+    def save_snapshot(self, filename):
+        """Guarda el torneo en el formato compacto (ver snapshot.py), de forma atómica."""
+        # Si hay diario, la foto indica hasta qué evento incluye para no repetirlos al cargar
+        seq = self.journal.seq if self.journal is not None else 0
+        write_atomic(filename, lambda f: write_snapshot(f, self, seq, BYE))
+        return filename
+
+    @classmethod
+    @timings.timed("load_snapshot")
+    def load_snapshot(cls, filename):
+        """
+        Lee un archivo generado por save_snapshot y devuelve un Tournament.
+        Lanza ValueError si el formato o la versión no son válidos.
+        """
+        with open(filename, "r", encoding="utf-8") as f:
+            tournament, _header = read_snapshot(f, cls, Team, BYE)
+        if not tournament.teams: raise ValueError("No se encontraron equipos.")
+        return tournament
+
+    @timings.timed()
+    def save_tournament_data(self, filename=None):
+        """
+        Escribe el reporte del torneo en texto y, al lado, la foto compacta
+        ("X.txt" -> "X.trugo") que es la que conviene usar para volver a
+        cargarlo. Devuelve el nombre del reporte.
+
+        Ambos se reemplazan de forma atómica. Con self.writer se arman en
+        memoria y se escriben en segundo plano (la llamada no espera al disco).
+        """
+        files = self.render_files(filename)
+        if self.writer is not None:
+            self.writer.submit(files)
+        else:
+            for path, text in files:
+                write_atomic(path, lambda f: f.write(text))
+        return files[0][0]
+
+    def render_files(self, filename=None):
+        """Lo que escribe save_tournament_data, sin tocar el disco: [(ruta, texto), ...]."""
+        if filename is None:
+            filename = self.safe_filename()
+        seq = self.journal.seq if self.journal is not None else 0
+        snapshot = io.StringIO()
+        write_snapshot(snapshot, self, seq, BYE)
+        return [(filename, self.report_text()),
+                (os.path.splitext(filename)[0] + SNAPSHOT_EXTENSION, snapshot.getvalue())]
+
+    def report_text(self):
+        """El reporte legible como texto."""
+        f = io.StringIO()
+        self._write_report(f)
+        return f.getvalue()
+
+    def write_report(self, filename):
+        """Escribe sólo el reporte legible en texto (de forma atómica)."""
+        write_atomic(filename, self._write_report)
+
+    def _write_report(self, f):
+        f.write(f"=========================================\n")
+        f.write(f"   {self.tournament_name}\n")
+        f.write(f"   ESTADO DEL TORNEO: RONDA {self.current_round}\n")
+        f.write(f"=========================================\n\n")
+
+        for team in self.standings:
+            f.write(f"EQUIPO: {team.name} (ID: {team.id})\n")
+            f.write(f"  > Puntos Totales: {team.total_points}\n")
+
+            rivals_str = self.opponents_text(team) or "Ninguno"
+            f.write(f"  > Rivales: {rivals_str}\n")
+
+            rival_ids_str = ",".join(list(team.opponents_played))
+            f.write(f"  > SYSTEM_IDS_RIVALES: {rival_ids_str}\n")
+            f.write("-" * 40 + "\n")
+
+        f.write("\n=== SYSTEM_PAREOS_ACTUALES ===\n")
+        for t1, t2 in self.current_matches:
+            f.write(f"{t1},{t2}\n")
+
+    @classmethod
+    @timings.timed("load_report")
+    def load(cls, filename):
+        """
+        Lee un archivo generado por save_tournament_data y devuelve un Tournament.
+        Lanza ValueError si el formato no es válido.
+        """
+        with open(filename, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        tournament = cls()
+        tournament.tournament_name = lines[1].strip()
+        round_line = lines[2].strip()
+        if "RONDA" in round_line:
+            tournament.current_round = int(round_line.split("RONDA")[-1].strip())
+        else:
+            raise ValueError("Formato de ronda inválido")
+
+        current_team = None
+        parsing_matches = False
+        matches = []
+
+        for line in lines:
+            line = line.strip()
+            if not line: continue
+
+            if line.startswith("=== SYSTEM_PAREOS_ACTUALES ==="):
+                parsing_matches = True
+                continue
+
+            if parsing_matches:
+                if "," in line:
+                    t1, t2 = line.split(",")
+                    matches.append((t1, t2))
+                continue
+
+            if line.startswith("EQUIPO:"):
+                parts = line.split("(ID: ")
+                name = parts[0].replace("EQUIPO: ", "").strip()
+                tid = parts[1].replace(")", "").strip()
+                current_team = tournament.add_team(tid, name)
+
+            elif line.startswith("> Puntos Totales:"):
+                if current_team:
+                    current_team.total_points = int(line.split(":")[1].strip())
+
+            elif line.startswith("> SYSTEM_IDS_RIVALES:"):
+                if current_team:
+                    ids_str = line.split(":")[1].strip()
+                    if ids_str:
+                        current_team.opponents_played = set(ids_str.split(","))
+
+        if not tournament.teams: raise ValueError("No se encontraron equipos.")
+        tournament.current_matches = matches
+        return tournament
@@ -0,0 +1,259 @@
+"""
+Deshacer y rehacer por pasos: rondas y correcciones de puntaje.
+
+Cada paso que cambia el torneo (armar una ronda, cerrar sus resultados,
+corregir un puntaje) deja una foto del estado en UndoHistory. Deshacer
+vuelve a la foto anterior; rehacer, a la siguiente.
+
+Para que guardar una foto por paso no cueste copiar todos los equipos cada
+vez, las fotos comparten estructura:
+
+- Cada equipo se guarda como un registro inmutable (TeamRecord: puntos,
+  BYE, rivales y partidos jugados), en la posición de su índice en la
+  tabla de IDs (ver team_store.py).
+- Los registros van en un PersistentVector: un vector por bloques de
+  CHUNK posiciones. Cambiar algunos equipos copia sólo sus bloques; el
+  resto de los bloques (y sus registros) son los mismos objetos que en la
+  foto anterior.
+- El torneo avisa qué equipos tocó desde la última foto (touch), así que
+  una foto nueva sólo arma los registros de esos equipos.
+
+Una corrección de puntaje ocupa entonces un registro y un bloque, y una
+ronda (donde cambian todos los equipos que jugaron) lo que cambió en ella.
+Al deshacer se comparan los bloques por identidad y sólo se restauran los
+equipos que difieren.
+
+Inscribir o quitar equipos no se deshace: empieza una historia nueva desde
+ese estado. Este módulo no importa el motor ni tkinter.
+"""
+from contextlib import contextmanager
+
+# Posiciones por bloque del vector persistente
+CHUNK = 64
+
+# Pasos que se recuerdan (los más viejos se olvidan)
+UNDO_LIMIT = 200
+
+
+class PersistentVector:
+    """
+    Vector inmutable. set_many devuelve un vector nuevo que comparte con
+    este todos los bloques que no cambian.
+    """
+    __slots__ = ("_chunks", "_len")
+
+    def __init__(self, chunks=(), length=0):
+        self._chunks = chunks
+        self._len = length
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, k):
+        if not 0 <= k < self._len:
+            raise IndexError(k)
+        return self._chunks[k // CHUNK][k % CHUNK]
+
+    def get(self, k, default=None):
+        return self[k] if 0 <= k < self._len else default
+
+    def set_many(self, updates):
+        """Vector nuevo con `updates` ({posición: valor}) aplicado (crece si hace falta, con None)."""
+        if not updates:
+            return self
+        length = max(self._len, max(updates) + 1)
+        chunks = list(self._chunks)
+        chunks.extend(() for _ in range((length + CHUNK - 1) // CHUNK - len(chunks)))
+        by_chunk = {}
+        for k, value in updates.items():
+            by_chunk.setdefault(k // CHUNK, []).append((k % CHUNK, value))
+        for c, changes in by_chunk.items():
+            chunk = list(chunks[c])
+            size = min(CHUNK, length - c * CHUNK)
+            chunk.extend([None] * (size - len(chunk)))
+            for offset, value in changes:
+                chunk[offset] = value
+            chunks[c] = tuple(chunk)
+        # Bloques intermedios que quedaron cortos al crecer
+        for c in range(len(chunks) - 1):
+            if len(chunks[c]) < CHUNK:
+                chunks[c] = chunks[c] + (None,) * (CHUNK - len(chunks[c]))
+        return PersistentVector(tuple(chunks), length)
+
+    def diff(self, other):
+        """Posiciones donde este vector y `other` tienen objetos distintos (los bloques compartidos se saltean)."""
+        for c in range(max(len(self._chunks), len(other._chunks))):
+            mine = self._chunks[c] if c < len(self._chunks) else ()
+            theirs = other._chunks[c] if c < len(other._chunks) else ()
+            if mine is theirs:
+                continue
+            for offset in range(max(len(mine), len(theirs))):
+                a = mine[offset] if offset < len(mine) else None
+                b = theirs[offset] if offset < len(theirs) else None
+                if a is not b:
+                    yield c * CHUNK + offset
+
+    def chunks(self):
+        """Los bloques (tuplas); dos vectores comparten los que son el mismo objeto."""
+        return self._chunks
+
+
+class TeamRecord(tuple):
+    """Estado de un equipo en una foto: (puntos, recibió BYE, bits de rivales, historial)."""
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, team):
+        # Un historial que todavía no se armó (ver Team.set_history_loader) se guarda como su cargador
+        history = team._history_loader if team._history_loader is not None else tuple(team._history)
+        return cls((team.total_points, team.received_bye, bytes(team.played), history))
+
+    def restore(self, team):
+        points, received_bye, played, history = self
+        team.total_points = points
+        team.received_bye = received_bye
+        team.played = bytearray(played)
+        if callable(history):
+            team.set_history_loader(history)
+        else:
+            team.history = list(history)
+
+
+class Snapshot:
+    """Foto del torneo después de un paso."""
+    __slots__ = ("label", "round", "matches", "scores", "teams")
+
+    def __init__(self, label, round_number, matches, scores, teams):
+        self.label = label
+        self.round = round_number
+        self.matches = matches
+        self.scores = scores
+        self.teams = teams
+
+
+class UndoHistory:
+    """
+    Fotos de los pasos del torneo y la posición actual entre ellas. El
+    torneo llama a touch() con cada equipo que cambia y a commit() al
+    terminar cada paso (ver Tournament.enable_undo).
+    """
+    def __init__(self, tournament, limit=UNDO_LIMIT):
+        self.limit = limit
+        self._dirty = set()
+        self._group_depth = 0
+        self._group_label = None
+        self._restart(tournament)
+
+    def _restart(self, tournament):
+        teams = PersistentVector().set_many({team.index: TeamRecord.of(team) for team in tournament.teams.values()})
+        self._states = [self._snapshot(tournament, None, teams, None)]
+        self._position = 0
+        self._dirty.clear()
+        self._roster_changed = False
+
+    def _snapshot(self, tournament, label, teams, previous):
+        matches = tuple(tournament.current_matches)
+        if previous is not None and previous.matches == matches:
+            matches = previous.matches  # Misma ronda: se comparte la lista de pareos
+        return Snapshot(label, tournament.current_round, matches, tournament.round_scores.snapshot(), teams)
+
+    # --- Avisos del torneo -------------------------------------------------
+
+    def touch(self, team):
+        self._dirty.add(team.index)
+
+    def roster_changed(self):
+        """Se inscribió o quitó un equipo: la próxima foto empieza una historia nueva."""
+        self._roster_changed = True
+
+    def commit(self, tournament, label):
+        """Cierra un paso: guarda la foto del estado actual (salvo dentro de un grupo)."""
+        if self._group_depth:
+            self._group_label = self._group_label or label
+            return
+        if self._roster_changed:
+            self._restart(tournament)
+            return
+        current = self._states[self._position]
+        ids = tournament.id_table.ids
+        updates = {}
+        for k in self._dirty:
+            team = tournament.teams.get(ids[k])
+            if team is not None:
+                updates[k] = TeamRecord.of(team)
+        self._dirty.clear()
+        del self._states[self._position + 1:]  # Un paso nuevo descarta lo que se podía rehacer
+        self._states.append(self._snapshot(tournament, label, current.teams.set_many(updates), current))
+        if len(self._states) > self.limit + 1:
+            del self._states[0]
+        self._position = len(self._states) - 1
+
+    def amend(self, tournament):
+        """
+        Cambio que no es un paso propio (un resultado suelto de la ronda
+        abierta): se suma a la foto actual, así deshacer el paso siguiente
+        lo conserva.
+        """
+        if self._group_depth or self._roster_changed:
+            return
+        current = self._states[self._position]
+        del self._states[self._position + 1:]
+        self._states[self._position] = Snapshot(current.label, current.round, current.matches,
+                                                tournament.round_scores.snapshot(), current.teams)
+
+    @contextmanager
+    def group(self, tournament, label):
+        """
+        Todo lo que pase dentro del bloque es un solo paso con la descripción
+        `label` (con None, la del primer paso del bloque).
+        """
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if not self._group_depth:
+                pending, self._group_label = self._group_label, None
+                if pending is not None:
+                    self.commit(tournament, label or pending)
+
+    # --- Deshacer y rehacer ------------------------------------------------
+
+    def can_undo(self):
+        return self._position > 0 and not self._roster_changed
+
+    def can_redo(self):
+        return self._position < len(self._states) - 1 and not self._roster_changed
+
+    def undo_label(self):
+        """Descripción del paso que se desharía (o None)."""
+        return self._states[self._position].label if self.can_undo() else None
+
+    def redo_label(self):
+        return self._states[self._position + 1].label if self.can_redo() else None
+
+    def undo(self, tournament):
+        """Vuelve a la foto anterior. Devuelve la descripción del paso deshecho."""
+        label = self._states[self._position].label
+        self._move(tournament, self._position - 1)
+        return label
+
+    def redo(self, tournament):
+        self._move(tournament, self._position + 1)
+        return self._states[self._position].label
+
+    def _move(self, tournament, position):
+        current = self._states[self._position]
+        target = self._states[position]
+        ids = tournament.id_table.ids
+        # Los equipos que difieren entre las dos fotos, más los tocados después de la última
+        for k in set(current.teams.diff(target.teams)) | self._dirty:
+            record = target.teams.get(k)
+            team = tournament.teams.get(ids[k])
+            if record is not None and team is not None:
+                record.restore(team)
+        tournament.current_round = target.round
+        tournament.current_matches = list(target.matches)
+        tournament.round_scores.restore(target.scores)
+        self._position = position
+        self._dirty.clear()  # restore() los volvió a tocar: ya coinciden con la foto